@@ -29,6 +29,7 @@ hidden_imports = [
     "starlette.routing",
     "starlette.responses",
     "starlette.requests",
+    "multipart",
     "uvicorn",
     "uvicorn.logging",
     "uvicorn.loops",
@@ -88,12 +89,25 @@ hidden_imports = [
     "app",
     "app.main",
     "app.api",
+    "app.api.jobs",
+    "app.api.pipeline",
     "app.api.routes",
     "app.api.schemas",
     "app.core",
+    "app.core.cache",
     "app.core.config",
+    "app.core.model_pool",
+    "app.core.workers",
     "app.services",
     "app.services.ai_matcher_service",
+    "app.services.context_selector",
+    "app.services.extraction_cache",
+    "app.services.field_batches",
+    "app.services.json_stream",
+    "app.services.job_store",
+    "app.services.match_cache",
+    "app.services.option_index",
+    "app.services.prematcher",
     "app.services.ocr_service",
 ]
 
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Compare peak server-side memory of base64-in-JSON vs multipart uploads.
+
+Simulates what the server holds per request before OCR starts:
+
+- JSON: the whole request body (counted as held for the full request), the
+  parsed base64 string, then the decoded bytes from base64.b64decode.
+- Multipart: the upload streamed in chunks into a SpooledTemporaryFile (as
+  Starlette does), then read once into bytes for OCRService.
+
+Usage:
+    python scripts/bench_upload_memory.py [size_mb ...]
+"""
+
+import base64
+import io
+import json
+import os
+import sys
+import tracemalloc
+from collections.abc import Callable
+from tempfile import SpooledTemporaryFile
+
+CHUNK_SIZE = 64 * 1024
+SPOOL_MAX_SIZE = 1024 * 1024  # Starlette's UploadFile default
+
+
+def json_upload(body: bytes) -> bytes:
+    """Parse a base64-in-JSON body and decode the file."""
+    request = json.loads(body)
+    return base64.b64decode(request["file_base64"])
+
+
+def multipart_upload(payload: bytes) -> bytes:
+    """Receive a binary upload into a spooled file and read it back."""
+    source = io.BytesIO(payload)
+    with SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE) as spool:
+        while chunk := source.read(CHUNK_SIZE):
+            spool.write(chunk)
+        spool.seek(0)
+        return spool.read()
+
+
+def peak_bytes(handler: Callable[[bytes], bytes], data: bytes) -> int:
+    """Peak traced allocation while handling one upload."""
+    tracemalloc.start()
+    try:
+        handler(data)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+def main() -> None:
+    """Run the comparison for each requested payload size."""
+    sizes = [float(arg) for arg in sys.argv[1:]] or [1.0, 10.0, 25.0]
+    print(f"{'file MB':>8} {'json peak MB':>13} {'multipart peak MB':>18} {'ratio':>6}")
+    for size_mb in sizes:
+        payload = os.urandom(int(size_mb * 1024 * 1024))
+        body = json.dumps(
+            {"file_base64": base64.b64encode(payload).decode("ascii")}
+        ).encode()
+        json_peak = (peak_bytes(json_upload, body) + len(body)) / 1024 / 1024
+        multipart_peak = peak_bytes(multipart_upload, payload) / 1024 / 1024
+        print(
+            f"{size_mb:>8.1f} {json_peak:>13.1f} {multipart_peak:>18.1f}"
+            f" {json_peak / multipart_peak:>6.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
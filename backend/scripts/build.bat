@@ -155,7 +155,7 @@ pip install pyinstaller
 
 REM Install project dependencies directly with pip (skip Poetry for compatibility)
 echo Installing project dependencies...
-pip install fastapi uvicorn[standard] pydantic pydantic-settings httpx openai pytesseract pdf2image pillow pymupdf
+pip install fastapi uvicorn[standard] pydantic pydantic-settings httpx openai pytesseract pdf2image pillow pymupdf python-multipart
 
 REM Optional: Install deepdoctection for advanced OCR (heavy dependencies)
 echo.
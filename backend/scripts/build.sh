@@ -27,7 +27,7 @@ pip install pyinstaller
 
 # Install core project dependencies
 echo "Installing project dependencies..."
-pip install fastapi uvicorn[standard] pydantic pydantic-settings httpx openai pytesseract pdf2image pillow pymupdf
+pip install fastapi uvicorn[standard] pydantic pydantic-settings httpx openai pytesseract pdf2image pillow pymupdf python-multipart
 
 # Optional: Install deepdoctection
 echo
@@ -111,6 +111,7 @@ def get_hidden_imports() -> list[str]:
         "starlette.middleware",
         "starlette.middleware.cors",
         "starlette.routing",
+        "multipart",
         "uvicorn",
         "uvicorn.logging",
         "uvicorn.loops",
@@ -152,12 +153,25 @@ def get_hidden_imports() -> list[str]:
         "app",
         "app.main",
         "app.api",
+        "app.api.jobs",
+        "app.api.pipeline",
         "app.api.routes",
         "app.api.schemas",
         "app.core",
+        "app.core.cache",
         "app.core.config",
+        "app.core.model_pool",
+        "app.core.workers",
         "app.services",
         "app.services.ai_matcher_service",
+        "app.services.context_selector",
+        "app.services.extraction_cache",
+        "app.services.field_batches",
+        "app.services.json_stream",
+        "app.services.job_store",
+        "app.services.match_cache",
+        "app.services.option_index",
+        "app.services.prematcher",
         "app.services.ocr_service",
     ]
     
@@ -181,6 +195,14 @@ def get_hidden_imports() -> list[str]:
         print("Including deepdoctection in build")
     except ImportError:
         print("deepdoctection not installed - skipping in build")
+
+    # Optional: in-process Tesseract bindings
+    try:
+        import tesserocr  # noqa: F401
+        imports.append("tesserocr")
+        print("Including tesserocr in build")
+    except ImportError:
+        print("tesserocr not installed - skipping in build")
     
     return imports
 
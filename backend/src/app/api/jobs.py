@@ -0,0 +1,252 @@
+"""Background process-pdf jobs: submit, poll and cancel."""
+
+import asyncio
+import logging
+import threading
+import time
+from typing import Any
+
+from fastapi import HTTPException
+
+from app.api.pipeline import FileJob, process_files
+from app.api.schemas import FormFieldInput
+from app.core.config import settings
+from app.core.workers import WorkerPoolBusyError, worker_pool
+from app.services.job_store import JobRecord, JobStatus, JobStore, create_job_store
+from app.services.ocr_service import ExtractionOptions
+from app.services.ocr_service import OCRMode as ServiceOCRMode
+
+logger = logging.getLogger(__name__)
+
+
+class _ProgressSaver:
+    """
+    Saves a running job's partial results at most once per interval.
+
+    Progress events arrive once per page (and per mapping); writing the whole
+    record for each would block the event loop on disk I/O with the SQLite
+    store. Writes are coalesced and run on the I/O pool from a snapshot, so
+    the record can keep changing meanwhile.
+    """
+
+    def __init__(self, store: JobStore, record: JobRecord, interval: float) -> None:
+        self._store = store
+        self._record = record
+        self._interval = interval
+        self._dirty = False
+        self._writing = False
+        self._task: asyncio.Task[None] | None = None
+
+    def mark_dirty(self) -> None:
+        """Schedule a save of the record's current state."""
+        self._dirty = True
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        try:
+            while self._dirty:
+                await asyncio.sleep(self._interval)
+                self._dirty = False
+                snapshot = JobRecord.from_json(self._record.to_json())
+                self._writing = True
+                try:
+                    await worker_pool.run_io(self._store.save, snapshot)
+                except WorkerPoolBusyError:
+                    # Try again next interval; the final state is saved anyway
+                    self._dirty = True
+                finally:
+                    self._writing = False
+        finally:
+            self._task = None
+
+    async def close(self) -> None:
+        """Stop saving progress, waiting for a write that has already started."""
+        self._dirty = False
+        task = self._task
+        if task is None:
+            return
+        if not self._writing:
+            task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+
+class JobManager:
+    """
+    Runs process-pdf pipelines as background asyncio tasks.
+
+    Job state lives in a pluggable JobStore; partial results (finished pages
+    and files, mappings) are written to it as progress events arrive. At most
+    max_concurrent_jobs run at once, the rest wait in a bounded queue.
+    """
+
+    def __init__(self, store: JobStore) -> None:
+        """Initialize the manager with a job store."""
+        self.store = store
+        self._tasks: dict[str, asyncio.Task[None]] = {}
+        self._cancel_events: dict[str, threading.Event] = {}
+        self._slots = asyncio.Semaphore(settings.max_concurrent_jobs)
+
+    async def recover(self) -> None:
+        """Mark jobs left unfinished by a previous process as failed."""
+        for job in await worker_pool.run_io(self.store.unfinished):
+            if job.id in self._tasks:
+                continue
+            job.status = JobStatus.FAILED
+            job.error = "Job was interrupted by a server restart"
+            await self._save(job)
+
+    async def submit(
+        self,
+        jobs: list[FileJob],
+        mode: ServiceOCRMode,
+        form_fields: list[FormFieldInput],
+        api_key: str | None,
+        options: ExtractionOptions | None = None,
+    ) -> JobRecord:
+        """
+        Create a job and start processing it in the background.
+
+        Raises:
+            WorkerPoolBusyError: If too many jobs (or store calls) are waiting.
+        """
+        active = sum(1 for task in self._tasks.values() if not task.done())
+        if active >= settings.max_concurrent_jobs + settings.max_queued_jobs:
+            raise WorkerPoolBusyError("Too many jobs in progress. Please try again later.")
+        await worker_pool.run_io(
+            self.store.delete_finished_before, time.time() - settings.job_ttl_seconds
+        )
+
+        record = JobRecord()
+        await worker_pool.run_io(self.store.save, record)
+        cancel_event = threading.Event()
+        self._cancel_events[record.id] = cancel_event
+        task = asyncio.create_task(
+            self._run(record, jobs, mode, form_fields, api_key, options, cancel_event)
+        )
+        self._tasks[record.id] = task
+        task.add_done_callback(lambda _: self._forget(record.id))
+        return record
+
+    async def get(self, job_id: str) -> JobRecord | None:
+        """
+        Look up a job.
+
+        Raises:
+            WorkerPoolBusyError: If the I/O pool is saturated.
+        """
+        return await worker_pool.run_io(self.store.get, job_id)
+
+    async def cancel(self, job_id: str) -> JobRecord | None:
+        """
+        Cancel a queued or running job; finished jobs are returned unchanged.
+
+        Raises:
+            WorkerPoolBusyError: If the I/O pool is saturated.
+        """
+        record = await self.get(job_id)
+        if record is None or record.status.finished:
+            return record
+
+        task = self._tasks.get(job_id)
+        if task is not None:
+            self._cancel_events[job_id].set()
+            task.cancel()
+            # The job saves its final (cancelled) state with its partial results
+            await asyncio.gather(task, return_exceptions=True)
+            if not task.cancelled():
+                return await self.get(job_id)
+
+        # Cancelled before it started, or not running in this process
+        record.status = JobStatus.CANCELLED
+        await self._save(record)
+        return record
+
+    async def shutdown(self) -> None:
+        """Cancel all running jobs."""
+        await asyncio.gather(
+            *(self.cancel(job_id) for job_id in list(self._tasks)),
+            return_exceptions=True,
+        )
+
+    async def _save(self, record: JobRecord) -> None:
+        """Save a job's state off the event loop; inline if the I/O pool is full."""
+        try:
+            await worker_pool.run_io(self.store.save, record)
+        except WorkerPoolBusyError:
+            # State changes (running, final) must not be dropped
+            self.store.save(record)
+
+    def _forget(self, job_id: str) -> None:
+        self._tasks.pop(job_id, None)
+        self._cancel_events.pop(job_id, None)
+
+    async def _run(
+        self,
+        record: JobRecord,
+        jobs: list[FileJob],
+        mode: ServiceOCRMode,
+        form_fields: list[FormFieldInput],
+        api_key: str | None,
+        options: ExtractionOptions | None,
+        cancel_event: threading.Event,
+    ) -> None:
+        progress = _ProgressSaver(
+            self.store, record, settings.job_progress_save_interval_seconds
+        )
+
+        def on_event(event: dict[str, Any]) -> None:
+            if cancel_event.is_set():
+                return
+            kind = event.pop("event")
+            if kind == "page":
+                record.pages.append(event)
+            elif kind == "file":
+                record.files_completed.append(event["file_name"])
+            elif kind == "mapping":
+                record.mappings.append(event)
+            elif kind == "mappings":
+                record.mappings = event["mappings"]
+            progress.mark_dirty()
+
+        try:
+            async with self._slots:
+                record.status = JobStatus.RUNNING
+                await self._save(record)
+                response = await process_files(
+                    jobs,
+                    mode,
+                    form_fields,
+                    api_key,
+                    on_event=on_event,
+                    cancel_event=cancel_event,
+                    options=options,
+                )
+            record.status = JobStatus.SUCCEEDED
+            record.result = response.model_dump()
+        except asyncio.CancelledError:
+            record.status = JobStatus.CANCELLED
+        except HTTPException as e:
+            record.status = JobStatus.FAILED
+            record.error = str(e.detail)
+            record.error_status = e.status_code
+        except Exception as e:
+            logger.exception("Job %s failed: %s", record.id, e)
+            record.status = JobStatus.FAILED
+            record.error = f"Processing failed: {e!s}"
+            record.error_status = 500
+        # A late progress write must not overwrite the final state
+        await progress.close()
+        if cancel_event.is_set():
+            # Extraction stopped early because of the cancel, not a real failure
+            record.status = JobStatus.CANCELLED
+            record.error = None
+            record.error_status = None
+        await self._save(record)
+
+
+# Singleton instance
+job_manager = JobManager(create_job_store())
@@ -0,0 +1,379 @@
+"""Extraction and matching pipeline shared by the process-pdf endpoints."""
+
+import asyncio
+import logging
+import threading
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any, BinaryIO
+
+from fastapi import HTTPException
+
+from app.api.schemas import DeepdoctectionProfile as SchemaDDProfile
+from app.api.schemas import (
+    FieldMapping,
+    FileExtractionInfo,
+    FormFieldInput,
+    PageExtractionInfo,
+    ProcessFileRequest,
+    ProcessPdfRequest,
+    ProcessPdfResponse,
+)
+from app.core.config import settings
+from app.core.workers import WorkerPoolBusyError, worker_pool
+from app.services.ai_matcher_service import ai_matcher_service
+from app.services.ocr_service import (
+    DeepdoctectionProfile,
+    ExtractionCancelledError,
+    ExtractionOptions,
+    ExtractionResult,
+    PageExtraction,
+    ocr_service,
+)
+from app.services.ocr_service import OCRMode as ServiceOCRMode
+from app.services.prematcher import prematch_fields
+
+logger = logging.getLogger(__name__)
+
+# Progress events are plain dicts with an "event" key (see process_files)
+EventCallback = Callable[[dict[str, Any]], None]
+
+# Global cap on files being extracted at once, shared by all requests
+_extraction_slots = asyncio.Semaphore(settings.max_concurrent_extractions)
+
+
+@dataclass
+class FileJob:
+    """One file to extract: where its data comes from and how to read it."""
+
+    # Name used to annotate the file's text; None for a single legacy upload
+    file_name: str | None
+    # OCRService method matching the source (extract for base64, extract_file for files)
+    extract: Callable[..., ExtractionResult]
+    source: str | BinaryIO
+    mime_type: str | None = None
+
+    @property
+    def display_name(self) -> str:
+        return self.file_name or "file"
+
+
+def jobs_from_request(request: ProcessPdfRequest) -> list[FileJob]:
+    """Build file jobs from a JSON process-pdf request (empty if it has no file)."""
+    if request.files and len(request.files) > 0:
+        return [
+            FileJob(
+                file_name=file_input.file_name,
+                extract=ocr_service.extract,
+                source=file_input.file_base64,
+                mime_type=file_input.mime_type,
+            )
+            for file_input in request.files
+        ]
+
+    # Single file (legacy support)
+    file_data = request.file_base64 or request.pdf_base64
+    if not file_data:
+        return []
+    return [
+        FileJob(
+            file_name=None,
+            extract=ocr_service.extract,
+            source=file_data,
+            mime_type=request.mime_type,
+        )
+    ]
+
+
+def build_options(
+    field_count: int,
+    deepdoctection_profile: SchemaDDProfile | None = None,
+    first_page: int | None = None,
+    last_page: int | None = None,
+    max_pages: int | None = None,
+    early_stop: bool = False,
+) -> ExtractionOptions:
+    """
+    Build extraction options from request parameters.
+
+    Early stop gathers early_stop_chars_per_field characters per form field.
+    """
+    return ExtractionOptions(
+        dd_profile=DeepdoctectionProfile(deepdoctection_profile.value)
+        if deepdoctection_profile
+        else None,
+        first_page=first_page,
+        last_page=last_page,
+        max_pages=max_pages,
+        stop_after_chars=settings.early_stop_chars_per_field * max(1, field_count)
+        if early_stop
+        else None,
+    )
+
+
+def options_from_request(request: ProcessFileRequest) -> ExtractionOptions:
+    """Build extraction options from a JSON process-pdf request."""
+    return build_options(
+        len(request.form_fields),
+        deepdoctection_profile=request.deepdoctection_profile,
+        first_page=request.first_page,
+        last_page=request.last_page,
+        max_pages=request.max_pages,
+        early_stop=request.early_stop,
+    )
+
+
+def page_infos(file_name: str, pages: list[PageExtraction]) -> list[PageExtractionInfo]:
+    """Describe which extraction path each page of a file took."""
+    return [
+        PageExtractionInfo(
+            file_name=file_name,
+            page=page.page_number,
+            source=page.source.value,
+            chars=len(page.text.strip()),
+        )
+        for page in pages
+    ]
+
+
+async def _extract(
+    job: FileJob,
+    mode: ServiceOCRMode,
+    options: ExtractionOptions,
+    on_page: Callable[[PageExtraction], None] | None = None,
+) -> ExtractionResult:
+    """
+    Run OCR off the event loop.
+
+    Extraction is orchestrated on the I/O pool; OCRService fans the CPU-bound
+    page OCR out to the CPU pool itself, and deepdoctection stays in this
+    process so its model is not loaded in every pool worker.
+    """
+    async with _extraction_slots:
+        return await worker_pool.run_io(
+            job.extract,
+            job.source,
+            mode=mode,
+            mime_type=job.mime_type,
+            on_page=on_page,
+            options=options,
+        )
+
+
+async def _extract_with_events(
+    job: FileJob,
+    mode: ServiceOCRMode,
+    options: ExtractionOptions,
+    on_event: EventCallback | None,
+    cancel_event: threading.Event | None,
+) -> ExtractionResult:
+    """Extract one file, reporting each finished page and the file itself."""
+    if on_event is None and cancel_event is None:
+        return await _extract(job, mode, options)
+
+    loop = asyncio.get_running_loop()
+
+    def on_page(page: PageExtraction) -> None:
+        # Called from the worker thread; worker threads can't be cancelled,
+        # so stop between pages once the caller gave up
+        if cancel_event is not None and cancel_event.is_set():
+            raise ExtractionCancelledError
+        if on_event is not None:
+            info = page_infos(job.display_name, [page])[0]
+            loop.call_soon_threadsafe(on_event, {"event": "page", **info.model_dump()})
+
+    result = await _extract(job, mode, options, on_page=on_page)
+    if on_event is None:
+        return result
+    on_event(
+        {
+            "event": "file",
+            "file_name": job.display_name,
+            "pages": len(result.pages),
+            "total_pages": result.total_pages,
+            "stopped_early": result.stopped_early,
+            "chars": len(result.text.strip()),
+        }
+    )
+    return result
+
+
+def _to_field_mappings(mappings: list[dict[str, str]]) -> list[FieldMapping]:
+    return [
+        FieldMapping(
+            fieldId=m.get("fieldId", ""),
+            fieldName=m.get("fieldName", ""),
+            fieldType=m.get("fieldType", "text"),
+            value=m.get("value", ""),
+        )
+        for m in mappings
+    ]
+
+
+async def _match_fields(
+    extracted_text: str,
+    form_fields: list[dict[str, Any]],
+    api_key: str | None,
+    on_event: EventCallback | None = None,
+) -> list[dict[str, str]]:
+    """
+    Match fields, resolving unambiguous ones locally before asking the AI.
+
+    Only the fields the pre-matcher leaves open are sent to the model; if it
+    resolves all of them the model isn't called at all. With on_event, a
+    "mapping" event is sent for every field as soon as its value is known
+    (pre-matched fields first, then the model's answers as they stream in).
+    """
+
+    def report(mapping: dict[str, str]) -> None:
+        if on_event is not None:
+            field_mapping = _to_field_mappings([mapping])[0]
+            on_event({"event": "mapping", **field_mapping.model_dump()})
+
+    on_mapping = report if on_event is not None else None
+
+    prematched: dict[str, str] = {}
+    if settings.prematch_enabled:
+        lines = ocr_service.extract_structured_data(extracted_text)["lines"]
+        prematched = prematch_fields(lines, form_fields)
+    remaining = [f for f in form_fields if f.get("id") not in prematched]
+    logger.debug(
+        "Pre-matched %d of %d fields locally", len(prematched), len(form_fields)
+    )
+
+    local_mappings: dict[str, dict[str, str]] = {}
+    for form_field in form_fields:
+        field_id = form_field.get("id", "")
+        if field_id in prematched:
+            local_mappings[field_id] = {
+                "fieldId": field_id,
+                "fieldName": form_field.get("label") or form_field.get("name", ""),
+                "fieldType": form_field.get("type", "text"),
+                "value": prematched[field_id],
+            }
+            if on_mapping is not None:
+                on_mapping(local_mappings[field_id])
+
+    ai_mappings: list[dict[str, str]] = []
+    if remaining:
+        ai_mappings = await ai_matcher_service.match_fields_async(
+            extracted_text, remaining, api_key=api_key, on_mapping=on_mapping
+        )
+    by_id = {m.get("fieldId", ""): m for m in ai_mappings}
+
+    mappings: list[dict[str, str]] = []
+    for form_field in form_fields:
+        field_id = form_field.get("id", "")
+        mapping = local_mappings.get(field_id) or by_id.get(field_id)
+        if mapping is not None:
+            mappings.append(mapping)
+    return mappings
+
+
+async def process_files(
+    jobs: list[FileJob],
+    mode: ServiceOCRMode,
+    form_fields: list[FormFieldInput],
+    api_key: str | None,
+    on_event: EventCallback | None = None,
+    cancel_event: threading.Event | None = None,
+    options: ExtractionOptions | None = None,
+) -> ProcessPdfResponse:
+    """
+    Extract the files concurrently and match the combined text to form fields.
+
+    If on_event is given it is called on the event loop with progress events:
+    "page" for every finished page, "file" for every finished file,
+    "mapping" for every field as soon as its value is known and "mappings"
+    once all fields are matched. Setting cancel_event stops
+    extraction at the next page boundary. options are passed to OCRService
+    for every file.
+
+    Raises:
+        HTTPException: Mapped from service errors (401, 429, 503, 500).
+    """
+    options = options or ExtractionOptions()
+    try:
+        extracted_texts: list[str] = []
+        pages: list[PageExtractionInfo] = []
+        files: list[FileExtractionInfo] = []
+
+        # Extract all files concurrently; gather keeps the input order
+        results = await asyncio.gather(
+            *(
+                _extract_with_events(job, mode, options, on_event, cancel_event)
+                for job in jobs
+            )
+        )
+        for job, result in zip(jobs, results, strict=True):
+            pages.extend(page_infos(job.display_name, result.pages))
+            files.append(
+                FileExtractionInfo(
+                    file_name=job.display_name,
+                    total_pages=result.total_pages,
+                    pages_processed=[page.page_number for page in result.pages],
+                    stopped_early=result.stopped_early,
+                )
+            )
+            file_text = result.text
+            if not file_text.strip():
+                continue
+            if job.file_name is None:
+                extracted_texts.append(file_text)
+            else:
+                # Annotate with filename
+                annotated_text = f"--- Content from: {job.file_name} ---\n{file_text}"
+                extracted_texts.append(annotated_text)
+                logger.debug("Extracted %d chars from %s", len(file_text), job.file_name)
+
+        # Combine all extracted text
+        extracted_text = "\n\n".join(extracted_texts)
+
+        if not extracted_text.strip():
+            return ProcessPdfResponse(
+                success=False,
+                mappings=[],
+                extracted_text=None,
+                pages=pages,
+                files=files,
+                error="Could not extract any text from the file(s)",
+            )
+
+        # Step 2: Convert form fields to dict format for AI
+        fields_for_ai = [field.model_dump() for field in form_fields]
+
+        # Step 3: Match fields locally, then with AI (pass user's API key if provided)
+        logger.debug("Calling match_fields with api_key: %s", f"sk-...{api_key[-4:]}" if api_key else "None")
+        mappings = _to_field_mappings(
+            await _match_fields(extracted_text, fields_for_ai, api_key, on_event)
+        )
+        if on_event is not None:
+            on_event(
+                {"event": "mappings", "mappings": [m.model_dump() for m in mappings]}
+            )
+
+        return ProcessPdfResponse(
+            success=True,
+            mappings=mappings,
+            extracted_text=extracted_text[:500],
+            pages=pages,
+            files=files,
+            error=None,
+        )
+
+    except ExtractionCancelledError:
+        raise
+    except ValueError as e:
+        # Configuration/authentication errors (e.g., missing or invalid API key)
+        raise HTTPException(status_code=401, detail=str(e)) from e
+    except ConnectionError as e:
+        # Network connectivity issues
+        raise HTTPException(status_code=503, detail=str(e)) from e
+    except WorkerPoolBusyError as e:
+        # Worker queues are full, shed load instead of queueing unboundedly
+        raise HTTPException(status_code=503, detail=str(e)) from e
+    except RuntimeError as e:
+        # Rate limiting or other runtime errors
+        raise HTTPException(status_code=429, detail=str(e)) from e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Processing failed: {e!s}") from e
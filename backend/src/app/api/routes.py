@@ -1,27 +1,58 @@
 """API route handlers."""
 
+import asyncio
+import json
 import logging
+import threading
+from collections.abc import AsyncIterator
+from typing import Any
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, File, Form, HTTPException, Response, UploadFile
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter, ValidationError
 
+from app.api.jobs import job_manager
+from app.api.pipeline import (
+    FileJob,
+    build_options,
+    jobs_from_request,
+    options_from_request,
+    process_files,
+)
 from app.api.schemas import (
     AutofillRequest,
     AutofillResponse,
-    FieldMapping,
+    CacheStatsResponse,
+    DeepdoctectionProfile,
+    ExtractionCacheStats,
+    FormFieldInput,
     HealthResponse,
+    JobResponse,
+    MatchCacheStats,
+    ModelStatsResponse,
     OCRCapabilitiesResponse,
     OCRMode,
     ProcessPdfRequest,
     ProcessPdfResponse,
+    ReadinessResponse,
+    check_page_range,
 )
+from app.core.config import settings
+from app.core.workers import WorkerPoolBusyError
 from app.services.ai_matcher_service import ai_matcher_service
+from app.services.job_store import JobRecord
+from app.services.ocr_service import SUPPORTED_IMAGE_FORMATS, ocr_service
 from app.services.ocr_service import OCRMode as ServiceOCRMode
-from app.services.ocr_service import ocr_service
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+_form_fields_adapter = TypeAdapter(list[FormFieldInput])
+
+# Upload content types trusted as a MIME hint; others are sniffed from bytes
+_OCR_MIME_TYPES = {"application/pdf", *SUPPORTED_IMAGE_FORMATS}
+
 
 @router.get("/health", response_model=HealthResponse)
 async def health_check() -> HealthResponse:
@@ -29,6 +60,24 @@ async def health_check() -> HealthResponse:
     return HealthResponse(status="healthy", message="Service is running")
 
 
+@router.get("/ready", response_model=ReadinessResponse)
+async def readiness(response: Response, mode: OCRMode | None = None) -> ReadinessResponse:
+    """
+    Readiness probe for load balancers.
+
+    Returns 503 while the requested OCR mode (default: tesseract) is still
+    cold, so heavy-mode traffic is only routed to warmed-up instances.
+    """
+    modes = ocr_service.readiness()
+    ready = modes[ServiceOCRMode((mode or OCRMode.TESSERACT).value)]
+    if not ready:
+        response.status_code = 503
+    return ReadinessResponse(
+        ready=ready,
+        modes={OCRMode(m.value): warm for m, warm in modes.items()},
+    )
+
+
 @router.get("/ocr-capabilities", response_model=OCRCapabilitiesResponse)
 async def get_ocr_capabilities() -> OCRCapabilitiesResponse:
     """Get available OCR capabilities."""
@@ -40,6 +89,22 @@ async def get_ocr_capabilities() -> OCRCapabilitiesResponse:
         supported_formats=ocr_service.get_supported_formats(),
     )
 
+
+@router.get("/cache/stats", response_model=CacheStatsResponse)
+async def get_cache_stats() -> CacheStatsResponse:
+    """Get extraction and AI match cache statistics."""
+    return CacheStatsResponse(
+        extraction=ExtractionCacheStats(**ocr_service.get_cache_stats()),
+        matching=MatchCacheStats(**ai_matcher_service.get_cache_stats()),
+    )
+
+
+@router.get("/models/stats", response_model=ModelStatsResponse)
+async def get_model_stats() -> ModelStatsResponse:
+    """Get loaded OCR model instances and their estimated memory."""
+    return ModelStatsResponse(**ocr_service.get_model_stats())
+
+
 @router.post("/process-pdf", response_model=ProcessPdfResponse)
 async def process_pdf(request: ProcessPdfRequest) -> ProcessPdfResponse:
     """
@@ -50,86 +115,214 @@ async def process_pdf(request: ProcessPdfRequest) -> ProcessPdfResponse:
     3. Use AI to match extracted data to form fields
     4. Return mappings for user confirmation
     """
+    jobs = jobs_from_request(request)
+    if not jobs:
+        return ProcessPdfResponse(
+            success=False,
+            mappings=[],
+            extracted_text=None,
+            error="No file data provided",
+        )
+
+    logger.info("Processing %d files", len(jobs))
+    return await process_files(
+        jobs,
+        ServiceOCRMode(request.ocr_mode.value),
+        request.form_fields,
+        request.openai_api_key,
+        options=options_from_request(request),
+    )
+
+
+@router.post("/process-pdf/upload", response_model=ProcessPdfResponse)
+async def process_pdf_upload(
+    files: list[UploadFile] = File(..., description="PDF or image files"),
+    form_fields: str = Form(..., description="JSON array of form fields"),
+    openai_api_key: str | None = Form(None, description="User-provided OpenAI API key"),
+    ocr_mode: OCRMode = Form(OCRMode.TESSERACT, description="OCR mode"),
+    deepdoctection_profile: DeepdoctectionProfile | None = Form(
+        None, description="deepdoctection pipeline profile"
+    ),
+    first_page: int | None = Form(None, ge=1, description="First PDF page to extract"),
+    last_page: int | None = Form(None, ge=1, description="Last PDF page to extract"),
+    max_pages: int | None = Form(None, ge=1, description="Max pages extracted per PDF"),
+    early_stop: bool = Form(False, description="Stop once enough text was gathered"),
+) -> ProcessPdfResponse:
+    """
+    Multipart variant of /process-pdf that takes binary uploads.
+
+    Avoids base64 inside JSON: uploads are spooled to temporary files by the
+    framework and read straight into OCRService on the worker thread, so no
+    base64 string or second decoded copy is held in memory.
+    """
     try:
-        # Convert schema OCRMode to service OCRMode
-        service_mode = ServiceOCRMode(request.ocr_mode.value)
-        
-        extracted_texts: list[str] = []
-        
-        # Check if we have multiple files
-        if request.files and len(request.files) > 0:
-            logger.info("Processing %d files", len(request.files))
-            for file_input in request.files:
-                file_text = ocr_service.extract_text(
-                    file_input.file_base64,
-                    mode=service_mode,
-                    mime_type=file_input.mime_type,
-                )
-                if file_text.strip():
-                    # Annotate with filename
-                    annotated_text = f"--- Content from: {file_input.file_name} ---\n{file_text}"
-                    extracted_texts.append(annotated_text)
-                    logger.debug("Extracted %d chars from %s", len(file_text), file_input.file_name)
-        else:
-            # Single file (legacy support)
-            file_data = request.file_base64 or request.pdf_base64
-            if not file_data:
-                return ProcessPdfResponse(
-                    success=False,
-                    mappings=[],
-                    extracted_text=None,
-                    error="No file data provided",
-                )
-            
-            file_text = ocr_service.extract_text(
-                file_data, mode=service_mode, mime_type=request.mime_type
-            )
-            if file_text.strip():
-                extracted_texts.append(file_text)
-        
-        # Combine all extracted text
-        extracted_text = "\n\n".join(extracted_texts)
-
-        if not extracted_text.strip():
-            return ProcessPdfResponse(
-                success=False,
-                mappings=[],
-                extracted_text=None,
-                error="Could not extract any text from the file(s)",
-            )
+        fields = _form_fields_adapter.validate_json(form_fields)
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=e.errors()) from e
+    try:
+        check_page_range(first_page, last_page)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e)) from e
+
+    logger.info("Processing %d uploaded files", len(files))
+    jobs = [
+        FileJob(
+            file_name=upload.filename or "file",
+            extract=ocr_service.extract_file,
+            source=upload.file,
+            mime_type=upload.content_type
+            if upload.content_type in _OCR_MIME_TYPES
+            else None,
+        )
+        for upload in files
+    ]
+    options = build_options(
+        len(fields),
+        deepdoctection_profile=deepdoctection_profile,
+        first_page=first_page,
+        last_page=last_page,
+        max_pages=max_pages,
+        early_stop=early_stop,
+    )
+    return await process_files(
+        jobs, ServiceOCRMode(ocr_mode.value), fields, openai_api_key, options=options
+    )
+
+
+@router.post("/process-pdf/stream")
+async def process_pdf_stream(request: ProcessPdfRequest) -> StreamingResponse:
+    """
+    Streaming variant of /process-pdf that reports progress as NDJSON.
+
+    Emits one JSON object per line as work finishes:
+    - {"event": "page", ...} for every extracted page
+    - {"event": "file", ...} for every extracted file
+    - {"event": "mapping", "fieldId": ..., "value": ...} for every field as
+      soon as its value is known (answers are streamed from the model)
+    - {"event": "mappings", "mappings": [...]} once AI matching returns
+    - {"event": "result", ...} with the full ProcessPdfResponse, or
+      {"event": "error", "status_code": ..., "detail": ...} on failure
+    - {"event": "heartbeat"} while idle, so proxies don't time out
+    """
+    jobs = jobs_from_request(request)
+    mode = ServiceOCRMode(request.ocr_mode.value)
 
-        # Step 2: Convert form fields to dict format for AI
-        form_fields = [field.model_dump() for field in request.form_fields]
+    async def events() -> AsyncIterator[str]:
+        if not jobs:
+            yield _ndjson({"event": "error", "status_code": 400, "detail": "No file data provided"})
+            return
 
-        # Step 3: Use AI to match fields (pass user's API key if provided)
-        logger.debug("Calling match_fields with api_key: %s", f"sk-...{request.openai_api_key[-4:]}" if request.openai_api_key else "None")
-        mappings = ai_matcher_service.match_fields(
-            extracted_text, form_fields, api_key=request.openai_api_key
+        # None marks the end of the pipeline
+        queue: asyncio.Queue[dict[str, Any] | None] = asyncio.Queue()
+        cancel_event = threading.Event()
+        task = asyncio.create_task(
+            process_files(
+                jobs,
+                mode,
+                request.form_fields,
+                request.openai_api_key,
+                on_event=queue.put_nowait,
+                cancel_event=cancel_event,
+                options=options_from_request(request),
+            )
         )
+        task.add_done_callback(lambda _: queue.put_nowait(None))
+        try:
+            while True:
+                try:
+                    event = await asyncio.wait_for(
+                        queue.get(), timeout=settings.stream_heartbeat_seconds
+                    )
+                except TimeoutError:
+                    yield _ndjson({"event": "heartbeat"})
+                    continue
+                if event is None:
+                    break
+                yield _ndjson(event)
 
-        return ProcessPdfResponse(
-            success=True,
-            mappings=[
-                FieldMapping(
-                    fieldId=m.get("fieldId", ""),
-                    fieldName=m.get("fieldName", ""),
-                    fieldType=m.get("fieldType", "text"),
-                    value=m.get("value", ""),
+            try:
+                response = task.result()
+                yield _ndjson({"event": "result", **response.model_dump()})
+            except HTTPException as e:
+                yield _ndjson(
+                    {"event": "error", "status_code": e.status_code, "detail": e.detail}
                 )
-                for m in mappings
-            ],
-            extracted_text=extracted_text[:500],
-            error=None,
+        finally:
+            # Client went away: stop the pipeline
+            if not task.done():
+                cancel_event.set()
+                task.cancel()
+
+    return StreamingResponse(events(), media_type="application/x-ndjson")
+
+
+def _ndjson(event: dict[str, Any]) -> str:
+    return json.dumps(event) + "\n"
+
+
+def _job_response(record: JobRecord) -> JobResponse:
+    # Partial results are stored as plain dicts; let pydantic validate them
+    return JobResponse.model_validate(
+        {
+            "job_id": record.id,
+            "status": record.status.value,
+            "created_at": record.created_at,
+            "updated_at": record.updated_at,
+            "pages": record.pages,
+            "files_completed": record.files_completed,
+            "mappings": record.mappings,
+            "result": record.result,
+            "error": record.error,
+            "error_status": record.error_status,
+        }
+    )
+
+
+@router.post("/jobs", response_model=JobResponse, status_code=202)
+async def submit_job(request: ProcessPdfRequest) -> JobResponse:
+    """
+    Submit a process-pdf request as a background job.
+
+    Returns immediately with the job id; poll GET /jobs/{job_id} for
+    progress and the final result.
+    """
+    jobs = jobs_from_request(request)
+    if not jobs:
+        raise HTTPException(status_code=400, detail="No file data provided")
+
+    try:
+        record = await job_manager.submit(
+            jobs,
+            ServiceOCRMode(request.ocr_mode.value),
+            request.form_fields,
+            request.openai_api_key,
+            options_from_request(request),
         )
+    except WorkerPoolBusyError as e:
+        raise HTTPException(status_code=503, detail=str(e)) from e
+    logger.info("Submitted job %s with %d files", record.id, len(jobs))
+    return _job_response(record)
 
-    except ValueError as e:
-        # Configuration/authentication errors (e.g., missing or invalid API key)
-        raise HTTPException(status_code=401, detail=str(e)) from e
-    except ConnectionError as e:
-        # Network connectivity issues
+
+@router.get("/jobs/{job_id}", response_model=JobResponse)
+async def get_job(job_id: str) -> JobResponse:
+    """Get the status and partial results of a job."""
+    try:
+        record = await job_manager.get(job_id)
+    except WorkerPoolBusyError as e:
+        raise HTTPException(status_code=503, detail=str(e)) from e
+    if record is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return _job_response(record)
+
+
+@router.delete("/jobs/{job_id}", response_model=JobResponse)
+async def cancel_job(job_id: str) -> JobResponse:
+    """Cancel a queued or running job."""
+    try:
+        record = await job_manager.cancel(job_id)
+    except WorkerPoolBusyError as e:
         raise HTTPException(status_code=503, detail=str(e)) from e
-    except RuntimeError as e:
-        # Rate limiting or other runtime errors
-        raise HTTPException(status_code=429, detail=str(e)) from e
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Processing failed: {e!s}") from e
+    if record is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return _job_response(record)
@@ -3,7 +3,7 @@
 from enum import Enum
 from typing import Any
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 
 
 class OCRMode(str, Enum):
@@ -12,6 +12,22 @@ class OCRMode(str, Enum):
     DEEPDOCTECTION = "deepdoctection"  # Slower, structure-preserving OCR
 
 
+class DeepdoctectionProfile(str, Enum):
+    """deepdoctection pipeline variants."""
+    OCR_ONLY = "ocr-only"  # Text recognition only
+    LAYOUT_OCR = "layout+ocr"  # Adds layout detection (reading order)
+    FULL = "full-with-tables"  # Adds table recognition
+
+
+class JobStatus(str, Enum):
+    """Lifecycle states of a background job."""
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+
 class HealthResponse(BaseModel):
     """Health check response model."""
 
@@ -109,6 +125,45 @@ class ProcessFileRequest(BaseModel):
         OCRMode.TESSERACT,
         description="OCR mode: 'tesseract' (fast) or 'deepdoctection' (accurate)",
     )
+    deepdoctection_profile: DeepdoctectionProfile | None = Field(
+        None,
+        description="deepdoctection pipeline for ocr_mode 'deepdoctection'. "
+        "Defaults to the server setting.",
+    )
+    first_page: int | None = Field(
+        None, ge=1, description="First PDF page to extract (1-based, inclusive)"
+    )
+    last_page: int | None = Field(
+        None, ge=1, description="Last PDF page to extract (1-based, inclusive)"
+    )
+    max_pages: int | None = Field(
+        None, ge=1, description="Max pages extracted per PDF"
+    )
+    early_stop: bool = Field(
+        False,
+        description="Stop reading pages of a PDF once enough text for the form "
+        "fields was gathered",
+    )
+
+    @model_validator(mode="after")
+    def _check_page_range(self) -> "ProcessFileRequest":
+        """Reject a page range that selects no pages."""
+        check_page_range(self.first_page, self.last_page)
+        return self
+
+
+def check_page_range(first_page: int | None, last_page: int | None) -> None:
+    """
+    Check that first_page..last_page selects at least one page.
+
+    Raises:
+        ValueError: If first_page is after last_page.
+    """
+    if first_page is not None and last_page is not None and first_page > last_page:
+        raise ValueError(
+            f"first_page ({first_page}) is after last_page ({last_page}), "
+            "the selected page range is empty"
+        )
 
 
 # Alias for backwards compatibility
@@ -133,6 +188,31 @@ class FieldMapping(BaseModel):
     value: str = Field("", description="The extracted value to fill")
 
 
+class PageExtractionInfo(BaseModel):
+    """How a single page of an uploaded file was extracted."""
+
+    file_name: str = Field(..., description="File the page belongs to")
+    page: int = Field(..., description="1-based page number")
+    source: str = Field(
+        ...,
+        description="Extraction path: 'text' (PDF text layer), 'tesseract' or 'deepdoctection'",
+    )
+    chars: int = Field(..., description="Number of characters extracted")
+
+
+class FileExtractionInfo(BaseModel):
+    """Which pages of a file were extracted."""
+
+    file_name: str = Field(..., description="File name")
+    total_pages: int = Field(..., description="Pages in the file")
+    pages_processed: list[int] = Field(
+        default_factory=list, description="1-based numbers of the extracted pages"
+    )
+    stopped_early: bool = Field(
+        False, description="Whether extraction stopped early (early_stop)"
+    )
+
+
 class ProcessPdfResponse(BaseModel):
     """Response from PDF processing."""
 
@@ -141,6 +221,12 @@ class ProcessPdfResponse(BaseModel):
         default_factory=list, description="Field to value mappings"
     )
     extracted_text: str | None = Field(None, description="Raw extracted text")
+    pages: list[PageExtractionInfo] = Field( # type: ignore
+        default_factory=list, description="Per-page extraction details"
+    )
+    files: list[FileExtractionInfo] = Field( # type: ignore
+        default_factory=list, description="Pages processed per file"
+    )
     error: str | None = Field(None, description="Error message if failed")
 
 
@@ -158,3 +244,100 @@ class OCRCapabilitiesResponse(BaseModel):
         default_factory=lambda: [".pdf", ".png", ".jpg", ".webp", ".gif", ".bmp", ".tiff"],
         description="Supported file extensions",
     )
+
+
+class ReadinessResponse(BaseModel):
+    """Response with per-mode readiness."""
+
+    ready: bool = Field(..., description="Whether the requested mode is ready")
+    modes: dict[OCRMode, bool] = Field(
+        ..., description="Whether each OCR mode is warm (model loaded)"
+    )
+
+
+class ExtractionCacheStats(BaseModel):
+    """Extraction cache counters."""
+
+    hits: int = Field(..., description="Lookups served from memory or disk")
+    misses: int = Field(..., description="Lookups that required extraction")
+    memory_hits: int = Field(..., description="Lookups served from memory")
+    disk_hits: int = Field(..., description="Lookups served from the disk tier")
+    entries: int = Field(..., description="Entries held in memory")
+    memory_bytes: int = Field(..., description="Bytes held in memory")
+    max_memory_bytes: int = Field(..., description="Memory budget in bytes")
+    disk_enabled: bool = Field(..., description="Whether the disk tier is enabled")
+    disk_bytes: int = Field(..., description="Compressed bytes held on disk")
+
+
+class MatchCacheStats(BaseModel):
+    """AI match cache counters."""
+
+    hits: int = Field(..., description="Requests answered from the cache")
+    misses: int = Field(..., description="Requests that called the model")
+    evictions: int = Field(..., description="Entries evicted to stay within the size budget")
+    expirations: int = Field(..., description="Entries dropped after their TTL")
+    entries: int = Field(..., description="Cached answers")
+    size_bytes: int = Field(..., description="Bytes held")
+    max_bytes: int = Field(..., description="Size budget in bytes")
+    ttl_seconds: float | None = Field(None, description="Entry lifetime")
+
+
+class CacheStatsResponse(BaseModel):
+    """Response with cache statistics."""
+
+    extraction: ExtractionCacheStats = Field(
+        ..., description="Extraction (OCR) cache statistics"
+    )
+    matching: MatchCacheStats = Field(..., description="AI match cache statistics")
+
+
+class ModelPoolStats(BaseModel):
+    """Instances of one model pool."""
+
+    size: int = Field(..., description="Max instances")
+    created: int = Field(..., description="Loaded instances")
+    idle: int = Field(..., description="Loaded instances not in use")
+    in_use: int = Field(..., description="Instances processing a request")
+    instance_bytes: int = Field(
+        ..., description="Estimated memory per instance (0 until measured)"
+    )
+    resident_bytes: int = Field(..., description="Estimated memory of loaded instances")
+
+
+class ModelStatsResponse(BaseModel):
+    """Response with loaded OCR models and their memory."""
+
+    budget_bytes: int | None = Field(None, description="Memory budget for models")
+    idle_ttl_seconds: float | None = Field(
+        None, description="Idle time after which instances are unloaded"
+    )
+    resident_bytes: int = Field(..., description="Estimated memory of all loaded models")
+    process_rss_bytes: int | None = Field(
+        None, description="Resident memory of the whole process"
+    )
+    pools: dict[str, ModelPoolStats] = Field(..., description="Per-model pool stats")
+
+
+class JobResponse(BaseModel):
+    """Status and (partial) results of a background process-pdf job."""
+
+    job_id: str = Field(..., description="Job identifier")
+    status: JobStatus = Field(..., description="Current job status")
+    created_at: float = Field(..., description="Creation time (Unix timestamp)")
+    updated_at: float = Field(..., description="Last update time (Unix timestamp)")
+    pages: list[PageExtractionInfo] = Field( # type: ignore
+        default_factory=list, description="Pages extracted so far"
+    )
+    files_completed: list[str] = Field(
+        default_factory=list, description="Files whose extraction has finished"
+    )
+    mappings: list[FieldMapping] = Field( # type: ignore
+        default_factory=list, description="Field mappings matched so far"
+    )
+    result: ProcessPdfResponse | None = Field(
+        None, description="Final result once the job succeeded"
+    )
+    error: str | None = Field(None, description="Error message if the job failed")
+    error_status: int | None = Field(
+        None, description="HTTP status the synchronous endpoint would have returned"
+    )
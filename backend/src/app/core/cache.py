@@ -0,0 +1,109 @@
+"""Thread-safe in-memory LRU cache bounded by size in bytes."""
+
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Generic, TypeVar
+
+V = TypeVar("V")
+
+
+@dataclass
+class CacheStats:
+    """Counters for a cache."""
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    entries: int = 0
+    size_bytes: int = 0
+    max_bytes: int = 0
+
+
+class LRUCache(Generic[V]):
+    """
+    Least-recently-used cache bounded by the total size of its values.
+
+    Sizes are computed by the sizeof callable when a value is stored. Values
+    larger than the whole budget are not cached. With ttl_seconds, entries
+    also expire that long after they were stored.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int,
+        sizeof: Callable[[V], int],
+        ttl_seconds: float | None = None,
+    ) -> None:
+        """Initialize an empty cache."""
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._sizeof = sizeof
+        # key -> (value, size, expiry time or None)
+        self._entries: OrderedDict[str, tuple[V, int, float | None]] = OrderedDict()
+        self._size = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> V | None:
+        """Return the cached value and mark it as recently used."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[2] is not None and entry[2] <= time.monotonic():
+                del self._entries[key]
+                self._size -= entry[1]
+                self._expirations += 1
+                entry = None
+            if entry is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry[0]
+
+    def put(self, key: str, value: V) -> None:
+        """Store a value, evicting least recently used entries to make room."""
+        size = self._sizeof(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._size -= old[1]
+            expires_at = (
+                time.monotonic() + self.ttl_seconds if self.ttl_seconds is not None else None
+            )
+            self._entries[key] = (value, size, expires_at)
+            self._size += size
+            while self._size > self.max_bytes:
+                _, (_, evicted_size, _) = self._entries.popitem(last=False)
+                self._size -= evicted_size
+                self._evictions += 1
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def stats(self) -> CacheStats:
+        """Snapshot of the cache counters."""
+        with self._lock:
+            return CacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                expirations=self._expirations,
+                entries=len(self._entries),
+                size_bytes=self._size,
+                max_bytes=self.max_bytes,
+            )
+
+    def __len__(self) -> int:
+        return len(self._entries)
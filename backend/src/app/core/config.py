@@ -1,5 +1,7 @@
 """Application configuration settings."""
 
+from typing import Literal
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -32,5 +34,80 @@ class Settings(BaseSettings):
     api_key: str | None = None
     openai_api_key: str | None = None
 
+    # OpenAI clients (cached per API key, sharing one keep-alive connection pool)
+    openai_client_cache_size: int = 256  # Clients kept for recently seen API keys
+    openai_max_connections: int = 100
+    openai_max_keepalive_connections: int = 20
+    openai_keepalive_expiry: float = 30.0  # Seconds an idle connection is kept open
+
+    # AI matching
+    openai_model: str = "gpt-4o-mini"
+    # Extracted text sent to the model is cut down to the passages most
+    # relevant to the form fields once it exceeds this many tokens (None: off)
+    context_token_budget: int | None = 6000
+    completion_max_tokens: int = 2000  # Output token limit per completion
+    field_batch_max_tokens: int = 1500  # Estimated answer tokens per field batch
+    max_concurrent_field_batches: int = 4  # Field batches of one request sent at once
+    # Select lists longer than this only show the model the options the text
+    # mentions (at most this many; None: always send every option)
+    option_candidates_top_k: int | None = 20
+    # Stream answers and report each mapping as it arrives (streaming endpoint)
+    openai_stream_completions: bool = True
+    # Re-query fields missing from (or invalid in) an answer, and rate-limited
+    # requests, this many times with jittered exponential backoff
+    match_retry_attempts: int = 2
+    match_retry_backoff_seconds: float = 1.0
+    match_cache_enabled: bool = True  # Reuse answers for the same text and form
+    match_cache_max_bytes: int = 16 * 1024 * 1024
+    match_cache_ttl_seconds: float = 60 * 60
+    # Fill unambiguous fields (emails, IBANs, "Label: value" lines) locally and
+    # only send the remaining fields to the model
+    prematch_enabled: bool = True
+
+    # Worker pools (blocking OCR calls run off the event loop)
+    io_workers: int = 16  # Threads for blocking I/O-bound calls (extraction)
+    cpu_workers: int | None = None  # OCR workers, defaults to CPU count
+    cpu_pool_type: str = "process"  # "process" or "thread"
+    worker_queue_depth: int = 32  # Max waiting calls per pool before rejecting
+
+    # Background jobs
+    job_store: str = "memory"  # "memory" or "sqlite"
+    job_store_path: str = "jobs.sqlite3"  # SQLite database file for job_store="sqlite"
+    max_concurrent_jobs: int = 4  # Jobs processed at once
+    max_queued_jobs: int = 64  # Jobs waiting to start before new ones are rejected
+    job_ttl_seconds: int = 24 * 60 * 60  # How long finished jobs are kept
+    job_progress_save_interval_seconds: float = 1.0  # Partial results saved this often
+
+    # Streaming responses
+    stream_heartbeat_seconds: float = 15.0  # Idle time before a heartbeat event
+
+    # OCR
+    max_concurrent_extractions: int = 8  # Files extracted at once across requests
+    max_pages_per_file: int | None = None  # Pages extracted per PDF at most (None: all)
+    early_stop_chars_per_field: int = 200  # Text gathered per form field before early stop
+    text_layer_min_chars: int = 16  # Pages with less embedded text are OCR'd
+    ocr_page_parallelism: int = 4  # Max pages of one document OCR'd at once
+    tesseract_threads: int = 1  # OpenMP threads per Tesseract process in CPU workers
+    ocr_engine: str = "auto"  # "auto", "tesserocr" (in-process pool) or "subprocess"
+    tesseract_engine_pool_size: int | None = None  # tesserocr instances, defaults to CPU workers
+    tesseract_lang: str = "eng"  # Tesseract language(s), e.g. "eng+deu"
+    deepdoctection_pool_size: int = 1  # Analyzer instances (each loads all models)
+    # deepdoctection pipeline; an unknown value fails at startup
+    deepdoctection_profile: Literal["ocr-only", "layout+ocr", "full-with-tables"] = (
+        "full-with-tables"
+    )
+    deepdoctection_batch_pages: int = 8  # Page images per analyzer pass
+    model_memory_budget_bytes: int | None = None  # Max estimated RAM for loaded models
+    model_idle_ttl_seconds: float | None = 30 * 60  # Unload models idle this long
+    ocr_warmup_modes: list[str] = []  # Modes loaded at startup, e.g. ["deepdoctection"]
+    ocr_target_dpi: int = 150  # Render resolution for OCR
+    ocr_max_page_pixels: int = 8_000_000  # Hard cap on rendered pixels per page
+
+    # Extraction cache (keyed by document hash + OCR mode/settings)
+    extraction_cache_enabled: bool = True
+    extraction_cache_max_bytes: int = 64 * 1024 * 1024  # In-memory LRU budget
+    extraction_cache_dir: str | None = None  # Set to enable the on-disk tier
+    extraction_cache_max_disk_bytes: int = 512 * 1024 * 1024
+
 
 settings = Settings()
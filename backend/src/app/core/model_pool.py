@@ -0,0 +1,306 @@
+"""Thread-safe pools of expensive, non-thread-safe model instances."""
+
+import gc
+import logging
+import os
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from typing import Any, Generic, TypeVar
+
+from app.core.config import settings
+from app.core.workers import WorkerPoolBusyError
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class ModelMemoryBudgetError(WorkerPoolBusyError):
+    """Raised when loading a model instance would exceed the memory budget."""
+
+
+def resident_memory_bytes() -> int | None:
+    """Resident set size of this process, or None if it can't be measured."""
+    try:
+        import psutil
+
+        rss: int = psutil.Process().memory_info().rss
+        return rss
+    except ImportError:
+        pass
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+class ModelPool(Generic[T]):
+    """
+    Fixed-size pool of model instances with checkout/return semantics.
+
+    Instances are built lazily by the factory, at most size of them. Builds
+    are serialized so concurrent first requests don't load the same model
+    several times in parallel (and double peak memory). A checked-out
+    instance is used by one thread at a time; callers wait for a free one
+    once the pool is full.
+
+    When registered with a ModelMemoryManager, the memory of an instance is
+    estimated from the process RSS growth while building it; new instances
+    are only built while they fit the manager's budget, and instances idle
+    for longer than its TTL are unloaded.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        factory: Callable[[], T],
+        size: int,
+        reset: Callable[[T], None] | None = None,
+        memory: "ModelMemoryManager | None" = None,
+    ) -> None:
+        """
+        Initialize an empty pool.
+
+        Args:
+            name: Name used in logs and stats.
+            factory: Builds a new instance.
+            size: Maximum number of instances.
+            reset: Optional cleanup applied to an instance when it is returned.
+            memory: Optional manager enforcing a memory budget and idle TTL.
+        """
+        self.name = name
+        self.size = max(1, size)
+        # Instances kept loaded by idle unloading (e.g. for warmed-up modes)
+        self.min_instances = 0
+        self._factory = factory
+        self._reset = reset
+        self._memory = memory
+        # Idle instances with the time they were returned
+        self._idle: list[tuple[T, float]] = []
+        self._created = 0
+        # Estimated bytes per instance (0 until the first build is measured)
+        self.instance_bytes = 0
+        self._cond = threading.Condition()
+        self._build_lock = threading.Lock()
+        if memory is not None:
+            memory.register(self)
+
+    @contextmanager
+    def checkout(self) -> Iterator[T]:
+        """
+        Borrow an instance, building one if none is idle and the pool has room.
+
+        Raises:
+            ModelMemoryBudgetError: If no instance is loaded and building one
+                would exceed the memory budget.
+        """
+        instance = self._acquire()
+        try:
+            yield instance
+        finally:
+            self._release(instance)
+
+    def _acquire(self) -> T:
+        with self._cond:
+            while True:
+                if self._idle:
+                    return self._idle.pop()[0]
+                if self._created < self.size and self._fits_budget():
+                    self._created += 1
+                    break
+                if self._created == 0:
+                    raise ModelMemoryBudgetError(
+                        f"Not enough memory budget to load {self.name}. "
+                        "Please try again later."
+                    )
+                self._cond.wait()
+
+        try:
+            with self._build_lock:
+                logger.info(
+                    "Building %s instance %d/%d", self.name, self._created, self.size
+                )
+                rss_before = resident_memory_bytes()
+                instance = self._factory()
+                rss_after = resident_memory_bytes()
+        except BaseException:
+            with self._cond:
+                self._created -= 1
+                self._cond.notify()
+            raise
+
+        if rss_before is not None and rss_after is not None:
+            # Approximate: other threads allocate concurrently; keep the largest
+            self.instance_bytes = max(self.instance_bytes, rss_after - rss_before)
+        return instance
+
+    def _fits_budget(self) -> bool:
+        if self._memory is None:
+            return True
+        # Before the first build is measured, assume this model is as large
+        # as the largest one measured in any pool
+        return self._memory.fits(
+            self.instance_bytes or self._memory.largest_instance_bytes
+        )
+
+    def _release(self, instance: T) -> None:
+        try:
+            if self._reset is not None:
+                self._reset(instance)
+        finally:
+            with self._cond:
+                self._idle.append((instance, time.monotonic()))
+                self._cond.notify()
+
+    def unload_idle(self, max_idle_seconds: float) -> int:
+        """Drop instances idle for longer than max_idle_seconds; return the count."""
+        cutoff = time.monotonic() - max_idle_seconds
+        with self._cond:
+            keep = max(0, self.min_instances - (self._created - len(self._idle)))
+            # Newest instances are at the end; keep those needed for min_instances
+            candidates = len(self._idle) - keep
+            kept: list[tuple[T, float]] = []
+            expired: list[tuple[T, float]] = []
+            for i, entry in enumerate(self._idle):
+                if i < candidates and entry[1] < cutoff:
+                    expired.append(entry)
+                else:
+                    kept.append(entry)
+            if not expired:
+                return 0
+            self._idle = kept
+            self._created -= len(expired)
+            self._cond.notify_all()
+
+        count = len(expired)
+        del expired
+        # Models hold large reference cycles (torch modules); free them now
+        gc.collect()
+        logger.info("Unloaded %d idle %s instance(s)", count, self.name)
+        return count
+
+    @property
+    def loaded(self) -> bool:
+        """Whether at least one instance is loaded."""
+        return self._created > 0
+
+    @property
+    def resident_bytes(self) -> int:
+        """Estimated memory held by the loaded instances."""
+        # Read without the lock: the manager sums this across pools
+        return self._created * self.instance_bytes
+
+    def stats(self) -> dict[str, Any]:
+        """Pool size, instance counts and estimated memory."""
+        with self._cond:
+            return {
+                "size": self.size,
+                "created": self._created,
+                "idle": len(self._idle),
+                "in_use": self._created - len(self._idle),
+                "instance_bytes": self.instance_bytes,
+                "resident_bytes": self._created * self.instance_bytes,
+            }
+
+
+class ModelMemoryManager:
+    """
+    Memory budget and idle unloading shared by all registered model pools.
+
+    A background thread periodically unloads instances that have been idle
+    for longer than idle_ttl_seconds, so rarely used models don't stay
+    resident forever.
+    """
+
+    def __init__(self, budget_bytes: int | None, idle_ttl_seconds: float | None) -> None:
+        """
+        Initialize the manager.
+
+        Args:
+            budget_bytes: Max estimated memory across all pools (None: no limit).
+            idle_ttl_seconds: Unload instances idle this long (None: never).
+        """
+        self.budget_bytes = budget_bytes
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self._pools: list[ModelPool[Any]] = []
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def register(self, pool: "ModelPool[Any]") -> None:
+        """Add a pool to the budget and idle unloading."""
+        self._pools.append(pool)
+
+    @property
+    def resident_bytes(self) -> int:
+        """Estimated memory held by all loaded model instances."""
+        return sum(pool.resident_bytes for pool in self._pools)
+
+    @property
+    def largest_instance_bytes(self) -> int:
+        """Largest estimated instance size across pools (0 if none is measured)."""
+        return max((pool.instance_bytes for pool in self._pools), default=0)
+
+    def fits(self, extra_bytes: int) -> bool:
+        """
+        Whether loading extra_bytes more stays within the budget.
+
+        An instance of unknown size (extra_bytes=0) only fits while the
+        budget is not used up yet.
+        """
+        if self.budget_bytes is None:
+            return True
+        if not extra_bytes:
+            return self.resident_bytes < self.budget_bytes
+        return self.resident_bytes + extra_bytes <= self.budget_bytes
+
+    def unload_idle(self) -> int:
+        """Unload idle instances across all pools; return the count."""
+        if self.idle_ttl_seconds is None:
+            return 0
+        return sum(pool.unload_idle(self.idle_ttl_seconds) for pool in self._pools)
+
+    def start(self) -> None:
+        """Start the idle unloading thread (no-op without an idle TTL)."""
+        if self.idle_ttl_seconds is None or self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="model-unloader", daemon=True
+        )
+        self._thread.start()
+
+    def shutdown(self) -> None:
+        """Stop the idle unloading thread."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        assert self.idle_ttl_seconds is not None
+        interval = min(60.0, max(1.0, self.idle_ttl_seconds / 2))
+        while not self._stop.wait(interval):
+            try:
+                self.unload_idle()
+            except Exception as e:
+                logger.warning("Unloading idle models failed: %s", e)
+
+    def stats(self) -> dict[str, Any]:
+        """Budget, estimated model memory and per-pool counts."""
+        return {
+            "budget_bytes": self.budget_bytes,
+            "idle_ttl_seconds": self.idle_ttl_seconds,
+            "resident_bytes": self.resident_bytes,
+            "process_rss_bytes": resident_memory_bytes(),
+            "pools": {pool.name: pool.stats() for pool in self._pools},
+        }
+
+
+# Singleton instance
+model_memory = ModelMemoryManager(
+    budget_bytes=settings.model_memory_budget_bytes,
+    idle_ttl_seconds=settings.model_idle_ttl_seconds,
+)
@@ -0,0 +1,232 @@
+"""Bounded worker pools for running blocking work off the event loop."""
+
+import asyncio
+import functools
+import logging
+import multiprocessing
+import os
+import threading
+from collections.abc import Callable
+from concurrent.futures import (
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+)
+from typing import Any, TypeVar
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class WorkerPoolBusyError(RuntimeError):
+    """Raised when a worker queue is full and new work is rejected."""
+
+
+def _init_cpu_worker(native_threads: int) -> None:
+    """Limit native threads in a CPU worker so pages don't oversubscribe cores."""
+    # Tesseract is built with OpenMP; one page per worker already fills a core
+    os.environ["OMP_THREAD_LIMIT"] = str(native_threads)
+
+
+class _Lane:
+    """Admission control for one executor: bounded concurrency plus queue depth."""
+
+    def __init__(self, name: str, concurrency: int, queue_depth: int) -> None:
+        self.name = name
+        self.concurrency = concurrency
+        self.queue_depth = queue_depth
+        self.pending = 0
+        self._semaphore: asyncio.Semaphore | None = None
+        # Slots are also taken from worker threads (see WorkerPool.submit_cpu)
+        self._cond = threading.Condition()
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        # Created lazily so it binds to the running event loop
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        return self._semaphore
+
+    @property
+    def running(self) -> int:
+        return min(self.pending, self.concurrency)
+
+    @property
+    def queued(self) -> int:
+        return max(0, self.pending - self.concurrency)
+
+    def _has_room(self) -> bool:
+        return self.pending < self.concurrency + self.queue_depth
+
+    def admit(self) -> None:
+        """Reserve a slot, rejecting the work if the queue is already full."""
+        with self._cond:
+            if not self._has_room():
+                raise WorkerPoolBusyError(
+                    f"Server is busy ({self.name} queue full). "
+                    "Please try again shortly."
+                )
+            self.pending += 1
+
+    def wait_admit(self) -> None:
+        """Reserve a slot, blocking the calling thread until the queue has room."""
+        with self._cond:
+            self._cond.wait_for(self._has_room)
+            self.pending += 1
+
+    def release(self) -> None:
+        with self._cond:
+            self.pending -= 1
+            self._cond.notify()
+
+
+class WorkerPool:
+    """
+    Execution layer for blocking service calls.
+
+    I/O-bound work (extraction orchestration) runs on a thread pool, CPU-bound work
+    (OCR) runs on a process pool so it neither blocks the event loop nor
+    competes for the GIL. Each pool has bounded concurrency and a bounded
+    wait queue; work beyond that is rejected with WorkerPoolBusyError.
+    """
+
+    def __init__(
+        self,
+        io_workers: int,
+        cpu_workers: int,
+        queue_depth: int,
+        cpu_pool_type: str = "process",
+    ) -> None:
+        """Initialize the worker pool (executors are created on start)."""
+        self.io_workers = max(1, io_workers)
+        self.cpu_workers = max(1, cpu_workers)
+        self.cpu_pool_type = cpu_pool_type
+        self._io_lane = _Lane("io", self.io_workers, queue_depth)
+        self._cpu_lane = _Lane("cpu", self.cpu_workers, queue_depth)
+        self._io_executor: ThreadPoolExecutor | None = None
+        self._cpu_executor: Executor | None = None
+        # OCRService reaches the CPU executor from I/O worker threads
+        self._start_lock = threading.Lock()
+
+    def start(self) -> None:
+        """Create the executors if they are not running yet."""
+        with self._start_lock:
+            if self._io_executor is None:
+                self._io_executor = ThreadPoolExecutor(
+                    max_workers=self.io_workers, thread_name_prefix="io-worker"
+                )
+            if self._cpu_executor is None:
+                if self.cpu_pool_type == "process":
+                    # spawn avoids forking a process that already runs event loop threads
+                    self._cpu_executor = ProcessPoolExecutor(
+                        max_workers=self.cpu_workers,
+                        mp_context=multiprocessing.get_context("spawn"),
+                        initializer=_init_cpu_worker,
+                        initargs=(settings.tesseract_threads,),
+                    )
+                else:
+                    self._cpu_executor = ThreadPoolExecutor(
+                        max_workers=self.cpu_workers, thread_name_prefix="cpu-worker"
+                    )
+                logger.info(
+                    "Worker pools started (io=%d threads, cpu=%d %s workers)",
+                    self.io_workers,
+                    self.cpu_workers,
+                    self.cpu_pool_type,
+                )
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Shut down both executors."""
+        if self._io_executor is not None:
+            self._io_executor.shutdown(wait=wait, cancel_futures=True)
+            self._io_executor = None
+        if self._cpu_executor is not None:
+            self._cpu_executor.shutdown(wait=wait, cancel_futures=True)
+            self._cpu_executor = None
+
+    @property
+    def io_executor(self) -> ThreadPoolExecutor:
+        """Thread pool for I/O-bound calls."""
+        self.start()
+        assert self._io_executor is not None
+        return self._io_executor
+
+    @property
+    def cpu_executor(self) -> Executor:
+        """Process (or thread) pool for CPU-bound calls."""
+        self.start()
+        assert self._cpu_executor is not None
+        return self._cpu_executor
+
+    async def run_io(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Run an I/O-bound callable on the thread pool."""
+        return await self._run(self._io_lane, self.io_executor, fn, *args, **kwargs)
+
+    async def run_cpu(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """
+        Run a CPU-bound callable on the CPU pool.
+
+        With a process pool, fn and its arguments must be picklable.
+        """
+        return await self._run(self._cpu_lane, self.cpu_executor, fn, *args, **kwargs)
+
+    def submit_cpu(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> Future[T]:
+        """
+        Submit a CPU-bound callable from a worker thread (never the event loop).
+
+        Goes through the CPU lane like run_cpu, but blocks while its queue is
+        full instead of rejecting: callers fanning out many pieces of one
+        request (pages) are throttled rather than growing the queue.
+        """
+        self._cpu_lane.wait_admit()
+        try:
+            future = self.cpu_executor.submit(fn, *args, **kwargs)
+        except BaseException:
+            self._cpu_lane.release()
+            raise
+        # Also runs when the future is cancelled
+        future.add_done_callback(lambda _: self._cpu_lane.release())
+        return future
+
+    async def _run(
+        self,
+        lane: _Lane,
+        executor: Executor,
+        fn: Callable[..., T],
+        *args: Any,
+        **kwargs: Any,
+    ) -> T:
+        lane.admit()
+        try:
+            async with lane.semaphore:
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(
+                    executor, functools.partial(fn, *args, **kwargs)
+                )
+        finally:
+            lane.release()
+
+    def stats(self) -> dict[str, dict[str, int]]:
+        """Current load per lane."""
+        return {
+            lane.name: {
+                "workers": lane.concurrency,
+                "running": lane.running,
+                "queued": lane.queued,
+                "max_queue_depth": lane.queue_depth,
+            }
+            for lane in (self._io_lane, self._cpu_lane)
+        }
+
+
+# Singleton instance
+worker_pool = WorkerPool(
+    io_workers=settings.io_workers,
+    cpu_workers=settings.cpu_workers or os.cpu_count() or 1,
+    queue_depth=settings.worker_queue_depth,
+    cpu_pool_type=settings.cpu_pool_type,
+)
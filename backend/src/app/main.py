@@ -7,8 +7,13 @@ from collections.abc import AsyncIterator
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from app.api.jobs import job_manager
 from app.api.routes import router
 from app.core.config import settings
+from app.core.model_pool import model_memory
+from app.core.workers import worker_pool
+from app.services.ai_matcher_service import ai_matcher_service
+from app.services.ocr_service import OCRMode, ocr_service
 
 # Configure logging
 logging.basicConfig(
@@ -24,9 +29,18 @@ async def lifespan(app: FastAPI) -> AsyncIterator[None]:
     """Application lifespan events."""
     # Startup
     logger.info("Starting %s...", settings.app_name)
+    worker_pool.start()
+    await job_manager.recover()
+    model_memory.start()
+    if settings.ocr_warmup_modes:
+        ocr_service.start_warm_up([OCRMode(mode) for mode in settings.ocr_warmup_modes])
     yield
     # Shutdown
     logger.info("Shutting down...")
+    await job_manager.shutdown()
+    model_memory.shutdown()
+    await ai_matcher_service.aclose()
+    worker_pool.shutdown()
 
 
 def create_app() -> FastAPI:
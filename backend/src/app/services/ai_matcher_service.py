@@ -1,56 +1,167 @@
 """AI service for matching PDF data to form fields."""
 
+import asyncio
+import hashlib
 import json
 import logging
-
-from openai import OpenAI, AuthenticationError, APIConnectionError, RateLimitError
-
+import random
+from collections import Counter
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from typing import Any
+
+import httpx
+from openai import (
+    APIConnectionError,
+    AsyncOpenAI,
+    AuthenticationError,
+    RateLimitError,
+)
+
+from app.core.cache import LRUCache
 from app.core.config import settings
+from app.services.context_selector import estimate_tokens, select_context
+from app.services.field_batches import batch_fields
+from app.services.json_stream import JSONObjectStream
+from app.services.match_cache import match_cache, match_cache_key
+from app.services.option_index import option_index
 
 logger = logging.getLogger(__name__)
 
+# Called with each mapping as soon as it's known
+MappingCallback = Callable[[dict[str, str]], None]
+
+
+def _http_limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=settings.openai_max_connections,
+        max_keepalive_connections=settings.openai_max_keepalive_connections,
+        keepalive_expiry=settings.openai_keepalive_expiry,
+    )
+
+
+# Same as the OpenAI SDK defaults
+_HTTP_TIMEOUT = httpx.Timeout(timeout=600.0, connect=5.0)
+
+# Bump when the prompt or response handling changes, to invalidate cached matches
+PROMPT_VERSION = "5"
+
+
+class MatchRateLimitError(RuntimeError):
+    """Raised when OpenAI rate limits a request."""
+
+    def __init__(self, message: str, retry_after: float | None = None) -> None:
+        """Initialize with the server's Retry-After (seconds), if it sent one."""
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def _retry_after(error: RateLimitError) -> float | None:
+    try:
+        return float(error.response.headers.get("retry-after", ""))
+    except (AttributeError, ValueError):
+        return None
+
+
+def _retry_delay(attempt: int, retry_after: float | None = None) -> float:
+    """Jittered exponential backoff before retry number attempt (1-based)."""
+    delay = settings.match_retry_backoff_seconds * 2.0 ** (attempt - 1)
+    # Jitter spreads out the retries of concurrent batches hitting the same limit
+    delay *= random.uniform(0.5, 1.5)
+    return max(delay, retry_after or 0.0)
+
+
+def _prompt_fingerprint() -> str:
+    """Model, prompt version and settings that shape the matching answer."""
+    return (
+        f"model={settings.openai_model};prompt={PROMPT_VERSION};"
+        f"ctx={settings.context_token_budget};batch={settings.field_batch_max_tokens};"
+        f"options={settings.option_candidates_top_k}"
+    )
+
+
+def _key_hash(api_key: str) -> str:
+    """Cache key for a client; the API key itself is never kept as a key."""
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()
+
 
 class AIMatcherService:
     """Service for AI-powered field matching."""
 
     def __init__(self) -> None:
         """Initialize the AI service."""
-        self.default_client: OpenAI | None = None
-        if settings.openai_api_key:
-            self.default_client = OpenAI(api_key=settings.openai_api_key)
+        # One keep-alive connection pool shared by all clients, whatever their
+        # key; created on first use and again after aclose()
+        self._async_http_client: httpx.AsyncClient | None = None
+        # Clients per API key hash; each entry counts as 1 towards the size
+        self._async_clients: LRUCache[AsyncOpenAI] = LRUCache(
+            settings.openai_client_cache_size, sizeof=lambda _: 1
+        )
 
-    def _get_client(self, api_key: str | None = None) -> OpenAI:
-        """Get OpenAI client, using provided key or falling back to default."""
+    @staticmethod
+    def _resolve_api_key(api_key: str | None) -> str:
+        """Return the provided key, or the configured default key."""
         # Clean the API key (remove any whitespace/newlines that might have been copied)
         if api_key:
             api_key = api_key.strip()
         
-        logger.debug("_get_client called with api_key: %s", f"sk-...{api_key[-4:]}" if api_key else "None")
-        logger.debug("API key length: %d", len(api_key) if api_key else 0)
+        logger.debug("API key: %s", f"sk-...{api_key[-4:]}" if api_key else "None")
         
         if api_key:
-            logger.debug("Creating new OpenAI client with user-provided key")
-            return OpenAI(api_key=api_key)
-        if self.default_client:
-            logger.debug("Using default client from settings")
-            return self.default_client
+            return api_key
+        if settings.openai_api_key:
+            logger.debug("Using default API key from settings")
+            return settings.openai_api_key
         raise ValueError(
             "No OpenAI API key configured. Please provide your API key in the extension settings."
         )
 
-    def match_fields(
+    def _get_async_client(self, api_key: str | None = None) -> AsyncOpenAI:
+        """Get a cached async OpenAI client for the provided key or the default key."""
+        api_key = self._resolve_api_key(api_key)
+        cache_key = _key_hash(api_key)
+        client = self._async_clients.get(cache_key)
+        if client is None:
+            logger.debug("Creating async OpenAI client for key %s", cache_key[:8])
+            if self._async_http_client is None:
+                self._async_http_client = httpx.AsyncClient(
+                    limits=_http_limits(), timeout=_HTTP_TIMEOUT
+                )
+            client = AsyncOpenAI(api_key=api_key, http_client=self._async_http_client)
+            self._async_clients.put(cache_key, client)
+        return client
+
+    async def aclose(self) -> None:
+        """Close the shared connection pool; later requests open a new one."""
+        self._async_clients.clear()
+        http_client, self._async_http_client = self._async_http_client, None
+        if http_client is not None:
+            await http_client.aclose()
+
+    async def match_fields_async(
         self,
         extracted_text: str,
         form_fields: list[dict[str, str]],
         api_key: str | None = None,
+        on_mapping: MappingCallback | None = None,
     ) -> list[dict[str, str]]:
         """
         Use GPT to match extracted PDF text to form fields.
 
+        Mappings that are malformed, missing from the answer or not one of a
+        field's options are re-queried (only those fields) up to
+        match_retry_attempts times with jittered backoff; rate-limited
+        requests are retried the same way before giving up.
+
+        With on_mapping (and openai_stream_completions enabled) the answer is
+        streamed and every mapping is reported as soon as its JSON object is
+        complete, long before the whole completion has arrived.
+
         Args:
             extracted_text: Text extracted from the PDF via OCR.
             form_fields: List of form field definitions from the page.
             api_key: Optional user-provided OpenAI API key.
+            on_mapping: Optional callback for each mapping as it's parsed.
 
         Returns:
             List of field mappings with values.
@@ -58,13 +169,190 @@ class AIMatcherService:
         Raises:
             ValueError: If no API key is available or key is invalid.
             ConnectionError: If unable to connect to OpenAI.
-            RuntimeError: If rate limited by OpenAI.
+            RuntimeError: If still rate limited by OpenAI after retrying.
+        """
+        client = self._get_async_client(api_key)
+        cache_key, cached = self._cached(extracted_text, form_fields)
+        if cached is not None:
+            if on_mapping is not None:
+                for mapping in cached:
+                    on_mapping(mapping)
+            return cached
+        slots = asyncio.Semaphore(settings.max_concurrent_field_batches)
+        stream = on_mapping is not None and settings.openai_stream_completions
+
+        async def query(fields: list[dict[str, str]]) -> list[dict[str, str]]:
+            async with slots:
+                if stream:
+                    assert on_mapping is not None
+                    return await self._stream_batch(
+                        client, extracted_text, fields, on_mapping
+                    )
+                with self._openai_errors():
+                    response = await client.chat.completions.create(
+                        **self._completion_args(extracted_text, fields)
+                    )
+            return self._parse_mappings(response.choices[0].message.content, fields)
+
+        async def match_batch(fields: list[dict[str, str]]) -> list[dict[str, str]]:
+            mappings: list[dict[str, str]] = []
+            pending = fields
+            retry_after: float | None = None
+            for attempt in range(settings.match_retry_attempts + 1):
+                if attempt:
+                    # Wait outside the batch slots so other batches can run
+                    await asyncio.sleep(_retry_delay(attempt, retry_after))
+                try:
+                    answer = await query(pending)
+                except MatchRateLimitError as e:
+                    if attempt == settings.match_retry_attempts:
+                        raise
+                    retry_after = e.retry_after
+                    continue
+                retry_after = None
+                mappings.extend(answer)
+                pending = self._unanswered(pending, answer, attempt)
+                if not pending:
+                    break
+            return mappings
+
+        batches = self._field_batches(form_fields)
+        results = await asyncio.gather(*(match_batch(batch) for batch in batches))
+        return self._store(cache_key, self._merge_mappings(form_fields, list(results)))
+
+    async def _stream_batch(
+        self,
+        client: AsyncOpenAI,
+        extracted_text: str,
+        form_fields: list[dict[str, str]],
+        on_mapping: MappingCallback,
+    ) -> list[dict[str, str]]:
+        """Stream one batch's answer, reporting each valid requested field once."""
+        pending = {f.get("id", ""): f for f in form_fields}
+        parser = JSONObjectStream()
+        mappings: list[dict[str, str]] = []
+        with self._openai_errors():
+            chunks = await client.chat.completions.create(
+                **self._completion_args(extracted_text, form_fields), stream=True
+            )
+            async for chunk in chunks:
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if not delta:
+                    continue
+                for obj in parser.feed(delta):
+                    form_field = pending.get(str(obj.get("fieldId", "")))
+                    mapping = self._validate_mapping(obj, form_field)
+                    if mapping is None:
+                        continue
+                    del pending[mapping["fieldId"]]
+                    mappings.append(mapping)
+                    on_mapping(mapping)
+        if not mappings:
+            # Not an array of objects; let the regular parser have a go
+            return self._parse_mappings(parser.text, form_fields)
+        return mappings
+
+    @staticmethod
+    def _cached(
+        extracted_text: str, form_fields: list[dict[str, str]]
+    ) -> tuple[str | None, list[dict[str, str]] | None]:
+        """Look up a previous answer for the same text and form (key, mappings)."""
+        if not settings.match_cache_enabled:
+            return None, None
+        cache_key = match_cache_key(extracted_text, form_fields, _prompt_fingerprint())
+        cached = match_cache.get(cache_key, form_fields)
+        if cached is not None:
+            logger.debug("Match cache hit for %s", cache_key[:12])
+        return cache_key, cached
+
+    @staticmethod
+    def _store(
+        cache_key: str | None, mappings: list[dict[str, str]]
+    ) -> list[dict[str, str]]:
+        """Cache mappings unless nothing was matched (likely a failed answer)."""
+        if cache_key and any(m.get("value") for m in mappings):
+            match_cache.put(cache_key, mappings)
+        return mappings
+
+    @staticmethod
+    def get_cache_stats() -> dict[str, Any]:
+        """Get match cache hit/miss counters and sizes."""
+        return match_cache.stats()
+
+    @staticmethod
+    def _field_batches(form_fields: list[dict[str, str]]) -> list[list[dict[str, str]]]:
+        """
+        Split large forms so each batch's JSON answer fits in max_tokens.
+
+        One request for 80+ fields would truncate the answer and lose every
+        mapping; batches run concurrently instead.
         """
-        client = self._get_client(api_key)
+        batches = batch_fields(form_fields, settings.field_batch_max_tokens)
+        if len(batches) > 1:
+            logger.debug("Matching %d fields in %d batches", len(form_fields), len(batches))
+        return batches or [[]]
+
+    @staticmethod
+    def _unanswered(
+        form_fields: list[dict[str, str]],
+        mappings: list[dict[str, str]],
+        attempt: int,
+    ) -> list[dict[str, str]]:
+        """Fields without a valid mapping in the answer, to be re-queried."""
+        answered = {m["fieldId"] for m in mappings}
+        missing = [f for f in form_fields if f.get("id", "") not in answered]
+        if missing:
+            logger.info(
+                "Answer %d lacked %d of %d field(s)",
+                attempt + 1,
+                len(missing),
+                len(form_fields),
+            )
+        return missing
 
+    def _merge_mappings(
+        self,
+        form_fields: list[dict[str, str]],
+        results: list[list[dict[str, str]]],
+    ) -> list[dict[str, str]]:
+        """Combine batch answers by fieldId, in form order, filling in missing fields."""
+        by_id: dict[str, dict[str, str]] = {}
+        for mappings in results:
+            for mapping in mappings:
+                if isinstance(mapping, dict) and mapping.get("fieldId"):
+                    by_id.setdefault(str(mapping["fieldId"]), mapping)
+
+        merged: list[dict[str, str]] = []
+        for field, empty in zip(form_fields, self._empty_mappings(form_fields), strict=True):
+            merged.append(by_id.get(field.get("id", ""), empty))
+        return merged
+
+    def _completion_args(
+        self, extracted_text: str, form_fields: list[dict[str, str]]
+    ) -> dict[str, Any]:
+        """Chat completion request for matching the text to the fields."""
+        # Rank option candidates on the whole text: the passage naming the
+        # right option may not make it into the selected context
+        option_lists = self._prompt_options(extracted_text, form_fields)
+        if settings.context_token_budget is not None:
+            original_tokens = estimate_tokens(extracted_text)
+            extracted_text = select_context(
+                extracted_text, form_fields, settings.context_token_budget
+            )
+            logger.debug(
+                "Context selection: ~%d -> ~%d tokens",
+                original_tokens,
+                estimate_tokens(extracted_text),
+            )
         # Build the prompt with enhanced field descriptions
+        list_uses = Counter(options for options in option_lists if options)
+        shared_lists: dict[tuple[str, ...], str] = {}
+        for options, uses in list_uses.items():
+            if uses > 1:
+                shared_lists[options] = f"list{len(shared_lists) + 1}"
+
         fields_for_prompt: list[dict[str, object]] = []
-        for field in form_fields:
+        for field, options in zip(form_fields, option_lists, strict=True):
             field_desc: dict[str, object] = {
                 "id": field.get("id"),
                 "name": field.get("name"),
@@ -72,12 +360,19 @@ class AIMatcherService:
                 "type": field.get("type"),
                 "placeholder": field.get("placeholder"),
             }
-            # Include options if available
-            if field.get("options"):
-                field_desc["availableOptions"] = field.get("options")
+            # Include options if available; lists used by several fields once
+            if options in shared_lists:
+                field_desc["availableOptions"] = shared_lists[options]
+            elif options:
+                field_desc["availableOptions"] = list(options)
             fields_for_prompt.append(field_desc)
         
         fields_description = json.dumps(fields_for_prompt, indent=2)
+        if shared_lists:
+            fields_description += "\n\n## Shared Option Lists:\n" + json.dumps(
+                {name: list(options) for options, name in shared_lists.items()},
+                indent=2,
+            )
 
         prompt = f"""You are a form-filling assistant. I have extracted text from a PDF document and need to fill in a web form.
 
@@ -106,6 +401,7 @@ Return a JSON array with this structure:
 ### Translation & Semantic Matching:
 - The PDF and form may be in DIFFERENT LANGUAGES. You MUST match by MEANING, not literal text.
 - If a field has "availableOptions", you MUST return a value that EXACTLY matches one of those options.
+- If "availableOptions" is a name like "list1", the options are that list under "Shared Option Lists".
 - Translate PDF content to match the form's language when selecting from options.
 
 ### Examples of translation matching:
@@ -133,38 +429,44 @@ Return a JSON array with this structure:
 
 JSON Response:"""
 
-        try:
-            response = client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are a helpful assistant that extracts and matches form data. You excel at cross-language matching - translating content to find the correct option. Always respond with valid JSON only.",
-                    },
-                    {"role": "user", "content": prompt},
-                ],
-                temperature=0.1,
-                max_tokens=2000,
-            )
-
-            content = response.choices[0].message.content
-            if not content:
-                return self._empty_mappings(form_fields)
-
-            # Parse the JSON response
-            # Clean up response if needed
-            content = content.strip()
-            if content.startswith("```json"):
-                content = content[7:]
-            if content.startswith("```"):
-                content = content[3:]
-            if content.endswith("```"):
-                content = content[:-3]
-            content = content.strip()
-
-            mappings = json.loads(content)
-            return mappings  # type: ignore[no-any-return]
+        return {
+            "model": settings.openai_model,
+            "messages": [
+                {
+                    "role": "system",
+                    "content": "You are a helpful assistant that extracts and matches form data. You excel at cross-language matching - translating content to find the correct option. Always respond with valid JSON only.",
+                },
+                {"role": "user", "content": prompt},
+            ],
+            "temperature": 0.1,
+            "max_tokens": settings.completion_max_tokens,
+        }
+
+    @staticmethod
+    def _prompt_options(
+        extracted_text: str, form_fields: list[dict[str, str]]
+    ) -> list[tuple[str, ...]]:
+        """
+        Options to show the model for each field.
 
+        Lists longer than option_candidates_top_k are narrowed to the options
+        the text mentions (in any language known to the option index), so a
+        200-country dropdown doesn't dominate the prompt.
+        """
+        top_k = settings.option_candidates_top_k
+        option_lists: list[tuple[str, ...]] = []
+        for field in form_fields:
+            options = [str(o) for o in field.get("options") or []]
+            if top_k is not None and len(options) > top_k:
+                options = option_index(options).candidates(extracted_text, top_k)
+            option_lists.append(tuple(options))
+        return option_lists
+
+    @contextmanager
+    def _openai_errors(self) -> Iterator[None]:
+        """Translate OpenAI errors into the exceptions callers handle."""
+        try:
+            yield
         except AuthenticationError as e:
             logger.error("OpenAI AuthenticationError: %s", e)
             raise ValueError(
@@ -177,16 +479,91 @@ JSON Response:"""
             ) from e
         except RateLimitError as e:
             logger.warning("OpenAI RateLimitError: %s", e)
-            raise RuntimeError(
-                "OpenAI rate limit exceeded. Please wait a moment and try again."
+            raise MatchRateLimitError(
+                "OpenAI rate limit exceeded. Please wait a moment and try again.",
+                retry_after=_retry_after(e),
             ) from e
-        except json.JSONDecodeError as e:
-            logger.warning("JSON parsing error from AI response: %s", e)
-            return self._empty_mappings(form_fields)
         except Exception as e:
             logger.exception("Unexpected error in AI matching: %s", e)
             raise RuntimeError(f"AI processing failed: {e!s}") from e
 
+    def _parse_mappings(
+        self, content: str | None, form_fields: list[dict[str, str]]
+    ) -> list[dict[str, str]]:
+        """
+        Parse the model's JSON answer into valid mappings of the requested fields.
+
+        A malformed or truncated answer is salvaged object by object. Fields
+        without a valid mapping are left out, for the caller to re-query.
+        """
+        if not content:
+            return []
+
+        # Clean up response if needed
+        content = content.strip()
+        if content.startswith("```json"):
+            content = content[7:]
+        if content.startswith("```"):
+            content = content[3:]
+        if content.endswith("```"):
+            content = content[:-3]
+        content = content.strip()
+
+        try:
+            answer = json.loads(content)
+        except json.JSONDecodeError as e:
+            answer = JSONObjectStream().feed(content)
+            logger.warning(
+                "JSON parsing error from AI response (%s); salvaged %d object(s)",
+                e,
+                len(answer),
+            )
+        if isinstance(answer, dict):
+            answer = [answer]
+        if not isinstance(answer, list):
+            return []
+
+        pending = {f.get("id", ""): f for f in form_fields}
+        mappings: list[dict[str, str]] = []
+        for obj in answer:
+            if not isinstance(obj, dict):
+                continue
+            form_field = pending.get(str(obj.get("fieldId", "")))
+            mapping = self._validate_mapping(obj, form_field)
+            if mapping is not None:
+                del pending[mapping["fieldId"]]
+                mappings.append(mapping)
+        return mappings
+
+    @staticmethod
+    def _validate_mapping(
+        obj: dict[str, Any], form_field: dict[str, str] | None
+    ) -> dict[str, str] | None:
+        """Normalize one answered mapping; None if it isn't a usable answer."""
+        if form_field is None:
+            return None
+        value = obj.get("value")
+        if value is None:
+            value = ""
+        elif isinstance(value, int | float) and not isinstance(value, bool):
+            value = str(value)
+        elif not isinstance(value, str):
+            return None
+        options = form_field.get("options")
+        if value and options:
+            # Must name one of the options; snap translations, case and
+            # accent differences to the exact option text
+            option = option_index([str(o) for o in options]).snap(value)
+            if option is None:
+                return None
+            value = option
+        return {
+            "fieldId": form_field.get("id", ""),
+            "fieldName": form_field.get("label") or form_field.get("name", ""),
+            "fieldType": form_field.get("type", "text"),
+            "value": value,
+        }
+
     def _empty_mappings(
         self, form_fields: list[dict[str, str]]
     ) -> list[dict[str, str]]:
@@ -0,0 +1,185 @@
+"""Select the passages of extracted text most relevant to a form's fields."""
+
+import math
+import re
+from collections import Counter
+from collections.abc import Iterable, Mapping, Sequence
+from dataclasses import dataclass, field
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+# camelCase and letter/digit boundaries in field names ("dateOfBirth2" -> date Of Birth 2)
+_SPLIT_RE = re.compile(r"(?<=[a-z])(?=[A-Z])|(?<=[^\W\d_])(?=\d)|(?<=\d)(?=[^\W\d_])")
+# File annotations added by the pipeline for multi-file requests
+_FILE_HEADER_RE = re.compile(r"^--- Content from: .* ---$")
+
+# Field attributes that describe what the field asks for
+_QUERY_KEYS = ("label", "name", "placeholder", "id")
+
+# Rough characters per token for budget estimates (no tokenizer dependency)
+_CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate the number of LLM tokens in text."""
+    return math.ceil(len(text) / _CHARS_PER_TOKEN)
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercased word tokens, with camelCase and snake_case split apart."""
+    tokens: list[str] = []
+    for word in _WORD_RE.findall(text):
+        for part in _SPLIT_RE.sub(" ", word).replace("_", " ").split():
+            tokens.append(part.lower())
+    return tokens
+
+
+@dataclass
+class Passage:
+    """A few adjacent lines of extracted text."""
+
+    index: int  # Position in the document
+    text: str
+    header: str | None = None  # File annotation the passage belongs to
+    tokens: list[str] = field(default_factory=list)
+
+
+def split_passages(text: str, max_lines: int = 6) -> list[Passage]:
+    """
+    Split text into passages at blank lines, at most max_lines lines each.
+
+    Short paragraphs keep a label and its value (often on the next line)
+    together; long ones are cut into windows so one passage can't take the
+    whole budget.
+    """
+    passages: list[Passage] = []
+    header: str | None = None
+    paragraph: list[str] = []
+
+    def flush() -> None:
+        for start in range(0, len(paragraph), max_lines):
+            chunk = "\n".join(paragraph[start : start + max_lines])
+            passages.append(Passage(len(passages), chunk, header, tokenize(chunk)))
+        paragraph.clear()
+
+    for raw_line in text.split("\n"):
+        line = raw_line.strip()
+        if _FILE_HEADER_RE.match(line):
+            flush()
+            header = line
+        elif line:
+            paragraph.append(line)
+        else:
+            flush()
+    flush()
+    return passages
+
+
+class BM25:
+    """Okapi BM25 ranking over tokenized passages (inverted index)."""
+
+    def __init__(self, documents: list[list[str]], k1: float = 1.5, b: float = 0.75) -> None:
+        """Index the documents."""
+        self.k1 = k1
+        lengths = [len(doc) for doc in documents]
+        avg_length = (sum(lengths) / len(documents) if documents else 0.0) or 1.0
+        # Length normalization per document
+        self._norms = [k1 * (1 - b + b * length / avg_length) for length in lengths]
+        self._postings: dict[str, list[tuple[int, int]]] = {}
+        for doc_id, doc in enumerate(documents):
+            for term, tf in Counter(doc).items():
+                self._postings.setdefault(term, []).append((doc_id, tf))
+        n = len(documents)
+        self._idf = {
+            term: math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+            for term, postings in self._postings.items()
+        }
+
+    def scores(self, query: Iterable[str]) -> dict[int, float]:
+        """Scores of the documents matching at least one query term."""
+        results: dict[int, float] = {}
+        for term in set(query):
+            idf = self._idf.get(term)
+            if idf is None:
+                continue
+            for doc_id, tf in self._postings[term]:
+                score = idf * tf * (self.k1 + 1) / (tf + self._norms[doc_id])
+                results[doc_id] = results.get(doc_id, 0.0) + score
+        return results
+
+
+def field_query(form_field: Mapping[str, object]) -> list[str]:
+    """Query terms describing one form field."""
+    terms: list[str] = []
+    for key in _QUERY_KEYS:
+        value = form_field.get(key)
+        if isinstance(value, str):
+            terms.extend(tokenize(value))
+    return terms
+
+
+def select_context(
+    text: str,
+    form_fields: Sequence[Mapping[str, object]],
+    token_budget: int,
+) -> str:
+    """
+    Keep only the passages most relevant to the form fields, within a token budget.
+
+    Every field ranks the passages with BM25; passages are then taken round
+    robin over the fields' rankings (each field's best passage first, then
+    each field's second best, ...) so fields with rare labels still get
+    their evidence. Budget left over after that is filled with the other
+    passages in document order, so fields whose labels are worded
+    differently in the document (or in another language) still see the
+    text around the matched passages. The selected passages are returned in
+    document order with their file annotations.
+
+    The full text is returned if it already fits the budget; if not even a
+    single passage fits, the text is cut off at the budget.
+    """
+    if estimate_tokens(text) <= token_budget:
+        return text
+
+    passages = split_passages(text)
+    if not passages:
+        return text
+    index = BM25([passage.tokens for passage in passages])
+
+    rankings: list[list[int]] = []
+    for form_field in form_fields:
+        scores = index.scores(field_query(form_field))
+        ranked = sorted(scores, key=lambda i: (-scores[i], i))
+        if ranked:
+            rankings.append(ranked)
+
+    selected: set[int] = set()
+    used_tokens = 0
+
+    def take(passage: Passage) -> None:
+        nonlocal used_tokens
+        cost = estimate_tokens(passage.text) + 1
+        if passage.index not in selected and used_tokens + cost <= token_budget:
+            selected.add(passage.index)
+            used_tokens += cost
+
+    for rank in range(max((len(ranking) for ranking in rankings), default=0)):
+        for ranking in rankings:
+            if rank < len(ranking):
+                take(passages[ranking[rank]])
+    for passage in passages:
+        take(passage)
+
+    if not selected:
+        return text[: token_budget * _CHARS_PER_TOKEN]
+    return _join_passages(passages[i] for i in sorted(selected))
+
+
+def _join_passages(passages: Iterable[Passage]) -> str:
+    parts: list[str] = []
+    header: str | None = None
+    for passage in passages:
+        if passage.header and passage.header != header:
+            parts.append(passage.header)
+            header = passage.header
+        parts.append(passage.text)
+    return "\n\n".join(parts)
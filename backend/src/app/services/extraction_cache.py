@@ -0,0 +1,169 @@
+"""Content-addressed cache for extracted document text."""
+
+import hashlib
+import logging
+import os
+import threading
+import zlib
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any
+
+from app.core.cache import LRUCache
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def extraction_cache_key(file_bytes: bytes, *parts: str) -> str:
+    """Hash the decoded file bytes together with the settings that shape the output."""
+    digest = hashlib.sha256(file_bytes)
+    for part in parts:
+        digest.update(b"\0")
+        digest.update(part.encode("utf-8"))
+    return digest.hexdigest()
+
+
+class _DiskTier:
+    """zlib-compressed text files under a directory, evicted oldest first."""
+
+    def __init__(self, directory: Path, max_bytes: int) -> None:
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._size = sum(p.stat().st_size for p in self._files())
+
+    def _files(self) -> list[Path]:
+        return list(self.directory.glob("*/*.txt.z"))
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.txt.z"
+
+    def get(self, key: str) -> str | None:
+        path = self._path(key)
+        try:
+            data = path.read_bytes()
+            # Refresh mtime so eviction approximates LRU
+            os.utime(path)
+            return zlib.decompress(data).decode("utf-8")
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Dropping unreadable cache entry {path.name}: {e}")
+            path.unlink(missing_ok=True)
+            return None
+
+    def put(self, key: str, text: str) -> None:
+        path = self._path(key)
+        data = zlib.compress(text.encode("utf-8"))
+        try:
+            path.parent.mkdir(exist_ok=True)
+            # Write to a temp file and rename so readers never see partial files
+            tmp_path = path.with_suffix(f".tmp{threading.get_ident()}")
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not write extraction cache entry: {e}")
+            return
+        with self._lock:
+            self._size += len(data)
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _evict(self) -> None:
+        """Delete the least recently used files until under 90% of the budget."""
+        files: list[tuple[float, int, Path]] = []
+        for path in self._files():
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+        files.sort()
+        self._size = sum(size for _, size, _ in files)
+        target = int(self.max_bytes * 0.9)
+        for _, size, path in files:
+            if self._size <= target:
+                break
+            path.unlink(missing_ok=True)
+            self._size -= size
+
+    @property
+    def size_bytes(self) -> int:
+        return self._size
+
+
+class ExtractionCache:
+    """
+    Two-tier cache of extracted text keyed by a hash of the document.
+
+    The memory tier is an LRU bounded by bytes. The optional disk tier stores
+    compressed entries that survive restarts; disk hits are promoted to memory.
+    """
+
+    def __init__(
+        self,
+        max_memory_bytes: int,
+        directory: str | None = None,
+        max_disk_bytes: int = 0,
+    ) -> None:
+        """Initialize the cache; the disk tier is enabled when directory is set."""
+        self._memory: LRUCache[str] = LRUCache(
+            max_memory_bytes, sizeof=lambda text: len(text.encode("utf-8"))
+        )
+        self._disk: _DiskTier | None = None
+        if directory:
+            try:
+                self._disk = _DiskTier(Path(directory), max_disk_bytes)
+            except OSError as e:
+                logger.warning(f"Extraction disk cache disabled: {e}")
+        self._disk_hits = 0
+        self._misses = 0
+
+    def get(self, key: str) -> str | None:
+        """Look the key up in memory, then on disk."""
+        text = self._memory.get(key)
+        if text is not None:
+            return text
+        if self._disk is not None:
+            text = self._disk.get(key)
+            if text is not None:
+                self._disk_hits += 1
+                self._memory.put(key, text)
+                return text
+        self._misses += 1
+        return None
+
+    def put(self, key: str, text: str) -> None:
+        """Store text in memory and, if enabled, on disk."""
+        self._memory.put(key, text)
+        if self._disk is not None:
+            self._disk.put(key, text)
+
+    def clear(self) -> None:
+        """Drop the memory tier (the disk tier is left in place)."""
+        self._memory.clear()
+
+    def stats(self) -> dict[str, Any]:
+        """Hit/miss counters and sizes for both tiers."""
+        memory = asdict(self._memory.stats())
+        return {
+            "hits": memory["hits"] + self._disk_hits,
+            "misses": self._misses,
+            "memory_hits": memory["hits"],
+            "disk_hits": self._disk_hits,
+            "entries": memory["entries"],
+            "memory_bytes": memory["size_bytes"],
+            "max_memory_bytes": memory["max_bytes"],
+            "disk_enabled": self._disk is not None,
+            "disk_bytes": self._disk.size_bytes if self._disk else 0,
+        }
+
+
+# Singleton instance
+extraction_cache = ExtractionCache(
+    max_memory_bytes=settings.extraction_cache_max_bytes,
+    directory=settings.extraction_cache_dir,
+    max_disk_bytes=settings.extraction_cache_max_disk_bytes,
+)
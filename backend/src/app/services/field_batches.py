@@ -0,0 +1,46 @@
+"""Split form fields into groups whose answers fit one completion."""
+
+import json
+from collections.abc import Mapping, Sequence
+from typing import TypeVar
+
+from app.services.context_selector import estimate_tokens
+
+F = TypeVar("F", bound=Mapping[str, object])
+
+# Output tokens allowed for the value of one field (names, dates, addresses)
+VALUE_TOKENS = 24
+
+
+def estimate_answer_tokens(form_field: Mapping[str, object]) -> int:
+    """Approximate output tokens of one field's entry in the JSON answer."""
+    entry = {
+        "fieldId": form_field.get("id", ""),
+        "fieldName": form_field.get("label") or form_field.get("name", ""),
+        "fieldType": form_field.get("type", "text"),
+        "value": "",
+    }
+    return estimate_tokens(json.dumps(entry, indent=2)) + VALUE_TOKENS
+
+
+def batch_fields(form_fields: Sequence[F], max_output_tokens: int) -> list[list[F]]:
+    """
+    Partition fields, in form order, into batches under an output token budget.
+
+    Neighbouring fields (address parts, name parts) usually stay in the same
+    batch. A single field larger than the budget still gets a batch of its own.
+    """
+    batches: list[list[F]] = []
+    current: list[F] = []
+    current_tokens = 0
+    for form_field in form_fields:
+        tokens = estimate_answer_tokens(form_field)
+        if current and current_tokens + tokens > max_output_tokens:
+            batches.append(current)
+            current = []
+            current_tokens = 0
+        current.append(form_field)
+        current_tokens += tokens
+    if current:
+        batches.append(current)
+    return batches
@@ -0,0 +1,173 @@
+"""Pluggable storage for background processing jobs."""
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import asdict, dataclass, field
+from enum import Enum
+from pathlib import Path
+from typing import Any, Protocol
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class JobStatus(str, Enum):
+    """Lifecycle states of a job."""
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+    @property
+    def finished(self) -> bool:
+        return self in (JobStatus.SUCCEEDED, JobStatus.FAILED, JobStatus.CANCELLED)
+
+
+@dataclass
+class JobRecord:
+    """State and (partial) results of a job."""
+
+    id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    status: JobStatus = JobStatus.QUEUED
+    created_at: float = field(default_factory=time.time)
+    updated_at: float = field(default_factory=time.time)
+    # Partial results, filled in as the job progresses
+    pages: list[dict[str, Any]] = field(default_factory=list)
+    files_completed: list[str] = field(default_factory=list)
+    mappings: list[dict[str, Any]] = field(default_factory=list)
+    # Final ProcessPdfResponse payload once succeeded
+    result: dict[str, Any] | None = None
+    error: str | None = None
+    error_status: int | None = None
+
+    def to_json(self) -> str:
+        """Serialize for persistent stores."""
+        return json.dumps(asdict(self))
+
+    @classmethod
+    def from_json(cls, data: str) -> "JobRecord":
+        """Deserialize a stored record."""
+        raw = json.loads(data)
+        raw["status"] = JobStatus(raw["status"])
+        return cls(**raw)
+
+
+class JobStore(Protocol):
+    """Storage backend for job records."""
+
+    def save(self, job: JobRecord) -> None:
+        """Insert or replace a job record."""
+        ...
+
+    def get(self, job_id: str) -> JobRecord | None:
+        """Look up a job record by id."""
+        ...
+
+    def delete_finished_before(self, timestamp: float) -> int:
+        """Delete finished jobs last updated before timestamp; return the count."""
+        ...
+
+    def unfinished(self) -> list[JobRecord]:
+        """Jobs that are still queued or running."""
+        ...
+
+
+class InMemoryJobStore:
+    """Job store kept in process memory (lost on restart)."""
+
+    def __init__(self) -> None:
+        """Initialize an empty store."""
+        self._jobs: dict[str, JobRecord] = {}
+        self._lock = threading.Lock()
+
+    def save(self, job: JobRecord) -> None:
+        job.updated_at = time.time()
+        with self._lock:
+            self._jobs[job.id] = job
+
+    def get(self, job_id: str) -> JobRecord | None:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def delete_finished_before(self, timestamp: float) -> int:
+        with self._lock:
+            expired = [
+                job_id
+                for job_id, job in self._jobs.items()
+                if job.status.finished and job.updated_at < timestamp
+            ]
+            for job_id in expired:
+                del self._jobs[job_id]
+        return len(expired)
+
+    def unfinished(self) -> list[JobRecord]:
+        with self._lock:
+            return [job for job in self._jobs.values() if not job.status.finished]
+
+
+class SQLiteJobStore:
+    """Job store persisted to a SQLite database file."""
+
+    def __init__(self, path: str) -> None:
+        """Open (and create if needed) the job database."""
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                " id TEXT PRIMARY KEY,"
+                " status TEXT NOT NULL,"
+                " updated_at REAL NOT NULL,"
+                " data TEXT NOT NULL)"
+            )
+
+    def save(self, job: JobRecord) -> None:
+        job.updated_at = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO jobs (id, status, updated_at, data)"
+                " VALUES (?, ?, ?, ?)",
+                (job.id, job.status.value, job.updated_at, job.to_json()),
+            )
+
+    def get(self, job_id: str) -> JobRecord | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        return JobRecord.from_json(row[0]) if row else None
+
+    def delete_finished_before(self, timestamp: float) -> int:
+        finished = [s.value for s in JobStatus if s.finished]
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                f"DELETE FROM jobs WHERE updated_at < ?"
+                f" AND status IN ({', '.join('?' for _ in finished)})",
+                (timestamp, *finished),
+            )
+        return cursor.rowcount
+
+    def unfinished(self) -> list[JobRecord]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT data FROM jobs WHERE status IN (?, ?)",
+                (JobStatus.QUEUED.value, JobStatus.RUNNING.value),
+            ).fetchall()
+        return [JobRecord.from_json(row[0]) for row in rows]
+
+
+def create_job_store() -> JobStore:
+    """Create the job store selected in settings ("memory" or "sqlite")."""
+    if settings.job_store == "sqlite":
+        logger.info("Using SQLite job store at %s", settings.job_store_path)
+        return SQLiteJobStore(settings.job_store_path)
+    if settings.job_store != "memory":
+        logger.warning("Unknown job store %r, using in-memory store", settings.job_store)
+    return InMemoryJobStore()
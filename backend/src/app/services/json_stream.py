@@ -0,0 +1,66 @@
+"""Incremental parsing of JSON objects from a streamed model answer."""
+
+import json
+import logging
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+
+class JSONObjectStream:
+    """
+    Pull complete top-level JSON objects out of text arriving in chunks.
+
+    The model answers with a JSON array of mapping objects, possibly wrapped
+    in a code fence. Anything outside objects (fences, brackets, commas) is
+    skipped, so every object can be parsed as soon as its closing brace
+    arrives instead of after the whole answer.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty parser."""
+        self._buffer: list[str] = []  # Characters of the object being read
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self.text = ""  # Everything fed so far
+
+    def feed(self, chunk: str) -> list[dict[str, Any]]:
+        """Consume a chunk; return the objects completed by it."""
+        self.text += chunk
+        objects: list[dict[str, Any]] = []
+        for char in chunk:
+            if self._depth == 0:
+                if char == "{":
+                    self._buffer = [char]
+                    self._depth = 1
+                continue
+
+            self._buffer.append(char)
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char == "{":
+                self._depth += 1
+            elif char == "}":
+                self._depth -= 1
+                if self._depth == 0:
+                    obj = self._parse("".join(self._buffer))
+                    if obj is not None:
+                        objects.append(obj)
+        return objects
+
+    @staticmethod
+    def _parse(raw: str) -> dict[str, Any] | None:
+        try:
+            obj = json.loads(raw)
+        except json.JSONDecodeError as e:
+            logger.debug("Skipping malformed streamed object: %s", e)
+            return None
+        return obj if isinstance(obj, dict) else None
@@ -0,0 +1,103 @@
+"""Cache of AI field-matching results for identical document/form pairs."""
+
+import hashlib
+import json
+import logging
+import re
+import unicodedata
+from collections.abc import Mapping, Sequence
+from dataclasses import asdict
+from typing import Any
+
+from app.core.cache import LRUCache
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+# Field attributes the model sees; anything else (e.g. the CSS selector)
+# doesn't change the answer and is left out of the key
+_FIELD_KEYS = ("id", "name", "label", "type", "placeholder", "options")
+
+
+def normalize_text(text: str) -> str:
+    """Normalize extracted text so OCR whitespace noise doesn't change the key."""
+    return _WHITESPACE_RE.sub(" ", unicodedata.normalize("NFKC", text)).strip()
+
+
+def canonical_fields(form_fields: Sequence[Mapping[str, object]]) -> str:
+    """Canonical JSON of the fields' relevant attributes, independent of field order."""
+    fields = [
+        {key: form_field.get(key) for key in _FIELD_KEYS if form_field.get(key)}
+        for form_field in form_fields
+    ]
+    fields.sort(key=lambda f: json.dumps(f, sort_keys=True))
+    return json.dumps(fields, sort_keys=True, ensure_ascii=False)
+
+
+def match_cache_key(
+    extracted_text: str,
+    form_fields: Sequence[Mapping[str, object]],
+    prompt_fingerprint: str,
+) -> str:
+    """Hash the normalized text, canonical fields and model/prompt version."""
+    digest = hashlib.sha256()
+    for part in (
+        normalize_text(extracted_text),
+        canonical_fields(form_fields),
+        prompt_fingerprint,
+    ):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class MatchCache:
+    """
+    TTL- and size-bounded cache of field mappings.
+
+    Mappings are stored per fieldId and handed back in the order of the
+    requesting form, since the key doesn't depend on field order.
+    """
+
+    def __init__(self, max_bytes: int, ttl_seconds: float) -> None:
+        """Initialize an empty cache."""
+        self._cache: LRUCache[str] = LRUCache(
+            max_bytes, sizeof=lambda value: len(value.encode("utf-8")), ttl_seconds=ttl_seconds
+        )
+
+    def get(
+        self, key: str, form_fields: Sequence[Mapping[str, object]]
+    ) -> list[dict[str, str]] | None:
+        """Return cached mappings in form order, or None."""
+        cached = self._cache.get(key)
+        if cached is None:
+            return None
+        by_id: dict[str, dict[str, str]] = json.loads(cached)
+        mappings = [by_id.get(str(form_field.get("id", ""))) for form_field in form_fields]
+        if any(mapping is None for mapping in mappings):
+            return None
+        return mappings  # type: ignore[return-value]
+
+    def put(self, key: str, mappings: list[dict[str, str]]) -> None:
+        """Store mappings (keyed by their fieldId)."""
+        by_id = {str(m.get("fieldId", "")): m for m in mappings}
+        self._cache.put(key, json.dumps(by_id, ensure_ascii=False))
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        self._cache.clear()
+
+    def stats(self) -> dict[str, Any]:
+        """Hit/miss counters and sizes."""
+        stats = asdict(self._cache.stats())
+        stats["ttl_seconds"] = self._cache.ttl_seconds
+        return stats
+
+
+# Singleton instance
+match_cache = MatchCache(
+    max_bytes=settings.match_cache_max_bytes,
+    ttl_seconds=settings.match_cache_ttl_seconds,
+)
@@ -17,19 +17,31 @@ warnings.filterwarnings("ignore", message=".*Please install PyTorch with.*")
 warnings.filterwarnings("ignore", category=UserWarning, module="torch.cuda")
 
 import base64
+import functools
 import io
+import json
+import math
 import platform
 import shutil
 import subprocess
-import tempfile
+import threading
+from collections import deque
+from collections.abc import Callable
+from concurrent.futures import Future
+from dataclasses import asdict, dataclass, field
 from enum import Enum
-from pathlib import Path
-from typing import Any
+from multiprocessing import shared_memory
+from typing import Any, BinaryIO, cast
 
 import fitz  # PyMuPDF
 import pytesseract
 from PIL import Image
 
+from app.core.config import settings
+from app.core.model_pool import ModelPool, model_memory
+from app.core.workers import worker_pool
+from app.services.extraction_cache import extraction_cache, extraction_cache_key
+
 logger = logging.getLogger(__name__)
 
 
@@ -39,8 +51,140 @@ class OCRMode(str, Enum):
     DEEPDOCTECTION = "deepdoctection"  # Slower, structure-preserving OCR
 
 
+class PageSource(str, Enum):
+    """How the text of a page was obtained."""
+    TEXT_LAYER = "text"  # Embedded PDF text, no OCR needed
+    TESSERACT = "tesseract"
+    DEEPDOCTECTION = "deepdoctection"
+
+
+class DeepdoctectionProfile(str, Enum):
+    """deepdoctection pipeline variants, from cheapest to most complete."""
+    OCR_ONLY = "ocr-only"  # Text recognition only
+    LAYOUT_OCR = "layout+ocr"  # Layout detection (reading order) and OCR
+    FULL = "full-with-tables"  # Layout, table recognition and OCR
+
+
+# deepdoctection config overrides that build each profile's analyzer
+_DD_PROFILE_CONFIG: dict[DeepdoctectionProfile, list[str]] = {
+    DeepdoctectionProfile.OCR_ONLY: [
+        "USE_LAYOUT=False",
+        "USE_TABLE_SEGMENTATION=False",
+        "USE_TABLE_REFINEMENT=False",
+    ],
+    DeepdoctectionProfile.LAYOUT_OCR: [
+        "USE_TABLE_SEGMENTATION=False",
+        "USE_TABLE_REFINEMENT=False",
+    ],
+    DeepdoctectionProfile.FULL: [],
+}
+
+
+@dataclass
+class PageExtraction:
+    """Text extracted from a single page and the path that produced it."""
+
+    page_number: int  # 1-based
+    source: PageSource
+    text: str
+
+
+@dataclass
+class ExtractionResult:
+    """Text extracted from a document, with per-page details."""
+
+    text: str
+    pages: list[PageExtraction] = field(default_factory=list)
+    # Pages in the document; more than len(pages) if some were not processed
+    total_pages: int = 0
+    # Extraction stopped once enough text was gathered (ExtractionOptions.stop_after_chars)
+    stopped_early: bool = False
+    # 1-based pages whose OCR failed or fell back to another engine than the
+    # requested one; such results are not cached
+    failed_pages: list[int] = field(default_factory=list)
+
+    @classmethod
+    def from_pages(
+        cls,
+        pages: list[PageExtraction],
+        total_pages: int | None = None,
+        stopped_early: bool = False,
+        failed_pages: list[int] | None = None,
+    ) -> "ExtractionResult":
+        """Join page texts in page order."""
+        return cls(
+            text="\n".join(page.text for page in pages),
+            pages=pages,
+            total_pages=len(pages) if total_pages is None else total_pages,
+            stopped_early=stopped_early,
+            failed_pages=failed_pages or [],
+        )
+
+    def to_json(self) -> str:
+        """Serialize for the extraction cache."""
+        return json.dumps(asdict(self))
+
+    @classmethod
+    def from_json(cls, data: str) -> "ExtractionResult":
+        """Deserialize an extraction cache entry."""
+        raw = json.loads(data)
+        return cls(
+            text=raw["text"],
+            pages=[
+                PageExtraction(p["page_number"], PageSource(p["source"]), p["text"])
+                for p in raw["pages"]
+            ],
+            total_pages=raw.get("total_pages", len(raw["pages"])),
+            stopped_early=raw.get("stopped_early", False),
+            failed_pages=raw.get("failed_pages", []),
+        )
+
+
+@dataclass(frozen=True)
+class ExtractionOptions:
+    """Per-request extraction settings beyond the OCR mode."""
+
+    # deepdoctection pipeline; None uses settings.deepdoctection_profile
+    dd_profile: DeepdoctectionProfile | None = None
+    # 1-based, inclusive page range of PDFs to extract
+    first_page: int | None = None
+    last_page: int | None = None
+    # Max pages extracted per PDF (on top of settings.max_pages_per_file)
+    max_pages: int | None = None
+    # Stop once this many characters were gathered (pages are then read in order)
+    stop_after_chars: int | None = None
+
+    def resolved_dd_profile(self) -> DeepdoctectionProfile:
+        """The deepdoctection profile to use."""
+        return self.dd_profile or DeepdoctectionProfile(settings.deepdoctection_profile)
+
+    def select_pages(self, page_count: int) -> list[int]:
+        """0-based indices of the pages to extract from a document."""
+        first = max(1, self.first_page or 1)
+        last = min(page_count, self.last_page or page_count)
+        selected = list(range(first - 1, last))
+        limits = [n for n in (self.max_pages, settings.max_pages_per_file) if n]
+        if limits:
+            selected = selected[: min(limits)]
+        return selected
+
+    def cache_part(self) -> str:
+        """Page selection settings that change extraction output (for caching)."""
+        return (
+            f"pages={self.first_page}-{self.last_page};max={self.max_pages};"
+            f"max_file={settings.max_pages_per_file};stop={self.stop_after_chars}"
+        )
+
+
+# Called with each page as soon as its final text is known
+PageCallback = Callable[[PageExtraction], None]
+
+
+class ExtractionCancelledError(Exception):
+    """Raised from a page callback to stop extracting the remaining pages."""
+
+
 # Lazy-loaded deepdoctection analyzer
-_dd_analyzer = None
 _dd_available = None
 
 
@@ -154,13 +298,8 @@ def _is_deepdoctection_available() -> bool:
     return _dd_available
 
 
-def _get_dd_analyzer() -> Any:
-    """Get or create the deepdoctection analyzer (lazy initialization)."""
-    global _dd_analyzer
-    
-    if _dd_analyzer is not None:
-        return _dd_analyzer
-    
+def _create_dd_analyzer(profile: DeepdoctectionProfile) -> Any:
+    """Build a deepdoctection analyzer for a profile (slow: loads its models)."""
     if not _is_deepdoctection_available():
         raise RuntimeError("deepdoctection is not installed")
     
@@ -169,18 +308,360 @@ def _get_dd_analyzer() -> Any:
     
     import deepdoctection as dd
     
-    logger.info("Initializing deepdoctection analyzer (this may take a moment on first run)...")
+    logger.info(
+        "Initializing deepdoctection analyzer (%s, this may take a moment on first run)...",
+        profile.value,
+    )
     
-    # Use the default analyzer which includes:
+    # The default analyzer ("full-with-tables") includes:
     # - Layout detection (using Detectron2 or RT-DETR)
     # - Table recognition
     # - OCR (using DocTR by default)
-    # This gives us structure preservation without overly complex models
-    # Force CPU to avoid CUDA compatibility issues with older GPUs
-    _dd_analyzer = dd.get_dd_analyzer()
+    # Lighter profiles switch off the components they don't need
+    analyzer = dd.get_dd_analyzer(config_overwrite=_DD_PROFILE_CONFIG[profile])
     
     logger.info("deepdoctection analyzer initialized")
-    return _dd_analyzer
+    return analyzer
+
+
+# Analyzers are not thread-safe; each request checks one out of its profile's pool
+_dd_pools: dict[DeepdoctectionProfile, ModelPool[Any]] = {
+    profile: ModelPool(
+        f"deepdoctection:{profile.value}",
+        functools.partial(_create_dd_analyzer, profile),
+        settings.deepdoctection_pool_size,
+        memory=model_memory,
+    )
+    for profile in DeepdoctectionProfile
+}
+
+
+def _dd_image(pixels: Any, name: str) -> Any:
+    """Wrap a BGR pixel array as a deepdoctection Image (no file involved)."""
+    import deepdoctection as dd
+
+    image = dd.Image(file_name=name)
+    image.image = pixels
+    return image
+
+
+def _render_dd_page(page: Any, name: str) -> Any:
+    """Render a PDF page into an in-memory deepdoctection Image."""
+    import numpy as np
+
+    zoom = _render_zoom(page)
+    pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), colorspace=fitz.csRGB, alpha=False)
+    rows = np.frombuffer(pix.samples_mv, dtype=np.uint8).reshape(pix.height, pix.stride)
+    pixels = rows[:, : pix.width * 3].reshape(pix.height, pix.width, 3)
+    # deepdoctection works on BGR arrays (OpenCV convention)
+    return _dd_image(np.ascontiguousarray(pixels[:, :, ::-1]), name)
+
+
+class _DeepdoctectionBatcher:
+    """
+    Runs page images from concurrent extractions through pooled analyzers together.
+
+    Callers queue their pages and then check out an analyzer; whoever gets
+    one runs everything queued so far (up to max_pages) as a single dataflow
+    and hands each caller its share of the results. Pages of several files
+    thus share one analyzer pass instead of each file waiting for its own.
+    """
+
+    def __init__(
+        self,
+        pool: ModelPool[Any],
+        max_pages: int,
+        page_text: Callable[[Any], str],
+    ) -> None:
+        self._pool = pool
+        self.max_pages = max(1, max_pages)
+        self._page_text = page_text
+        self._pending: list[tuple[list[Any], Future[list[str]]]] = []
+        self._lock = threading.Lock()
+
+    def analyze(self, images: list[Any]) -> list[str]:
+        """Return the text of each image, in order."""
+        if not images:
+            return []
+        future: Future[list[str]] = Future()
+        with self._lock:
+            self._pending.append((images, future))
+
+        while True:
+            try:
+                with self._pool.checkout() as analyzer:
+                    batch = self._take_batch()
+                    if batch:
+                        self._run(analyzer, batch)
+            except Exception:
+                # No analyzer (e.g. over the memory budget): take our pages
+                # back instead of leaving them to other callers
+                with self._lock:
+                    entries = [e for e in self._pending if e[1] is future]
+                    for entry in entries:
+                        self._pending.remove(entry)
+                if not entries:
+                    # Already in a batch, which resolves our future
+                    return future.result()
+                future.cancel()
+                raise
+            with self._lock:
+                queued = any(f is future for _, f in self._pending)
+            if not queued:
+                # Processed by us or by another caller's batch
+                return future.result()
+
+    def _take_batch(self) -> list[tuple[list[Any], Future[list[str]]]]:
+        with self._lock:
+            batch: list[tuple[list[Any], Future[list[str]]]] = []
+            pages = 0
+            while self._pending:
+                size = len(self._pending[0][0])
+                if batch and pages + size > self.max_pages:
+                    break
+                batch.append(self._pending.pop(0))
+                pages += size
+            return batch
+
+    def _run(self, analyzer: Any, batch: list[tuple[list[Any], Future[list[str]]]]) -> None:
+        import deepdoctection as dd
+
+        images = [image for request_images, _ in batch for image in request_images]
+        try:
+            df = analyzer.analyze(dataset_dataflow=dd.DataFromList(images, shuffle=False))
+            df.reset_state()
+            # The dataflow is lazy, consume it while the analyzer is checked out
+            texts = [self._page_text(page) for page in df]
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+
+        offset = 0
+        for request_images, future in batch:
+            future.set_result(texts[offset : offset + len(request_images)])
+            offset += len(request_images)
+
+
+def _engine_fingerprint() -> str:
+    """Describe the engine settings that change extraction output (for caching)."""
+    return (
+        f"v3;gray;dpi={settings.ocr_target_dpi};max_px={settings.ocr_max_page_pixels};"
+        f"min_chars={settings.text_layer_min_chars};lang={settings.tesseract_lang}"
+    )
+
+
+def _render_zoom(page: Any) -> float:
+    """
+    Choose the render zoom for a page from its physical size.
+
+    Pages are rendered at ocr_target_dpi, unless that would exceed
+    ocr_max_page_pixels, in which case the zoom is lowered to fit, so a
+    poster-sized page costs no more to OCR than the cap allows.
+    """
+    # Page sizes are in points (1/72 inch)
+    zoom = settings.ocr_target_dpi / 72
+    area = page.rect.width * page.rect.height
+    if area > 0 and area * zoom * zoom > settings.ocr_max_page_pixels:
+        zoom = math.sqrt(settings.ocr_max_page_pixels / area)
+    return zoom
+
+
+def _run_tesseract(image_data: bytes) -> str:
+    """
+    Run Tesseract on an encoded image passed through stdin.
+
+    Unlike pytesseract, no temporary image file is written and read back.
+    """
+    result = subprocess.run(
+        [
+            pytesseract.pytesseract.tesseract_cmd,
+            "stdin",
+            "stdout",
+            "-l",
+            settings.tesseract_lang,
+        ],
+        input=image_data,
+        capture_output=True,
+        check=True,
+    )
+    return result.stdout.decode("utf-8", errors="replace")
+
+
+@dataclass
+class _GrayImage:
+    """8-bit grayscale image buffer handed to an OCR engine."""
+
+    width: int
+    height: int
+    stride: int  # Bytes per row
+    samples: bytes | memoryview
+
+    def to_pgm(self) -> bytes:
+        """Encode as binary PGM (a short header in front of the raw rows)."""
+        header = f"P5\n{self.width} {self.height}\n255\n".encode("ascii")
+        if self.stride == self.width:
+            return header + bytes(self.samples)
+        rows = memoryview(self.samples)
+        return header + b"".join(
+            rows[y * self.stride : y * self.stride + self.width]
+            for y in range(self.height)
+        )
+
+
+class _SubprocessTesseractEngine:
+    """Runs the tesseract executable once per image (always available)."""
+
+    name = "subprocess"
+
+    def recognize(self, image: _GrayImage) -> str:
+        try:
+            return _run_tesseract(image.to_pgm())
+        except (OSError, subprocess.SubprocessError) as e:
+            logger.debug(f"Tesseract stdin OCR failed, using pytesseract: {e}")
+
+        # Wrap the image buffer without copying it (PIL reads any buffer,
+        # its stubs only name bytes)
+        samples = cast(bytes, image.samples)
+        img = Image.frombuffer(
+            "L", (image.width, image.height), samples, "raw", "L", image.stride, 1
+        )
+        text: str = pytesseract.image_to_string(img, lang=settings.tesseract_lang)
+        return text
+
+
+class _TesserocrEngine:
+    """
+    Pool of in-process Tesseract instances (tesserocr).
+
+    Each instance loads the language model once and is reused for every
+    image, so there is no process spawn, temp file or model load per page.
+    Instances are checked out from a ModelPool, one thread at a time.
+    """
+
+    name = "tesserocr"
+
+    def __init__(self, size: int) -> None:
+        self._pool: ModelPool[Any] = ModelPool(
+            "tesserocr", self._create, size, reset=lambda api: api.Clear()
+        )
+
+    @staticmethod
+    def _create() -> Any:
+        import tesserocr
+
+        return tesserocr.PyTessBaseAPI(lang=settings.tesseract_lang)
+
+    def recognize(self, image: _GrayImage) -> str:
+        with self._pool.checkout() as api:
+            api.SetImageBytes(
+                bytes(image.samples), image.width, image.height, 1, image.stride
+            )
+            text: str = api.GetUTF8Text()
+            return text
+
+
+_ocr_engine: _SubprocessTesseractEngine | _TesserocrEngine | None = None
+_ocr_engine_lock = threading.Lock()
+
+
+def _is_tesserocr_available() -> bool:
+    """Check if the tesserocr bindings are installed."""
+    try:
+        import tesserocr  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def _is_tesseract_available() -> bool:
+    """Check if the configured Tesseract engine can run in this environment."""
+    if settings.ocr_engine in ("auto", "tesserocr") and _is_tesserocr_available():
+        return True
+    return shutil.which(pytesseract.pytesseract.tesseract_cmd) is not None
+
+
+def _get_ocr_engine() -> _SubprocessTesseractEngine | _TesserocrEngine:
+    """
+    Get the Tesseract engine for this process (lazy initialization).
+
+    ocr_engine="auto" uses the pooled in-process engine when tesserocr is
+    installed and falls back to running the tesseract executable.
+    """
+    global _ocr_engine
+    if _ocr_engine is not None:
+        return _ocr_engine
+
+    with _ocr_engine_lock:
+        if _ocr_engine is None:
+            wanted = settings.ocr_engine
+            if wanted in ("auto", "tesserocr") and _is_tesserocr_available():
+                pool_size = (
+                    settings.tesseract_engine_pool_size
+                    or settings.cpu_workers
+                    or os.cpu_count()
+                    or 1
+                )
+                _ocr_engine = _TesserocrEngine(pool_size)
+            else:
+                if wanted == "tesserocr":
+                    logger.warning("tesserocr not installed, using the tesseract executable")
+                _ocr_engine = _SubprocessTesseractEngine()
+            logger.info("Using %s Tesseract engine", _ocr_engine.name)
+        return _ocr_engine
+
+
+def _warmup_pdf() -> bytes:
+    """Build a tiny one-page PDF used to warm up the OCR engines."""
+    doc = fitz.open()
+    try:
+        page = doc.new_page(width=320, height=120)
+        page.insert_text((24, 64), "Warm-up page 0123", fontsize=20)
+        return doc.tobytes()
+    finally:
+        doc.close()
+
+
+def _ocr_pdf_page(page: Any) -> str:
+    """Render a single PDF page and run Tesseract on it."""
+    # Render straight to 8-bit grayscale without alpha: a third of the memory
+    # of RGB, and what Tesseract binarizes internally anyway
+    zoom = _render_zoom(page)
+    mat = fitz.Matrix(zoom, zoom)
+    pix = page.get_pixmap(matrix=mat, colorspace=fitz.csGRAY, alpha=False)
+
+    return _get_ocr_engine().recognize(
+        _GrayImage(pix.width, pix.height, pix.stride, pix.samples_mv)
+    )
+
+
+def _warm_up_tesseract() -> None:
+    """Start the Tesseract engine of this process on a dummy page."""
+    doc = fitz.open(stream=_warmup_pdf(), filetype="pdf")
+    try:
+        _ocr_pdf_page(doc[0])
+    finally:
+        doc.close()
+
+
+def _ocr_shared_pdf_page(shm_name: str, size: int, page_num: int) -> str:
+    """
+    OCR one page of a PDF held in shared memory.
+
+    Runs inside a CPU pool worker: the worker opens the document itself from
+    the shared buffer, so the PDF bytes are not pickled once per page.
+    """
+    shm = shared_memory.SharedMemory(name=shm_name, track=False)
+    try:
+        buf = shm.buf
+        assert buf is not None
+        doc = fitz.open(stream=bytes(buf[:size]), filetype="pdf")
+    finally:
+        shm.close()
+    try:
+        return _ocr_pdf_page(doc[page_num])
+    finally:
+        doc.close()
 
 
 # Supported image formats for OCR
@@ -227,7 +708,16 @@ class OCRService:
 
     def __init__(self) -> None:
         """Initialize the OCR service."""
-        pass
+        # Modes whose models are loaded and have processed a page
+        self._warm_modes: set[OCRMode] = set()
+        # Modes a warm-up was started for and has not finished yet
+        self._warming_modes: set[OCRMode] = set()
+        self._dd_batchers = {
+            profile: _DeepdoctectionBatcher(
+                pool, settings.deepdoctection_batch_pages, self._dd_page_text
+            )
+            for profile, pool in _dd_pools.items()
+        }
 
     def extract_text(
         self, file_base64: str, mode: OCRMode = OCRMode.TESSERACT, mime_type: str | None = None
@@ -243,21 +733,130 @@ class OCRService:
         Returns:
             Extracted text from the file.
         """
+        return self.extract(file_base64, mode, mime_type).text
+
+    def extract(
+        self,
+        file_base64: str,
+        mode: OCRMode = OCRMode.TESSERACT,
+        mime_type: str | None = None,
+        on_page: PageCallback | None = None,
+        options: ExtractionOptions | None = None,
+    ) -> ExtractionResult:
+        """
+        Extract text from a PDF or image, reporting how each page was read.
+
+        Args:
+            file_base64: Base64 encoded file data (PDF or image).
+            mode: OCR mode to use (tesseract or deepdoctection).
+            mime_type: Optional MIME type hint. If not provided, auto-detected.
+            on_page: Optional callback invoked as each page finishes.
+            options: Optional per-request settings (e.g. deepdoctection profile).
+
+        Returns:
+            Extracted text and per-page extraction details.
+        """
         # Decode base64 to bytes
-        file_bytes = base64.b64decode(file_base64)
-        
+        return self.extract_bytes(
+            base64.b64decode(file_base64), mode, mime_type, on_page=on_page, options=options
+        )
+
+    def extract_file(
+        self,
+        file: BinaryIO,
+        mode: OCRMode = OCRMode.TESSERACT,
+        mime_type: str | None = None,
+        on_page: PageCallback | None = None,
+        options: ExtractionOptions | None = None,
+    ) -> ExtractionResult:
+        """
+        Extract text from an open binary file (e.g. a spooled upload).
+
+        Args:
+            file: Binary file object positioned at the start of the data.
+            mode: OCR mode to use (tesseract or deepdoctection).
+            mime_type: Optional MIME type hint. If not provided, auto-detected.
+            on_page: Optional callback invoked as each page finishes.
+            options: Optional per-request settings (e.g. deepdoctection profile).
+
+        Returns:
+            Extracted text and per-page extraction details.
+        """
+        return self.extract_bytes(
+            file.read(), mode, mime_type, on_page=on_page, options=options
+        )
+
+    def extract_bytes(
+        self,
+        file_bytes: bytes,
+        mode: OCRMode = OCRMode.TESSERACT,
+        mime_type: str | None = None,
+        on_page: PageCallback | None = None,
+        options: ExtractionOptions | None = None,
+    ) -> ExtractionResult:
+        """
+        Extract text from raw file bytes (PDF or image).
+
+        Args:
+            file_bytes: File data (PDF or image).
+            mode: OCR mode to use (tesseract or deepdoctection).
+            mime_type: Optional MIME type hint. If not provided, auto-detected.
+            on_page: Optional callback invoked as each page finishes.
+            options: Optional per-request settings (e.g. deepdoctection profile).
+
+        Returns:
+            Extracted text and per-page extraction details.
+        """
         # Auto-detect file type if not provided
         if not mime_type:
             mime_type = _detect_file_type(file_bytes)
-        
+        options = options or ExtractionOptions()
+        # The profile only matters (and is only resolved) for deepdoctection
+        profile = (
+            options.resolved_dd_profile() if mode == OCRMode.DEEPDOCTECTION else None
+        )
+
+        cache_key = None
+        if settings.extraction_cache_enabled:
+            cache_key = extraction_cache_key(
+                file_bytes,
+                mode.value,
+                mime_type,
+                _engine_fingerprint(),
+                profile.value if profile else "",
+                options.cache_part(),
+            )
+            cached = extraction_cache.get(cache_key)
+            if cached is not None:
+                logger.debug("Extraction cache hit for %s", cache_key[:12])
+                result = ExtractionResult.from_json(cached)
+                if on_page:
+                    for page in result.pages:
+                        on_page(page)
+                return result
+
         # Route to appropriate handler
         if mime_type == 'application/pdf':
-            return self._extract_from_pdf(file_bytes, mode)
+            result = self._extract_from_pdf(file_bytes, mode, on_page, options)
         elif mime_type in SUPPORTED_IMAGE_FORMATS:
-            return self._extract_from_image(file_bytes, mode)
+            result = self._extract_from_image(
+                file_bytes, mode, profile or DeepdoctectionProfile.FULL
+            )
+            if on_page:
+                on_page(result.pages[0])
         else:
             # Try as PDF by default
-            return self._extract_from_pdf(file_bytes, mode)
+            result = self._extract_from_pdf(file_bytes, mode, on_page, options)
+
+        # Failed extractions return empty text, partly failed ones lack pages
+        # or hold fallback output; don't pin those in the cache
+        if cache_key and result.text.strip() and not result.failed_pages:
+            extraction_cache.put(cache_key, result.to_json())
+        elif result.failed_pages:
+            logger.info(
+                "Not caching extraction with failed pages %s", result.failed_pages
+            )
+        return result
 
     def extract_text_from_pdf(
         self, pdf_base64: str, mode: OCRMode = OCRMode.TESSERACT
@@ -276,204 +875,438 @@ class OCRService:
         """
         return self.extract_text(pdf_base64, mode, 'application/pdf')
 
-    def _extract_from_pdf(self, pdf_bytes: bytes, mode: OCRMode) -> str:
-        """Extract text from PDF bytes."""
-        # First try to extract text directly (for text-based PDFs)
-        text = self._extract_text_direct(pdf_bytes)
+    def _extract_from_pdf(
+        self,
+        pdf_bytes: bytes,
+        mode: OCRMode,
+        on_page: PageCallback | None = None,
+        options: ExtractionOptions | None = None,
+    ) -> ExtractionResult:
+        """
+        Extract text from PDF bytes, routing each page separately.
+
+        Pages with a text layer use it directly and only pages without one
+        are OCR'd, so mixed documents (typed pages plus scanned ID or
+        signature pages) keep every page. The document is opened once.
+
+        Only the pages selected by options are extracted. With
+        options.stop_after_chars, pages are extracted in order, a window of
+        ocr_page_parallelism pages at a time, until enough text was gathered.
+        """
+        options = options or ExtractionOptions()
+        try:
+            doc = fitz.open(stream=pdf_bytes, filetype="pdf")
+        except Exception as e:
+            logger.error(f"Could not open PDF: {e}")
+            return ExtractionResult(text="")
+
+        dd_profile = (
+            options.resolved_dd_profile() if mode == OCRMode.DEEPDOCTECTION else None
+        )
+        pages: list[PageExtraction] = []
+        failed_pages: list[int] = []
+        stopped_early = False
+        try:
+            total_pages = len(doc)
+            selected = options.select_pages(total_pages)
+            if options.stop_after_chars is None:
+                window = max(1, len(selected))
+            else:
+                window = max(1, settings.ocr_page_parallelism)
+
+            gathered = 0
+            for start in range(0, len(selected), window):
+                chunk_pages, chunk_failed = self._extract_pdf_pages(
+                    doc,
+                    pdf_bytes,
+                    selected[start : start + window],
+                    mode,
+                    on_page,
+                    dd_profile,
+                )
+                pages.extend(chunk_pages)
+                failed_pages.extend(chunk_failed)
+                gathered += sum(len(p.text.strip()) for p in chunk_pages)
+                if (
+                    options.stop_after_chars is not None
+                    and gathered >= options.stop_after_chars
+                ):
+                    stopped_early = start + window < len(selected)
+                    break
+        finally:
+            doc.close()
+
+        logger.info(
+            "Extracted %d of %d pages (%d from text layer, %d OCR'd)%s",
+            len(pages),
+            total_pages,
+            sum(1 for p in pages if p.source == PageSource.TEXT_LAYER),
+            sum(1 for p in pages if p.source != PageSource.TEXT_LAYER),
+            ", stopped early" if stopped_early else "",
+        )
+        return ExtractionResult.from_pages(
+            pages, total_pages, stopped_early, failed_pages
+        )
+
+    def _extract_pdf_pages(
+        self,
+        doc: Any,
+        pdf_bytes: bytes,
+        page_numbers: list[int],
+        mode: OCRMode,
+        on_page: PageCallback | None,
+        dd_profile: DeepdoctectionProfile | None,
+    ) -> tuple[list[PageExtraction], list[int]]:
+        """
+        Extract the given (0-based) pages of an open document, in page order.
+
+        Also returns the 1-based numbers of the pages that needed OCR but
+        failed or were OCR'd by another engine than mode's (fallback).
+        """
+        pages: dict[int, PageExtraction] = {}
+        needs_ocr: list[int] = []
+
+        for page_num in page_numbers:
+            page_text: str = doc[page_num].get_text()  # type: ignore[assignment]
+            pages[page_num] = PageExtraction(page_num + 1, PageSource.TEXT_LAYER, page_text)
+            if len(page_text.strip()) < settings.text_layer_min_chars:
+                needs_ocr.append(page_num)
+
+        pending = set(needs_ocr)
+        fell_back: set[int] = set()
+        requested_source = (
+            PageSource.DEEPDOCTECTION
+            if mode == OCRMode.DEEPDOCTECTION
+            else PageSource.TESSERACT
+        )
+        if on_page:
+            for page_num, page_extraction in pages.items():
+                if page_num not in pending:
+                    on_page(page_extraction)
+
+        def finish(ocr_page: PageExtraction) -> None:
+            index = ocr_page.page_number - 1
+            if ocr_page.source != requested_source:
+                fell_back.add(index)
+            # Keep a sparse text layer if OCR found even less
+            if len(ocr_page.text.strip()) >= len(pages[index].text.strip()):
+                pages[index] = ocr_page
+            pending.discard(index)
+            if on_page:
+                on_page(pages[index])
 
-        # If no text found, use OCR based on mode
-        if not text.strip():
+        if needs_ocr:
             if mode == OCRMode.DEEPDOCTECTION:
-                text = self._extract_text_deepdoctection(pdf_bytes)
+                assert dd_profile is not None
+                self._deepdoctection_pdf_pages(
+                    doc, pdf_bytes, needs_ocr, finish, dd_profile
+                )
             else:
-                text = self._extract_text_ocr(pdf_bytes)
+                self._tesseract_pdf_pages(pdf_bytes, needs_ocr, finish)
 
-        return text
+        # Pages whose OCR failed keep whatever text layer they had
+        if on_page:
+            for index in sorted(pending):
+                on_page(pages[index])
+
+        failed = sorted(pending | fell_back)
+        return [pages[page_num] for page_num in page_numbers], [n + 1 for n in failed]
 
-    def _extract_from_image(self, image_bytes: bytes, mode: OCRMode) -> str:
+    def _extract_from_image(
+        self,
+        image_bytes: bytes,
+        mode: OCRMode,
+        dd_profile: DeepdoctectionProfile = DeepdoctectionProfile.FULL,
+    ) -> ExtractionResult:
         """Extract text from image bytes using OCR."""
         if mode == OCRMode.DEEPDOCTECTION:
-            return self._extract_image_deepdoctection(image_bytes)
-        else:
-            return self._extract_image_tesseract(image_bytes)
+            if _is_deepdoctection_available():
+                try:
+                    text = self._extract_image_deepdoctection(image_bytes, dd_profile)
+                    return ExtractionResult.from_pages(
+                        [PageExtraction(1, PageSource.DEEPDOCTECTION, text)]
+                    )
+                except Exception as e:
+                    logger.error(f"deepdoctection image OCR failed: {e}")
+                    logger.warning("Falling back to tesseract OCR")
+            else:
+                logger.warning("deepdoctection not available, falling back to tesseract")
+
+        text = self._extract_image_tesseract(image_bytes)
+        return ExtractionResult.from_pages(
+            [PageExtraction(1, PageSource.TESSERACT, text)],
+            failed_pages=[1] if mode == OCRMode.DEEPDOCTECTION else None,
+        )
 
     def _extract_image_tesseract(self, image_bytes: bytes) -> str:
         """Extract text from image using Tesseract OCR."""
         try:
             # Load image with PIL
             img: Image.Image = Image.open(io.BytesIO(image_bytes))
-            # Convert to RGB if necessary (e.g., for RGBA images)
-            if img.mode in ('RGBA', 'P'):
-                img = img.convert('RGB')
+            # Convert to grayscale (also drops alpha and palettes)
+            if img.mode != 'L':
+                img = img.convert('L')
             # Run OCR
-            text: str = pytesseract.image_to_string(img)
-            return text
+            return _get_ocr_engine().recognize(
+                _GrayImage(img.width, img.height, img.width, img.tobytes())
+            )
         except Exception as e:
             logger.error(f"Tesseract image OCR failed: {e}")
             return ""
 
-    def _extract_image_deepdoctection(self, image_bytes: bytes) -> str:
+    def _extract_image_deepdoctection(
+        self, image_bytes: bytes, profile: DeepdoctectionProfile
+    ) -> str:
         """Extract text from image using deepdoctection."""
-        if not _is_deepdoctection_available():
-            logger.warning("deepdoctection not available, falling back to tesseract")
-            return self._extract_image_tesseract(image_bytes)
-        
-        temp_file = None
-        try:
-            # deepdoctection needs a file path
-            # Detect image format for correct extension
-            mime_type = _detect_file_type(image_bytes)
-            ext = SUPPORTED_IMAGE_FORMATS.get(mime_type, '.png')
-            
-            with tempfile.NamedTemporaryFile(suffix=ext, delete=False) as tmp:
-                tmp.write(image_bytes)
-                temp_file = tmp.name
-            
-            analyzer = _get_dd_analyzer()
-            
-            # Process the image
-            df = analyzer.analyze(path=temp_file)
-            df.reset_state()
-            
-            text_parts: list[str] = []
-            for page in df:
-                if page.text:
-                    text_parts.append(page.text)
-                # Also extract table data if present
-                if page.tables:
-                    for table in page.tables:
-                        table_text = self._table_to_text(table)
-                        if table_text:
-                            text_parts.append(f"\n[Table]\n{table_text}\n")
-            
-            return "\n".join(text_parts)
-            
-        except Exception as e:
-            logger.error(f"deepdoctection image OCR failed: {e}")
-            logger.warning("Falling back to tesseract OCR")
-            return self._extract_image_tesseract(image_bytes)
-        finally:
-            if temp_file and Path(temp_file).exists():
-                try:
-                    Path(temp_file).unlink()
-                except Exception:
-                    pass
+        import numpy as np
+
+        with Image.open(io.BytesIO(image_bytes)) as img:
+            rgb = img.convert('RGB')
+        # deepdoctection works on BGR arrays (OpenCV convention)
+        pixels = np.ascontiguousarray(np.asarray(rgb)[:, :, ::-1])
+        return self._analyze_dd_images([_dd_image(pixels, "image")], profile)[0]
 
     def is_deepdoctection_available(self) -> bool:
         """Check if deepdoctection mode is available."""
         return _is_deepdoctection_available()
+
+    def warm_up(self, modes: list[OCRMode]) -> None:
+        """
+        Load the engines for the given modes and run a dummy page through them.
+
+        Blocks until done; failures are logged and leave the mode cold.
+        """
+        for mode in modes:
+            try:
+                if mode == OCRMode.DEEPDOCTECTION:
+                    if not _is_deepdoctection_available():
+                        logger.warning("Skipping deepdoctection warm-up: not installed")
+                        continue
+                    profile = ExtractionOptions().resolved_dd_profile()
+                    doc = fitz.open(stream=_warmup_pdf(), filetype="pdf")
+                    try:
+                        self._analyze_dd_images(
+                            [_render_dd_page(doc[0], "warm-up")], profile
+                        )
+                    finally:
+                        doc.close()
+                    # Warmed-up modes stay loaded when idle models are unloaded
+                    _dd_pools[profile].min_instances = 1
+                else:
+                    _warm_up_tesseract()
+                    if worker_pool.cpu_pool_type == "process":
+                        # Pages are OCR'd in the CPU worker processes, which
+                        # each start their own engine. One dummy page per
+                        # worker, submitted together, starts every process.
+                        futures = [
+                            worker_pool.submit_cpu(_warm_up_tesseract)
+                            for _ in range(worker_pool.cpu_workers)
+                        ]
+                        for future in futures:
+                            future.result()
+                self._warm_modes.add(mode)
+                logger.info(f"OCR mode {mode.value} is warm")
+            except Exception as e:
+                logger.warning(f"Warm-up of OCR mode {mode.value} failed: {e}")
+            finally:
+                self._warming_modes.discard(mode)
+
+    def start_warm_up(self, modes: list[OCRMode]) -> threading.Thread:
+        """Warm up the given modes in a background thread."""
+        self._warming_modes.update(modes)
+        thread = threading.Thread(
+            target=self.warm_up, args=(modes,), name="ocr-warmup", daemon=True
+        )
+        thread.start()
+        return thread
+
+    def readiness(self) -> dict[OCRMode, bool]:
+        """
+        Report which OCR modes can serve requests without loading a model first.
+
+        Tesseract is ready once warmed up, or, if no warm-up was started for
+        it, as soon as its engine is installed. deepdoctection is reported for
+        the configured default profile and turns cold again when its idle
+        analyzers are unloaded.
+        """
+        dd_pool = _dd_pools[ExtractionOptions().resolved_dd_profile()]
+        return {
+            OCRMode.TESSERACT: OCRMode.TESSERACT in self._warm_modes or (
+                OCRMode.TESSERACT not in self._warming_modes
+                and _is_tesseract_available()
+            ),
+            OCRMode.DEEPDOCTECTION: (
+                OCRMode.DEEPDOCTECTION in self._warm_modes and dd_pool.loaded
+            ),
+        }
+
+    @staticmethod
+    def get_cache_stats() -> dict[str, Any]:
+        """Get extraction cache hit/miss counters and sizes."""
+        return extraction_cache.stats()
     
+    @staticmethod
+    def get_model_stats() -> dict[str, Any]:
+        """Get loaded model instances, their estimated memory and the budget."""
+        return model_memory.stats()
+
     @staticmethod
     def get_supported_formats() -> list[str]:
         """Get list of supported file extensions."""
         return ['.pdf'] + list(set(SUPPORTED_IMAGE_FORMATS.values()))
 
-    def _extract_text_direct(self, pdf_bytes: bytes) -> str:
-        """Extract text directly from PDF (works for text-based PDFs)."""
-        text_parts: list[str] = []
+    def _tesseract_pdf_pages(
+        self,
+        pdf_bytes: bytes,
+        page_numbers: list[int],
+        on_page: PageCallback | None = None,
+    ) -> list[PageExtraction]:
+        """
+        OCR the given (0-based) pages with Tesseract.
+
+        Pages finished before a failure are still returned.
+        """
+        ocr_pages: list[PageExtraction] = []
+
+        def collect(page_num: int, text: str) -> None:
+            page = PageExtraction(page_num + 1, PageSource.TESSERACT, text)
+            ocr_pages.append(page)
+            if on_page:
+                on_page(page)
 
         try:
-            doc = fitz.open(stream=pdf_bytes, filetype="pdf")
-            for page in doc:
-                page_text: str = page.get_text()  # type: ignore[assignment]
-                text_parts.append(page_text)
-            doc.close()
+            self._ocr_pages(pdf_bytes, page_numbers, collect)
+        except ExtractionCancelledError:
+            raise
         except Exception as e:
-            logger.error(f"Direct text extraction failed: {e}")
+            logger.error(f"OCR extraction failed: {e}")
+        return ocr_pages
 
-        return "\n".join(text_parts)
+    def _ocr_pages(
+        self,
+        pdf_bytes: bytes,
+        page_numbers: list[int],
+        on_text: Callable[[int, str], None] | None = None,
+    ) -> list[str]:
+        """
+        OCR pages concurrently on the CPU pool, preserving page order.
 
-    def _extract_text_ocr(self, pdf_bytes: bytes) -> str:
-        """Extract text using OCR (for scanned/image PDFs)."""
+        At most ocr_page_parallelism pages of this document are in flight at
+        once, so one large document cannot monopolize the shared pool, and
+        submissions wait while the CPU lane's queue is full.
+        on_text is called with each (page number, text) in page order.
+        """
+        shm = shared_memory.SharedMemory(create=True, size=max(1, len(pdf_bytes)))
+        in_flight: deque[tuple[int, Future[str]]] = deque()
         text_parts: list[str] = []
 
-        try:
-            # Convert PDF to images using PyMuPDF
-            doc = fitz.open(stream=pdf_bytes, filetype="pdf")
-
-            for page_num in range(len(doc)):
-                page = doc[page_num]
-                # Render page to image with good resolution
-                mat = fitz.Matrix(2.0, 2.0)  # 2x zoom for better OCR
-                pix = page.get_pixmap(matrix=mat)
-
-                # Convert to PIL Image
-                img = Image.frombytes("RGB", (pix.width, pix.height), pix.samples)
+        def collect() -> None:
+            page_num, future = in_flight.popleft()
+            text = future.result()
+            text_parts.append(text)
+            if on_text:
+                on_text(page_num, text)
 
-                # Run OCR
-                page_text: str = pytesseract.image_to_string(img)
-                text_parts.append(page_text)
+        try:
+            buf = shm.buf
+            assert buf is not None
+            buf[: len(pdf_bytes)] = pdf_bytes
+            parallelism = max(1, settings.ocr_page_parallelism)
 
-            doc.close()
-        except Exception as e:
-            logger.error(f"OCR extraction failed: {e}")
+            for page_num in page_numbers:
+                if len(in_flight) >= parallelism:
+                    collect()
+                in_flight.append(
+                    (
+                        page_num,
+                        worker_pool.submit_cpu(
+                            _ocr_shared_pdf_page, shm.name, len(pdf_bytes), page_num
+                        ),
+                    )
+                )
+            while in_flight:
+                collect()
 
-        return "\n".join(text_parts)
+            return text_parts
+        finally:
+            for _, future in in_flight:
+                future.cancel()
+            shm.close()
+            shm.unlink()
 
-    def _extract_text_deepdoctection(self, pdf_bytes: bytes) -> str:
+    def _deepdoctection_pdf_pages(
+        self,
+        doc: Any,
+        pdf_bytes: bytes,
+        page_numbers: list[int],
+        on_page: PageCallback | None = None,
+        profile: DeepdoctectionProfile = DeepdoctectionProfile.FULL,
+    ) -> list[PageExtraction]:
         """
-        Extract text using deepdoctection (structure-preserving OCR).
-        
-        This method preserves document structure including:
-        - Text blocks and their reading order
-        - Tables (converted to text representation)
-        - Section headers and paragraphs
+        Extract the given (0-based) pages with a deepdoctection profile.
+
+        Pages are rendered in memory and analyzed in chunks of
+        deepdoctection_batch_pages, so only one chunk of page images is held
+        at a time. Falls back to Tesseract for the remaining pages if
+        deepdoctection is unavailable or fails.
         """
         if not _is_deepdoctection_available():
             logger.warning("deepdoctection not available, falling back to tesseract")
-            return self._extract_text_ocr(pdf_bytes)
-        
-        text_parts: list[str] = []
-        temp_file = None
-        
+            return self._tesseract_pdf_pages(pdf_bytes, page_numbers, on_page)
+
+        dd_pages: list[PageExtraction] = []
+        chunk_size = self._dd_batchers[profile].max_pages
         try:
-            # deepdoctection needs a file path, so write to temp file
-            with tempfile.NamedTemporaryFile(
-                suffix=".pdf", delete=False
-            ) as tmp:
-                tmp.write(pdf_bytes)
-                temp_file = tmp.name
-            
-            analyzer = _get_dd_analyzer()
-            
-            # Process the PDF
-            df = analyzer.analyze(path=temp_file)
-            df.reset_state()
-            
-            # Extract text from each page with structure preservation
-            for page in df:
-                page_text_parts: list[str] = []
-                
-                # Get the structured text (preserves reading order)
-                page_text = page.text
-                if page_text:
-                    page_text_parts.append(page_text)
-                
-                # Also extract table data if present
-                if page.tables:
-                    for table in page.tables:
-                        # Convert table to readable text format
-                        table_text = self._table_to_text(table)
-                        if table_text:
-                            page_text_parts.append(f"\n[Table]\n{table_text}\n")
-                
-                if page_text_parts:
-                    text_parts.append("\n".join(page_text_parts))
-            
+            for start in range(0, len(page_numbers), chunk_size):
+                chunk = page_numbers[start : start + chunk_size]
+                images = [_render_dd_page(doc[n], f"page-{n + 1}") for n in chunk]
+                texts = self._analyze_dd_images(images, profile)
+                for page_num, text in zip(chunk, texts, strict=True):
+                    page = PageExtraction(page_num + 1, PageSource.DEEPDOCTECTION, text)
+                    dd_pages.append(page)
+                    if on_page:
+                        on_page(page)
+        except ExtractionCancelledError:
+            raise
         except Exception as e:
             logger.error(f"deepdoctection extraction failed: {e}")
-            # Fall back to tesseract
+            # Fall back to tesseract for the pages not done yet
             logger.warning("Falling back to tesseract OCR")
-            return self._extract_text_ocr(pdf_bytes)
-        finally:
-            # Clean up temp file
-            if temp_file and Path(temp_file).exists():
-                try:
-                    Path(temp_file).unlink()
-                except Exception:
-                    pass
+            remaining = page_numbers[len(dd_pages) :]
+            return dd_pages + self._tesseract_pdf_pages(pdf_bytes, remaining, on_page)
+
+        return dd_pages
+
+    def _analyze_dd_images(
+        self, images: list[Any], profile: DeepdoctectionProfile
+    ) -> list[str]:
+        """Run in-memory page images through deepdoctection (batched with other callers)."""
+        texts = self._dd_batchers[profile].analyze(images)
+        self._warm_modes.add(OCRMode.DEEPDOCTECTION)
+        return texts
+
+    def _dd_page_text(self, page: Any) -> str:
+        """
+        Text of a deepdoctection page with its structure preserved.
+
+        Includes the text blocks in reading order and the tables (converted
+        to a text representation).
+        """
+        page_text_parts: list[str] = []
+        
+        # Get the structured text (preserves reading order)
+        if page.text:
+            page_text_parts.append(page.text)
+        
+        # Also extract table data if present
+        if page.tables:
+            for table in page.tables:
+                # Convert table to readable text format
+                table_text = self._table_to_text(table)
+                if table_text:
+                    page_text_parts.append(f"\n[Table]\n{table_text}\n")
         
-        return "\n\n---PAGE---\n\n".join(text_parts)
+        return "\n".join(page_text_parts)
     
     def _table_to_text(self, table: Any) -> str:
         """Convert a deepdoctection table to readable text."""
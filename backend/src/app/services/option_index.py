@@ -0,0 +1,200 @@
+"""Multilingual lookup of select options (countries, languages, genders, ...)."""
+
+import re
+import unicodedata
+from collections.abc import Sequence
+from functools import lru_cache
+
+
+def fold(text: str) -> str:
+    """Casefold, strip accents and collapse non-alphanumerics to single spaces."""
+    decomposed = unicodedata.normalize("NFKD", text)
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return " ".join(re.findall(r"\w+", stripped.casefold()))
+
+
+# "|"-separated terms naming the same option in different languages (or
+# common short forms). Matching is on folded text, so accents and case
+# don't matter. Country codes that are also common words ("de", "it",
+# "no", "us") are left out: they'd turn "no" into Norway.
+_ALIASES: tuple[str, ...] = (
+    # Genders
+    "male|man|m|mannlich|mann|herr|homme|masculin|hombre|masculino|maschio|uomo",
+    "female|woman|f|w|weiblich|frau|femme|feminin|mujer|femenino|femmina|donna",
+    "diverse|other|divers|autre|otro|altro|non binary",
+    # Countries, with their nationality adjectives: a passport's "DEUTSCH"
+    # (or MRZ code "DEU") names Germany in a country list and vice versa
+    (
+        "germany|deutschland|allemagne|alemania|germania|deu|brd|"
+        "german|deutsch|deutsche|allemand|allemande|aleman|alemana|tedesco|tedesca"
+    ),
+    (
+        "austria|osterreich|autriche|aut|"
+        "austrian|osterreichisch|autrichien|autrichienne|austriaco|austriaca"
+    ),
+    (
+        "switzerland|schweiz|suisse|suiza|svizzera|ch|che|"
+        "swiss|schweizerisch|suizo|svizzero"
+    ),
+    (
+        "france|frankreich|francia|fr|fra|"
+        "french|franzosisch|francais|francaise|frances|francesa|francese"
+    ),
+    (
+        "spain|spanien|espagne|espana|spagna|esp|"
+        "spanish|spanisch|espagnol|espagnole|espanol|espanola|spagnolo"
+    ),
+    (
+        "italy|italien|italie|italia|ita|"
+        "italian|italienisch|italienne|italiano|italiana"
+    ),
+    (
+        "netherlands|niederlande|pays bas|paises bajos|paesi bassi|holland|nl|nld|"
+        "dutch|niederlandisch|neerlandais|neerlandaise|neerlandes|olandese"
+    ),
+    "belgium|belgien|belgique|belgica|belgio|bel|belgian|belgisch|belge",
+    (
+        "poland|polen|pologne|polonia|polska|pl|pol|"
+        "polish|polnisch|polonais|polonaise|polaco|polaca|polacco"
+    ),
+    (
+        "portugal|portogallo|pt|prt|"
+        "portuguese|portugiesisch|portugais|portugaise|portugues|portuguesa|portoghese"
+    ),
+    (
+        "united kingdom|uk|great britain|britain|england|vereinigtes konigreich|"
+        "grossbritannien|royaume uni|reino unido|regno unito|gb|gbr|"
+        "british|britisch|britannique|britanico|britannico"
+    ),
+    (
+        "united states|united states of america|usa|america|"
+        "vereinigte staaten|etats unis|estados unidos|stati uniti|"
+        "american|amerikanisch|americain|americaine|americano|americana"
+    ),
+    "denmark|danemark|dinamarca|danimarca|dk|dnk|danish|danisch|danois",
+    "sweden|schweden|suede|suecia|svezia|swe|swedish|schwedisch|suedois",
+    "norway|norwegen|norvege|noruega|norvegia|nor|norwegian|norwegisch",
+    (
+        "czech republic|czechia|tschechien|republique tcheque|chequia|cz|cze|"
+        "czech|tschechisch|tcheque"
+    ),
+    (
+        "turkey|turkiye|turkei|turquie|turquia|turchia|tr|tur|"
+        "turkish|turkisch|turc|turque|turco|turca"
+    ),
+    "greece|griechenland|grece|grecia|gr|grc|greek|griechisch|grec|grecque|greco",
+    "ireland|irland|irlande|irlanda|ie|irl|irish|irisch|irlandais",
+    "luxembourg|luxemburg|lussemburgo|lu|lux|luxembourgish|luxemburgisch",
+    # Languages
+    "english|englisch|anglais|ingles|inglese",
+    # Marital status
+    "single|ledig|celibataire|soltero|celibe|nubile",
+    "married|verheiratet|marie|mariee|casado|casada|sposato|sposata",
+    "divorced|geschieden|divorce|divorcee|divorciado|divorziato",
+    "widowed|verwitwet|veuf|veuve|viudo|vedovo",
+    # Yes/no
+    "yes|ja|oui|si|y",
+    "no|nein|non|n",
+)
+
+_ALIAS_GROUPS: dict[str, list[int]] = {}
+_ALIAS_TERMS = [group.split("|") for group in _ALIASES]
+for _group, _terms in enumerate(_ALIAS_TERMS):
+    for _term in _terms:
+        _ALIAS_GROUPS.setdefault(_term, []).append(_group)
+
+# First line of a passport/ID machine readable zone: document type, then the
+# issuing country's code glued to the name ("P<DEUMUSTERMANN<<ERIKA")
+_MRZ_LINE_RE = re.compile(r"^[PIACV][A-Z<]([A-Z]{3}|[A-Z]{2}<|[A-Z]<<)[A-Z<]*<<")
+
+
+def _mrz_codes(text: str) -> list[str]:
+    """Issuing country codes of the machine readable zones in the text."""
+    codes: list[str] = []
+    for line in text.splitlines():
+        match = _MRZ_LINE_RE.match(line.strip())
+        if match:
+            codes.append(match.group(1).rstrip("<").casefold())
+    return codes
+
+
+# Shorter terms ("de", "m", "no") are too common as words to count as a
+# mention in the text; they only help snapping answers. Three letters keep
+# ISO codes ("USA", "DEU" in a passport's machine readable zone).
+_MIN_SEARCH_LENGTH = 3
+
+
+class OptionIndex:
+    """
+    Folded option texts and their aliases, for one list of options.
+
+    Used to narrow long option lists to the options mentioned in a document
+    before prompting, and to map answers ("Deutschland", "etats-unis") back
+    to the exact option text ("Germany", "United States").
+    """
+
+    def __init__(self, options: Sequence[str]) -> None:
+        """Index the options."""
+        self.options = list(options)
+        # Folded term -> positions of the options it names
+        self._terms: dict[str, list[int]] = {}
+        self._folded = [fold(option) for option in self.options]
+        self._keys: list[set[str]] = []
+        for position, folded in enumerate(self._folded):
+            keys = {folded} if folded else set()
+            groups = _ALIAS_GROUPS.get(folded, [])
+            # A term naming several things only ever matches itself
+            if len(groups) == 1:
+                keys.update(
+                    term
+                    for term in _ALIAS_TERMS[groups[0]]
+                    if len(_ALIAS_GROUPS[term]) == 1
+                )
+            self._keys.append(keys)
+            for key in keys:
+                self._terms.setdefault(key, []).append(position)
+
+    def snap(self, value: str) -> str | None:
+        """The exact option a value names, or None if it names none (or several)."""
+        folded = fold(value)
+        exact = [i for i, option in enumerate(self._folded) if option == folded]
+        positions = exact or self._terms.get(folded, [])
+        if len(set(positions)) != 1:
+            return None
+        return self.options[positions[0]]
+
+    def candidates(self, text: str, top_k: int) -> list[str]:
+        """
+        The top_k options, those mentioned most often in the text first.
+
+        When fewer than top_k options are mentioned, the remaining slots go
+        to the other options in list order. They're returned in their
+        original order. All options are returned if none is mentioned, so
+        the model can still choose by meaning.
+        """
+        haystack = f" {fold(text)} {' '.join(_mrz_codes(text))} "
+        counts: dict[int, int] = {}
+        for position, keys in enumerate(self._keys):
+            count = sum(
+                haystack.count(f" {key} ")
+                for key in keys
+                if len(key) >= _MIN_SEARCH_LENGTH
+            )
+            if count:
+                counts[position] = count
+        if not counts:
+            return self.options
+        ranked = sorted(counts, key=lambda i: (-counts[i], i))[:top_k]
+        others = [i for i in range(len(self.options)) if i not in counts]
+        ranked += others[: max(0, top_k - len(ranked))]
+        return [self.options[i] for i in sorted(ranked)]
+
+
+@lru_cache(maxsize=256)
+def _cached_index(options: tuple[str, ...]) -> OptionIndex:
+    return OptionIndex(options)
+
+
+def option_index(options: Sequence[str]) -> OptionIndex:
+    """Shared index for an option list (fields and forms often repeat lists)."""
+    return _cached_index(tuple(str(option) for option in options))
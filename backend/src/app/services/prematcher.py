@@ -0,0 +1,254 @@
+"""Deterministic matching of form fields that can be resolved without the LLM."""
+
+import datetime
+import re
+from collections.abc import Callable, Mapping, Sequence
+
+from app.services.option_index import fold, option_index
+
+# "Label: value" (also "Label - value" and tab separated)
+_LABEL_LINE_RE = re.compile(
+    r"^\s*(?P<label>[^:\t]{1,60}?)\s*(?::|\t| - )\s*(?P<value>\S.*?)\s*$"
+)
+
+_EMAIL_RE = re.compile(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}")
+_IBAN_RE = re.compile(r"\b[A-Z]{2}\d{2}(?: ?[A-Z0-9]{4}){2,7}(?: ?[A-Z0-9]{1,4})?\b")
+_POSTAL_CODE_RE = re.compile(r"^[A-Z0-9][A-Z0-9 -]{1,8}[A-Z0-9]$", re.IGNORECASE)
+_ISO_DATE_RE = re.compile(r"^(\d{4})-(\d{1,2})-(\d{1,2})$")
+_NUMERIC_DATE_RE = re.compile(r"^(\d{1,2})([./-])(\d{1,2})\2(\d{4})$")
+_WORD_DATE_RE = re.compile(r"^(\d{1,2})\.?\s+([^\W\d_]+)\.?\s+(\d{4})$")
+
+_MONTHS = {
+    # English
+    "january": 1, "february": 2, "march": 3, "april": 4, "may": 5, "june": 6,
+    "july": 7, "august": 8, "september": 9, "october": 10, "november": 11,
+    "december": 12,
+    # German
+    "januar": 1, "februar": 2, "marz": 3, "mai": 5, "juni": 6, "juli": 7,
+    "oktober": 10, "dezember": 12,
+    # French
+    "janvier": 1, "fevrier": 2, "mars": 3, "avril": 4, "juin": 6, "juillet": 7,
+    "aout": 8, "septembre": 9, "octobre": 10, "novembre": 11, "decembre": 12,
+}
+
+# Words in a field's type/name/label/id/placeholder that identify its kind
+_KIND_WORDS: dict[str, tuple[str, ...]] = {
+    "email": ("email", "mail"),
+    "phone": (
+        "phone", "telephone", "tel", "mobile", "cell", "telefon", "handy", "telefono"
+    ),
+    "iban": ("iban",),
+    "date": (
+        "date", "dob", "birthday", "birthdate", "datum", "geburtsdatum", "naissance"
+    ),
+    "postal_code": ("zip", "zipcode", "postal", "postcode", "plz", "postleitzahl"),
+}
+_TYPE_KINDS = {"email": "email", "tel": "phone", "date": "date"}
+
+# Field types that can't be filled with a free-text value
+_SKIP_TYPES = {"checkbox", "radio", "file", "submit", "button", "hidden", "password"}
+
+
+def field_kind(form_field: Mapping[str, object]) -> str | None:
+    """Detect what kind of value a field asks for, if it's one we can validate."""
+    field_type = str(form_field.get("type") or "").lower()
+    if field_type in _TYPE_KINDS:
+        return _TYPE_KINDS[field_type]
+    words = set()
+    for key in ("name", "label", "id", "placeholder"):
+        value = form_field.get(key)
+        if isinstance(value, str):
+            words.update(re.split(r"[\W_]+", _split_camel(value).lower()))
+    for kind, kind_words in _KIND_WORDS.items():
+        if words.intersection(kind_words):
+            return kind
+    return None
+
+
+def _split_camel(text: str) -> str:
+    return re.sub(r"(?<=[a-z])(?=[A-Z])", " ", text)
+
+
+def normalize_date(value: str) -> str | None:
+    """Parse an unambiguous date into YYYY-MM-DD."""
+    value = value.strip()
+    day = month = year = 0
+    if match := _ISO_DATE_RE.match(value):
+        year, month, day = (int(g) for g in match.groups())
+    elif match := _NUMERIC_DATE_RE.match(value):
+        first, separator, second, year_text = match.groups()
+        a, b, year = int(first), int(second), int(year_text)
+        if separator == ".":
+            day, month = a, b  # Dotted dates are day-first
+        elif a > 12 >= b:
+            day, month = a, b
+        elif b > 12 >= a:
+            day, month = b, a
+        else:
+            return None  # 03/04/1990 could be either
+    elif match := _WORD_DATE_RE.match(value):
+        day, year = int(match.group(1)), int(match.group(3))
+        month = _MONTHS.get(fold(match.group(2)), 0)
+    if year < 1000:
+        return None
+    try:
+        return datetime.date(year, month, day).isoformat()
+    except ValueError:
+        return None  # Not a calendar date (31.02.1990)
+
+
+def normalize_iban(value: str) -> str | None:
+    """Return the IBAN without spaces if its mod-97 checksum is valid."""
+    iban = value.replace(" ", "").upper()
+    if not re.fullmatch(r"[A-Z]{2}\d{2}[A-Z0-9]{11,30}", iban):
+        return None
+    digits = "".join(str(int(c, 36)) for c in iban[4:] + iban[:4])
+    return iban if int(digits) % 97 == 1 else None
+
+
+def normalize_phone(value: str) -> str | None:
+    """Collapse separators in a phone number (keeps a leading +)."""
+    digits = re.sub(r"\D", "", value)
+    if not 7 <= len(digits) <= 15:
+        return None
+    return ("+" if value.strip().startswith("+") else "") + digits
+
+
+def normalize_email(value: str) -> str | None:
+    """Return the email address if value is exactly one."""
+    match = _EMAIL_RE.fullmatch(value.strip())
+    return match.group(0) if match else None
+
+
+def normalize_postal_code(value: str) -> str | None:
+    """Return the postal code if value looks like one."""
+    value = value.strip()
+    if not _POSTAL_CODE_RE.match(value) or not re.search(r"\d", value):
+        return None
+    return value.upper()
+
+
+_NORMALIZERS: dict[str, Callable[[str], str | None]] = {
+    "email": normalize_email,
+    "phone": normalize_phone,
+    "iban": normalize_iban,
+    "date": normalize_date,
+    "postal_code": normalize_postal_code,
+}
+
+# Kinds distinctive enough to be found anywhere in the text, as long as the
+# value is labelled with the kind ("IBAN: DE89 ...")
+_SCAN_PATTERNS: dict[str, re.Pattern[str]] = {
+    "email": _EMAIL_RE,
+    "iban": _IBAN_RE,
+}
+# Text before a scanned value on its line: a label and a separator
+_SCAN_PREFIX_RE = re.compile(r"\s*(?P<label>[^:\t]*?) *(?::|\t| - )\s*")
+
+
+def _label_values(lines: Sequence[str]) -> dict[str, set[str]]:
+    """Map folded labels of "Label: value" lines to their values."""
+    values: dict[str, set[str]] = {}
+    for line in lines:
+        match = _LABEL_LINE_RE.match(line)
+        if match:
+            label = fold(match.group("label"))
+            values.setdefault(label, set()).add(match.group("value"))
+    return values
+
+
+def _is_kind_label(text: str, kind: str) -> bool:
+    """Whether text is nothing but a label for the kind ("E-Mail", "IBAN")."""
+    return fold(text).replace(" ", "") in _KIND_WORDS[kind]
+
+
+def _scan_labelled(lines: Sequence[str], kind: str) -> list[str]:
+    """
+    Find the values of a scanned kind that are labelled with that kind.
+
+    The label either precedes the value on its line, ending at a separator
+    ("E-Mail: jane@example.com"), or is alone on the line above a value that
+    starts its line. Values in running text ("contact us by email at ...",
+    "Kontakt: hr@acme.example") may belong to someone else and are left to
+    the LLM.
+    """
+    values: list[str] = []
+    previous = ""
+    for line in lines:
+        for match in _SCAN_PATTERNS[kind].finditer(line):
+            before = line[: match.start()]
+            if before.strip():
+                prefix = _SCAN_PREFIX_RE.fullmatch(before)
+                labelled = prefix is not None and _is_kind_label(
+                    prefix.group("label"), kind
+                )
+            else:
+                labelled = _is_kind_label(previous, kind)
+            if labelled:
+                values.append(match.group(0))
+        previous = line
+    return values
+
+
+def _unique(values: set[str]) -> str | None:
+    return next(iter(values)) if len(values) == 1 else None
+
+
+def prematch_fields(
+    lines: Sequence[str], form_fields: Sequence[Mapping[str, object]]
+) -> dict[str, str]:
+    """
+    Resolve the fields that have a single, unambiguous value in the text.
+
+    A field is filled when a "Label: value" line carries its label or name
+    (and the value validates for the field's kind, normalized e.g. to
+    YYYY-MM-DD), when the value names one of its options, or, for
+    emails and IBANs, when exactly one such value is labelled with its
+    kind anywhere in the text ("IBAN: DE89 ..."). Anything ambiguous is
+    left for the LLM.
+
+    Args:
+        lines: Non-empty lines of the extracted text
+            (OCRService.extract_structured_data()["lines"]).
+        form_fields: Form field definitions.
+
+    Returns:
+        Values keyed by field id.
+    """
+    label_values = _label_values(lines)
+    scanned: dict[str, set[str]] = {}
+
+    resolved: dict[str, str] = {}
+    for form_field in form_fields:
+        field_id = str(form_field.get("id") or "")
+        if not field_id or str(form_field.get("type") or "").lower() in _SKIP_TYPES:
+            continue
+        kind = field_kind(form_field)
+        normalize = _NORMALIZERS.get(kind or "")
+
+        candidates: set[str] = set()
+        for key in ("label", "name"):
+            label = form_field.get(key)
+            if isinstance(label, str) and fold(label) in label_values:
+                candidates |= label_values[fold(label)]
+        if normalize:
+            candidates = {v for v in map(normalize, candidates) if v}
+        if not candidates and kind in _SCAN_PATTERNS and normalize:
+            if kind not in scanned:
+                scanned[kind] = {
+                    v for v in map(normalize, _scan_labelled(lines, kind)) if v
+                }
+            candidates = scanned[kind]
+
+        value = _unique(candidates)
+        if value is None:
+            continue
+        options = form_field.get("options")
+        if isinstance(options, list) and options:
+            # Only take values naming exactly one option (or one of its aliases)
+            option = option_index(options).snap(value)
+            if option is None:
+                continue
+            value = option
+        resolved[field_id] = value
+    return resolved
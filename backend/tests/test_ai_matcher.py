@@ -0,0 +1,163 @@
+"""Tests for AI matching retries against a fake OpenAI client."""
+
+import json
+from types import SimpleNamespace
+from typing import Any
+
+import httpx
+import pytest
+from openai import RateLimitError
+
+from app.core.config import settings
+from app.services.ai_matcher_service import AIMatcherService
+
+FIELDS = [
+    {"id": "name", "label": "Name", "type": "text"},
+    {"id": "email", "label": "Email", "type": "email"},
+    {"id": "city", "label": "City", "type": "text"},
+]
+
+
+class FakeCompletions:
+    """Answers chat completions from a script, recording the requested fields."""
+
+    def __init__(self, answers: list[str | Exception]) -> None:
+        self.answers = answers
+        self.requested: list[list[str]] = []
+
+    async def create(self, **kwargs: Any) -> Any:
+        prompt = kwargs["messages"][-1]["content"]
+        self.requested.append([f["id"] for f in FIELDS if f'"id": "{f["id"]}"' in prompt])
+        answer = self.answers.pop(0)
+        if isinstance(answer, Exception):
+            raise answer
+        message = SimpleNamespace(content=answer)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+@pytest.fixture
+def matcher(monkeypatch: pytest.MonkeyPatch) -> AIMatcherService:
+    """A matcher without caching, context selection or retry delays."""
+    monkeypatch.setattr(settings, "match_cache_enabled", False)
+    monkeypatch.setattr(settings, "context_token_budget", None)
+    monkeypatch.setattr(settings, "match_retry_attempts", 2)
+    monkeypatch.setattr(settings, "match_retry_backoff_seconds", 0.0)
+    return AIMatcherService()
+
+
+def _use(matcher: AIMatcherService, completions: FakeCompletions) -> None:
+    client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    matcher._get_async_client = lambda api_key=None: client  # type: ignore[method-assign]
+
+
+def _mapping(field_id: str, value: str) -> dict[str, str]:
+    return {"fieldId": field_id, "value": value}
+
+
+def _values(mappings: list[dict[str, str]]) -> dict[str, str]:
+    return {m["fieldId"]: m["value"] for m in mappings}
+
+
+async def test_truncated_answer_is_salvaged(matcher: AIMatcherService) -> None:
+    """Complete objects of a cut-off answer are kept; only the rest is re-queried."""
+    truncated = json.dumps([_mapping("name", "Jane Doe"), _mapping("email", "j@x.io")])
+    truncated = truncated[:-1] + ', {"fieldId": "city", "val'
+    completions = FakeCompletions([truncated, json.dumps([_mapping("city", "Berlin")])])
+    _use(matcher, completions)
+
+    mappings = await matcher.match_fields_async("text", FIELDS, "sk-test")
+
+    assert _values(mappings) == {"name": "Jane Doe", "email": "j@x.io", "city": "Berlin"}
+    assert completions.requested == [["name", "email", "city"], ["city"]]
+
+
+async def test_only_missing_fields_are_requeried(matcher: AIMatcherService) -> None:
+    """Fields missing from an answer are asked for again until the attempts run out."""
+    completions = FakeCompletions(
+        [
+            json.dumps([_mapping("name", "Jane Doe")]),
+            json.dumps([_mapping("email", "j@x.io")]),
+            json.dumps([]),
+        ]
+    )
+    _use(matcher, completions)
+
+    mappings = await matcher.match_fields_async("text", FIELDS, "sk-test")
+
+    assert _values(mappings) == {"name": "Jane Doe", "email": "j@x.io", "city": ""}
+    assert completions.requested == [
+        ["name", "email", "city"],
+        ["email", "city"],
+        ["city"],
+    ]
+
+
+async def test_rate_limit_is_retried(matcher: AIMatcherService) -> None:
+    """A rate-limited request is sent again and its answer used."""
+    response = httpx.Response(
+        429,
+        headers={"retry-after": "0"},
+        request=httpx.Request("POST", "https://api.openai.com/v1/chat/completions"),
+    )
+    completions = FakeCompletions(
+        [
+            RateLimitError("Rate limit reached", response=response, body=None),
+            json.dumps([_mapping(f["id"], "x") for f in FIELDS]),
+        ]
+    )
+    _use(matcher, completions)
+
+    mappings = await matcher.match_fields_async("text", FIELDS, "sk-test")
+
+    assert _values(mappings) == {"name": "x", "email": "x", "city": "x"}
+    assert len(completions.requested) == 2
+
+
+async def test_option_candidates_use_the_full_text(
+    matcher: AIMatcherService, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Candidates are ranked before context selection drops passages."""
+    monkeypatch.setattr(settings, "context_token_budget", 30)
+    monkeypatch.setattr(settings, "option_candidates_top_k", 2)
+    countries = ["Austria", "France", "Germany", "Italy", "Spain"]
+    field = {"id": "nat", "label": "Nationality", "type": "select", "options": countries}
+    text = "\n\n".join(
+        ["Trips: Paris, France and Rome, Italy", *(["filler words"] * 40), "DEUTSCH"]
+    )
+
+    args = matcher._completion_args(text, [field])  # type: ignore[arg-type]
+
+    prompt = args["messages"][-1]["content"]
+    options = prompt.split('"availableOptions": ')[1].split("]")[0]
+    assert "DEUTSCH" not in prompt
+    assert json.loads(options + "]") == ["France", "Germany"]
+
+
+async def test_clients_are_reused_per_key(monkeypatch: pytest.MonkeyPatch) -> None:
+    """One client per API key, least recently used keys evicted first."""
+    monkeypatch.setattr(settings, "openai_client_cache_size", 2)
+    matcher = AIMatcherService()
+
+    first = matcher._get_async_client("sk-a")
+    assert matcher._get_async_client(" sk-a\n") is first
+    second = matcher._get_async_client("sk-b")
+    assert second is not first
+    matcher._get_async_client("sk-a")
+    matcher._get_async_client("sk-c")
+
+    assert matcher._get_async_client("sk-a") is first
+    assert matcher._get_async_client("sk-b") is not second
+    await matcher.aclose()
+
+
+async def test_clients_work_after_aclose() -> None:
+    """Closing the pool (lifespan shutdown) doesn't break later requests."""
+    matcher = AIMatcherService()
+    before = matcher._get_async_client("sk-a")
+    await matcher.aclose()
+
+    after = matcher._get_async_client("sk-a")
+
+    assert after is not before
+    assert not after._client.is_closed
+    await matcher.aclose()
@@ -1,8 +1,17 @@
 """Tests for API endpoints."""
 
+import asyncio
+import base64
+import json
+import threading
+from collections.abc import Callable
+from typing import Any
+
+import fitz
 import pytest
 from fastapi.testclient import TestClient
 
+from app.core.config import settings
 from app.main import app
 
 
@@ -18,3 +27,167 @@ def test_health_check(client: TestClient) -> None:
     assert response.status_code == 200
     data = response.json()
     assert data["status"] == "healthy"
+
+
+def test_readiness_waits_for_tesseract_warm_up(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Tesseract is only ready once its started warm-up has finished."""
+    from app.services import ocr_service as ocr_module
+    from app.services.ocr_service import OCRMode, ocr_service
+
+    monkeypatch.setattr(ocr_module, "_is_tesseract_available", lambda: True)
+    monkeypatch.setattr(ocr_service, "_warming_modes", {OCRMode.TESSERACT})
+    monkeypatch.setattr(ocr_service, "_warm_modes", set())
+    response = client.get("/api/ready")
+    assert response.status_code == 503
+    assert response.json()["ready"] is False
+
+    ocr_service._warm_modes.add(OCRMode.TESSERACT)
+    ocr_service._warming_modes.clear()
+    assert client.get("/api/ready").status_code == 200
+
+
+def test_readiness_without_tesseract_engine(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """A missing Tesseract engine is reported as not ready."""
+    from app.services import ocr_service as ocr_module
+    from app.services.ocr_service import ocr_service
+
+    monkeypatch.setattr(ocr_module, "_is_tesseract_available", lambda: False)
+    monkeypatch.setattr(ocr_service, "_warming_modes", set())
+    monkeypatch.setattr(ocr_service, "_warm_modes", set())
+    assert client.get("/api/ready").status_code == 503
+
+
+def test_empty_page_range_is_rejected(client: TestClient) -> None:
+    """first_page after last_page is a validation error, not an empty result."""
+    response = client.post(
+        "/api/process-pdf",
+        json={"file_base64": "", "form_fields": [], "first_page": 3, "last_page": 2},
+    )
+    assert response.status_code == 422
+    assert "page range is empty" in response.text
+
+    response = client.post(
+        "/api/process-pdf/upload",
+        files={"files": ("doc.pdf", b"%PDF-1.4", "application/pdf")},
+        data={"form_fields": "[]", "first_page": "3", "last_page": "2"},
+    )
+    assert response.status_code == 422
+    assert "page range is empty" in response.text
+
+
+def _pdf_base64(text: str) -> str:
+    doc = fitz.open()
+    doc.new_page(width=200, height=200).insert_text((10, 20), text, fontsize=8)
+    data = doc.tobytes()
+    doc.close()
+    return base64.b64encode(data).decode("ascii")
+
+
+STREAM_REQUEST = {
+    "file_base64": _pdf_base64("Name: Jane Doe\nCity: Berlin, Germany"),
+    "mime_type": "application/pdf",
+    "form_fields": [
+        {"id": "name", "name": "name", "label": "Name", "type": "text", "selector": "#name"},
+        {"id": "city", "name": "city", "label": "City", "type": "text", "selector": "#city"},
+    ],
+}
+
+
+@pytest.fixture
+def stub_matcher(monkeypatch: pytest.MonkeyPatch) -> list[str]:
+    """Answer every field with "value", streaming each mapping; records errors to raise."""
+    from app.services.ai_matcher_service import ai_matcher_service
+
+    monkeypatch.setattr(settings, "prematch_enabled", False)
+    monkeypatch.setattr(settings, "extraction_cache_enabled", False)
+    errors: list[str] = []
+
+    async def match_fields_async(
+        extracted_text: str,
+        form_fields: list[dict[str, str]],
+        api_key: str | None = None,
+        on_mapping: Callable[[dict[str, str]], None] | None = None,
+    ) -> list[dict[str, str]]:
+        if errors:
+            raise ValueError(errors[0])
+        mappings = [
+            {"fieldId": f["id"], "fieldName": f["label"], "fieldType": "text", "value": "value"}
+            for f in form_fields
+        ]
+        for mapping in mappings:
+            if on_mapping is not None:
+                on_mapping(mapping)
+        return mappings
+
+    monkeypatch.setattr(ai_matcher_service, "match_fields_async", match_fields_async)
+    return errors
+
+
+def _events(response: Any) -> list[dict[str, Any]]:
+    return [json.loads(line) for line in response.text.splitlines() if line]
+
+
+def test_stream_reports_events_in_order(client: TestClient, stub_matcher: list[str]) -> None:
+    """Pages, the file, each mapping, all mappings and the result arrive in order."""
+    response = client.post("/api/process-pdf/stream", json=STREAM_REQUEST)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    events = _events(response)
+    assert [e["event"] for e in events] == [
+        "page", "file", "mapping", "mapping", "mappings", "result"
+    ]
+    assert events[0]["source"] == "text"
+    assert [e["fieldId"] for e in events[2:4]] == ["name", "city"]
+    assert events[-1]["success"] is True
+    assert [m["value"] for m in events[-1]["mappings"]] == ["value", "value"]
+
+
+def test_stream_reports_errors_as_events(
+    client: TestClient, stub_matcher: list[str]
+) -> None:
+    """Failures end the stream with an error event carrying the status code."""
+    stub_matcher.append("Invalid OpenAI API key.")
+
+    events = _events(client.post("/api/process-pdf/stream", json=STREAM_REQUEST))
+
+    assert events[-1] == {
+        "event": "error", "status_code": 401, "detail": "Invalid OpenAI API key."
+    }
+    no_file = _events(
+        client.post("/api/process-pdf/stream", json={**STREAM_REQUEST, "file_base64": ""})
+    )
+    assert no_file == [
+        {"event": "error", "status_code": 400, "detail": "No file data provided"}
+    ]
+
+
+async def test_stream_cancels_pipeline_when_client_disconnects(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Closing the stream early sets the pipeline's cancel event."""
+    from app.api import routes
+    from app.api.schemas import ProcessPdfRequest
+
+    cancel_events: list[threading.Event] = []
+
+    async def process_files(*args: Any, **kwargs: Any) -> Any:
+        kwargs["on_event"]({"event": "page", "page": 1})
+        cancel_events.append(kwargs["cancel_event"])
+        await asyncio.sleep(60)
+
+    monkeypatch.setattr(routes, "process_files", process_files)
+    response = await routes.process_pdf_stream(
+        ProcessPdfRequest.model_validate(STREAM_REQUEST)
+    )
+    body = response.body_iterator
+
+    first = await body.__anext__()  # type: ignore[attr-defined]
+    await body.aclose()  # type: ignore[attr-defined]
+
+    assert json.loads(first)["event"] == "page"
+    assert cancel_events[0].is_set()
@@ -0,0 +1,78 @@
+"""Tests for relevance-based context selection."""
+
+from app.services.context_selector import (
+    BM25,
+    estimate_tokens,
+    select_context,
+    split_passages,
+    tokenize,
+)
+
+
+def test_tokenize_splits_field_names() -> None:
+    """camelCase and snake_case names become separate lowercase terms."""
+    assert tokenize("dateOfBirth first_name") == ["date", "of", "birth", "first", "name"]
+
+
+def test_passages_keep_file_headers() -> None:
+    """Passages remember which file annotation they came from."""
+    text = "--- Content from: id.pdf ---\nName\nJane Doe\n\nNationality\nGerman"
+    passages = split_passages(text)
+    assert [p.text for p in passages] == ["Name\nJane Doe", "Nationality\nGerman"]
+    assert {p.header for p in passages} == {"--- Content from: id.pdf ---"}
+
+
+def test_bm25_ranks_matching_passage_first() -> None:
+    """The passage containing the rare query term scores highest."""
+    index = BM25([["invoice", "total"], ["passport", "number"], ["invoice", "date"]])
+    scores = index.scores(["passport"])
+    assert list(scores) == [1]
+
+
+def test_select_context_keeps_relevant_passages_within_budget() -> None:
+    """Only passages matching the fields are sent once the text exceeds the budget."""
+    filler = "\n\n".join(f"Transaction {i} grocery store payment" for i in range(200))
+    text = f"Passport number\nX1234567\n\n{filler}\n\nEmail address\njane@example.com"
+    fields: list[dict[str, object]] = [
+        {"id": "passport", "label": "Passport number"},
+        {"id": "email", "label": "Email"},
+    ]
+
+    selected = select_context(text, fields, token_budget=50)
+
+    assert "X1234567" in selected
+    assert "jane@example.com" in selected
+    assert "Transaction 199" not in selected
+    assert estimate_tokens(selected) <= 50
+
+
+def test_select_context_fills_budget_in_document_order() -> None:
+    """Budget left after the matching passages goes to the text around them."""
+    text = "\n\n".join(
+        [
+            "Name: Max Mustermann",
+            "Geburtsdatum: 01.02.1990",
+            "Anschrift: Musterstr. 1, 12345 Berlin",
+            *(f"Buchung {i} Supermarkt Zahlung" for i in range(200)),
+        ]
+    )
+    fields: list[dict[str, object]] = [
+        {"id": "name", "label": "Name"},
+        {"id": "dob", "label": "Date of birth"},
+        {"id": "address", "label": "Address"},
+    ]
+
+    selected = select_context(text, fields, token_budget=60)
+
+    assert "Max Mustermann" in selected
+    assert "01.02.1990" in selected
+    assert "12345 Berlin" in selected
+    assert estimate_tokens(selected) <= 60
+
+
+def test_select_context_falls_back_within_budget() -> None:
+    """Short texts are returned whole; unsplittable long texts are cut at the budget."""
+    assert select_context("short", [{"label": "Name"}], token_budget=100) == "short"
+    long_text = "unrelated words " * 100
+    selected = select_context(long_text, [{"label": "Name"}], token_budget=10)
+    assert selected == long_text[:40]
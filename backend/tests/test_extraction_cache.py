@@ -0,0 +1,44 @@
+"""Tests for the extraction cache."""
+
+from pathlib import Path
+
+from app.core.cache import LRUCache
+from app.services.extraction_cache import ExtractionCache, extraction_cache_key
+
+
+def test_lru_evicts_least_recently_used() -> None:
+    """Entries beyond the byte budget are evicted oldest first."""
+    cache: LRUCache[str] = LRUCache(max_bytes=10, sizeof=len)
+    cache.put("a", "aaaa")
+    cache.put("b", "bbbb")
+    assert cache.get("a") == "aaaa"
+    cache.put("c", "cccc")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "aaaa"
+    assert cache.stats().evictions == 1
+
+
+def test_key_depends_on_mode() -> None:
+    """The same bytes under a different OCR mode get a different key."""
+    data = b"%PDF-1.7 test"
+    assert extraction_cache_key(data, "tesseract") != extraction_cache_key(
+        data, "deepdoctection"
+    )
+
+
+def test_disk_tier_survives_restart(tmp_path: Path) -> None:
+    """Entries written to disk are served by a fresh cache instance."""
+    key = extraction_cache_key(b"document", "tesseract")
+    ExtractionCache(1024, directory=str(tmp_path), max_disk_bytes=1024).put(
+        key, "Name: Jane Doe"
+    )
+
+    cache = ExtractionCache(1024, directory=str(tmp_path), max_disk_bytes=1024)
+    assert cache.get(key) == "Name: Jane Doe"
+    assert cache.get(key) == "Name: Jane Doe"
+
+    stats = cache.stats()
+    assert stats["disk_hits"] == 1
+    assert stats["memory_hits"] == 1
+    assert stats["misses"] == 0
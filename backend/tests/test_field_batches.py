@@ -0,0 +1,23 @@
+"""Tests for form field batching."""
+
+from app.services.field_batches import batch_fields, estimate_answer_tokens
+
+
+def _fields(count: int) -> list[dict[str, str]]:
+    return [{"id": f"field{i}", "label": f"Field {i}", "type": "text"} for i in range(count)]
+
+
+def test_small_form_is_one_batch() -> None:
+    """Forms whose answer fits the budget are not split."""
+    assert len(batch_fields(_fields(5), max_output_tokens=2000)) == 1
+
+
+def test_large_form_is_split_in_order() -> None:
+    """Batches stay under the budget and keep every field in form order."""
+    fields = _fields(80)
+    budget = estimate_answer_tokens(fields[0]) * 10
+    batches = batch_fields(fields, max_output_tokens=budget)
+
+    assert len(batches) >= 8
+    assert [f["id"] for batch in batches for f in batch] == [f["id"] for f in fields]
+    assert all(sum(estimate_answer_tokens(f) for f in b) <= budget for b in batches)
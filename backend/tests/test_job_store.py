@@ -0,0 +1,47 @@
+"""Tests for the job stores."""
+
+import time
+from pathlib import Path
+
+import pytest
+
+from app.services.job_store import (
+    InMemoryJobStore,
+    JobRecord,
+    JobStatus,
+    JobStore,
+    SQLiteJobStore,
+)
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request: pytest.FixtureRequest, tmp_path: Path) -> JobStore:
+    """Create each job store implementation."""
+    if request.param == "sqlite":
+        return SQLiteJobStore(str(tmp_path / "jobs.sqlite3"))
+    return InMemoryJobStore()
+
+
+def test_save_and_get(store: JobStore) -> None:
+    """Saved records round-trip with their partial results."""
+    record = JobRecord(status=JobStatus.RUNNING)
+    record.files_completed.append("passport.pdf")
+    store.save(record)
+
+    loaded = store.get(record.id)
+    assert loaded is not None
+    assert loaded.status == JobStatus.RUNNING
+    assert loaded.files_completed == ["passport.pdf"]
+    assert store.get("missing") is None
+
+
+def test_expiry_only_removes_finished_jobs(store: JobStore) -> None:
+    """Finished jobs expire, running ones are kept."""
+    finished = JobRecord(status=JobStatus.SUCCEEDED)
+    running = JobRecord(status=JobStatus.RUNNING)
+    store.save(finished)
+    store.save(running)
+
+    assert store.delete_finished_before(time.time() + 1) == 1
+    assert store.get(finished.id) is None
+    assert [job.id for job in store.unfinished()] == [running.id]
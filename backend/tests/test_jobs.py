@@ -0,0 +1,102 @@
+"""Tests for background job progress saving."""
+
+import asyncio
+import threading
+from collections.abc import Iterator
+from typing import Any
+
+import pytest
+
+from app.api import jobs as jobs_module
+from app.api.jobs import JobManager, _ProgressSaver
+from app.core.workers import WorkerPool
+from app.services.job_store import InMemoryJobStore, JobRecord, JobStatus
+from app.services.ocr_service import OCRMode
+
+
+class _CountingStore(InMemoryJobStore):
+    def __init__(self) -> None:
+        super().__init__()
+        self.saves = 0
+        self.threads: set[int] = set()
+
+    def save(self, job: JobRecord) -> None:
+        self.saves += 1
+        self.threads.add(threading.get_ident())
+        super().save(job)
+
+    def get(self, job_id: str) -> JobRecord | None:
+        self.threads.add(threading.get_ident())
+        return super().get(job_id)
+
+
+async def test_progress_saves_are_coalesced() -> None:
+    """A burst of progress events results in a single write of the latest state."""
+    store = _CountingStore()
+    record = JobRecord()
+    progress = _ProgressSaver(store, record, interval=0.01)
+    for page in range(50):
+        record.pages.append({"page_number": page})
+        progress.mark_dirty()
+
+    await asyncio.sleep(0.2)
+    await progress.close()
+
+    saved = store.get(record.id)
+    assert store.saves == 1
+    assert saved is not None and len(saved.pages) == 50
+
+
+async def test_close_cancels_pending_save() -> None:
+    """Closing before the interval elapses skips the pending write."""
+    store = _CountingStore()
+    progress = _ProgressSaver(store, JobRecord(), interval=10)
+    progress.mark_dirty()
+    await progress.close()
+    assert store.saves == 0
+
+
+@pytest.fixture
+def io_pool(monkeypatch: pytest.MonkeyPatch) -> Iterator[None]:
+    """Run store calls on a dedicated thread pool."""
+    pool = WorkerPool(
+        io_workers=2, cpu_workers=1, queue_depth=16, cpu_pool_type="thread"
+    )
+    monkeypatch.setattr(jobs_module, "worker_pool", pool)
+    yield
+    pool.shutdown()
+
+
+async def test_store_calls_run_off_the_event_loop(
+    io_pool: None, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Submitting, polling and cancelling a job never touch the store on the loop."""
+    started = asyncio.Event()
+
+    async def process_files(*args: Any, **kwargs: Any) -> None:
+        started.set()
+        await asyncio.sleep(10)
+
+    monkeypatch.setattr(jobs_module, "process_files", process_files)
+    store = _CountingStore()
+    manager = JobManager(store)
+
+    record = await manager.submit([], OCRMode.TESSERACT, [], None)
+    await started.wait()
+    polled = await manager.get(record.id)
+    assert polled is not None and polled.status == JobStatus.RUNNING
+    cancelled = await manager.cancel(record.id)
+
+    assert cancelled is not None and cancelled.status == JobStatus.CANCELLED
+    assert threading.get_ident() not in store.threads
+
+
+async def test_recover_fails_interrupted_jobs(io_pool: None) -> None:
+    """Jobs left running by a previous process are marked failed at startup."""
+    store = InMemoryJobStore()
+    store.save(JobRecord(status=JobStatus.RUNNING))
+    manager = JobManager(store)
+
+    await manager.recover()
+
+    assert [job.status for job in store.unfinished()] == []
@@ -0,0 +1,31 @@
+"""Tests for incremental JSON object parsing."""
+
+from app.services.json_stream import JSONObjectStream
+
+ANSWER = """```json
+[
+  {"fieldId": "name", "fieldName": "Name", "fieldType": "text", "value": "Jane {Doe}"},
+  {"fieldId": "note", "fieldName": "Note", "fieldType": "text", "value": "say \\"hi\\" }"}
+]
+```"""
+
+
+def test_objects_are_returned_as_soon_as_complete() -> None:
+    """Objects split across arbitrary chunks come out once their brace closes."""
+    parser = JSONObjectStream()
+    seen: list[list[str]] = []
+    for i in range(0, len(ANSWER), 7):
+        seen.append([obj["fieldId"] for obj in parser.feed(ANSWER[i : i + 7])])
+    flat = [field_id for chunk in seen for field_id in chunk]
+    assert flat == ["name", "note"]
+    # The first object is available before the answer is complete
+    first_index = next(i for i, chunk in enumerate(seen) if chunk)
+    assert first_index < len(seen) - 3
+    assert parser.text == ANSWER
+
+
+def test_malformed_object_is_skipped() -> None:
+    """A broken object doesn't stop later ones from parsing."""
+    parser = JSONObjectStream()
+    objects = parser.feed('[{"fieldId": "a", "value": oops}, {"fieldId": "b"}]')
+    assert objects == [{"fieldId": "b"}]
@@ -0,0 +1,47 @@
+"""Tests for the AI match cache."""
+
+import time
+
+from app.core.cache import LRUCache
+from app.services.match_cache import MatchCache, match_cache_key
+
+FIELDS = [
+    {"id": "name", "label": "Full name", "type": "text", "selector": "#name"},
+    {"id": "email", "label": "Email", "type": "email", "selector": "#email"},
+]
+
+
+def test_key_ignores_whitespace_field_order_and_selectors() -> None:
+    """Equivalent requests share a key; different prompts don't."""
+    key = match_cache_key("Jane  Doe\njane@example.com", FIELDS, "v1")
+    reordered = [dict(FIELDS[1], selector=".other"), FIELDS[0]]
+
+    assert match_cache_key("Jane Doe jane@example.com ", reordered, "v1") == key
+    assert match_cache_key("Jane Doe jane@example.com", FIELDS, "v2") != key
+
+
+def test_hit_follows_requesting_form_order() -> None:
+    """Cached mappings come back in the order of the new request's fields."""
+    cache = MatchCache(max_bytes=1024 * 1024, ttl_seconds=60)
+    cache.put(
+        "k",
+        [
+            {"fieldId": "name", "value": "Jane Doe"},
+            {"fieldId": "email", "value": "jane@example.com"},
+        ],
+    )
+
+    mappings = cache.get("k", list(reversed(FIELDS)))
+    assert mappings is not None
+    assert [m["fieldId"] for m in mappings] == ["email", "name"]
+
+
+def test_entries_expire_after_ttl() -> None:
+    """Expired entries are misses and counted as expirations."""
+    cache: LRUCache[str] = LRUCache(max_bytes=100, sizeof=len, ttl_seconds=0.01)
+    cache.put("a", "value")
+    time.sleep(0.02)
+
+    assert cache.get("a") is None
+    assert cache.stats().expirations == 1
+    assert len(cache) == 0
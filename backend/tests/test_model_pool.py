@@ -0,0 +1,118 @@
+"""Tests for the model instance pool."""
+
+import threading
+import time
+
+import pytest
+
+from app.core.model_pool import ModelMemoryBudgetError, ModelMemoryManager, ModelPool
+
+
+def test_instances_are_reused() -> None:
+    """Returned instances are handed out again instead of building new ones."""
+    built: list[object] = []
+
+    def factory() -> object:
+        built.append(object())
+        return built[-1]
+
+    pool = ModelPool("test", factory, size=2)
+    with pool.checkout() as first:
+        pass
+    with pool.checkout() as second:
+        assert second is first
+    assert len(built) == 1
+    stats = pool.stats()
+    assert (stats["created"], stats["idle"], stats["in_use"]) == (1, 1, 0)
+
+
+def test_concurrent_checkouts_respect_size() -> None:
+    """No more than size instances are built, even under concurrent load."""
+    built = 0
+    in_use = 0
+    max_in_use = 0
+    lock = threading.Lock()
+
+    def factory() -> object:
+        nonlocal built
+        time.sleep(0.01)
+        built += 1
+        return object()
+
+    pool = ModelPool("test", factory, size=2)
+
+    def work() -> None:
+        nonlocal in_use, max_in_use
+        with pool.checkout():
+            with lock:
+                in_use += 1
+                max_in_use = max(max_in_use, in_use)
+            time.sleep(0.01)
+            with lock:
+                in_use -= 1
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert built == 2
+    assert max_in_use == 2
+
+
+def test_failed_build_frees_its_slot() -> None:
+    """A factory error does not permanently shrink the pool."""
+    calls = 0
+
+    def factory() -> object:
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            raise RuntimeError("model download failed")
+        return object()
+
+    pool = ModelPool("test", factory, size=1)
+    with pytest.raises(RuntimeError), pool.checkout():
+        pass
+    with pool.checkout():
+        pass
+    assert pool.stats()["created"] == 1
+
+
+def test_idle_instances_are_unloaded() -> None:
+    """Instances idle past the TTL are dropped, except min_instances."""
+    pool = ModelPool("test", object, size=2)
+    with pool.checkout(), pool.checkout():
+        pass
+    assert pool.unload_idle(60) == 0
+
+    pool.min_instances = 1
+    assert pool.unload_idle(0) == 1
+    assert pool.stats()["created"] == 1
+
+
+def test_budget_refuses_first_load() -> None:
+    """Without a loaded instance, a load beyond the budget is refused."""
+    memory = ModelMemoryManager(budget_bytes=100, idle_ttl_seconds=None)
+    pool = ModelPool("test", object, size=2, memory=memory)
+    pool.instance_bytes = 200
+    with pytest.raises(ModelMemoryBudgetError), pool.checkout():
+        pass
+
+
+def test_budget_estimates_unmeasured_pool_from_others() -> None:
+    """A pool's first build is checked against the largest measured instance."""
+    memory = ModelMemoryManager(budget_bytes=300, idle_ttl_seconds=None)
+    loaded = ModelPool("loaded", object, size=1, memory=memory)
+    with loaded.checkout():
+        pass
+    loaded.instance_bytes = 200
+
+    pool = ModelPool("cold", object, size=1, memory=memory)
+    with pytest.raises(ModelMemoryBudgetError), pool.checkout():
+        pass
+
+    loaded.instance_bytes = 100
+    with pool.checkout():
+        pass
@@ -0,0 +1,266 @@
+"""Tests for per-page PDF extraction with a stub OCR engine."""
+
+from collections.abc import Callable, Iterator
+from typing import Any
+
+import fitz
+import pytest
+from pydantic import ValidationError
+
+from app.api.pipeline import FileJob, build_options, process_files
+from app.core.config import Settings, settings
+from app.core.workers import WorkerPool
+from app.services import ocr_service as ocr_module
+from app.services.extraction_cache import ExtractionCache
+from app.services.ocr_service import (
+    ExtractionOptions,
+    OCRMode,
+    OCRService,
+    PageExtraction,
+    PageSource,
+)
+
+TYPED = "Name: Jane Doe\nDate of birth: 14.03.1990\nNationality: German"
+
+
+class StubEngine:
+    """Returns a fixed text for every page, or raises while failures remain."""
+
+    name = "stub"
+
+    def __init__(self, text: str = "OCR text of a scanned page", failures: int = 0) -> None:
+        self.text = text
+        self.failures = failures
+        self.calls = 0
+
+    def recognize(self, image: Any) -> str:
+        self.calls += 1
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("tesseract crashed")
+        return self.text
+
+
+def make_pdf(*page_texts: str) -> bytes:
+    """A PDF with one page per text; empty texts make pages without a text layer."""
+    doc = fitz.open()
+    for text in page_texts:
+        page = doc.new_page(width=200, height=200)
+        if text:
+            page.insert_text((10, 20), text, fontsize=8)
+    data: bytes = doc.tobytes()
+    doc.close()
+    return data
+
+
+@pytest.fixture
+def use_engine(
+    monkeypatch: pytest.MonkeyPatch,
+) -> Iterator[Callable[[StubEngine], OCRService]]:
+    """Run OCR in process on a stub engine, with a fresh in-memory cache."""
+    pool = WorkerPool(io_workers=2, cpu_workers=2, queue_depth=16, cpu_pool_type="thread")
+    monkeypatch.setattr(ocr_module, "worker_pool", pool)
+    monkeypatch.setattr(ocr_module, "extraction_cache", ExtractionCache(1 << 20))
+    monkeypatch.setattr(settings, "extraction_cache_enabled", True)
+    monkeypatch.setattr(settings, "max_pages_per_file", None)
+    monkeypatch.setattr(settings, "ocr_target_dpi", 36)
+
+    def use(engine: StubEngine) -> OCRService:
+        monkeypatch.setattr(ocr_module, "_ocr_engine", engine)
+        return OCRService()
+
+    yield use
+    pool.shutdown()
+
+
+def test_failed_ocr_page_is_not_cached(
+    use_engine: Callable[[StubEngine], OCRService],
+) -> None:
+    """A transient OCR failure is retried on the next call, not served from cache."""
+    pdf = make_pdf(TYPED, "")
+    engine = StubEngine(failures=1)
+    service = use_engine(engine)
+
+    first = service.extract_bytes(pdf, OCRMode.TESSERACT, "application/pdf")
+    assert first.failed_pages == [2]
+    assert first.pages[1].source == PageSource.TEXT_LAYER
+
+    second = service.extract_bytes(pdf, OCRMode.TESSERACT, "application/pdf")
+    assert second.failed_pages == []
+    assert second.pages[1].source == PageSource.TESSERACT
+
+    third = service.extract_bytes(pdf, OCRMode.TESSERACT, "application/pdf")
+    assert third == second
+    assert engine.calls == 2
+
+
+def test_fallback_pages_are_not_cached(
+    use_engine: Callable[[StubEngine], OCRService], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Tesseract output is not stored under the deepdoctection key."""
+    monkeypatch.setattr(ocr_module, "_is_deepdoctection_available", lambda: False)
+    pdf = make_pdf("")
+    service = use_engine(StubEngine())
+
+    result = service.extract_bytes(pdf, OCRMode.DEEPDOCTECTION, "application/pdf")
+
+    assert result.pages[0].source == PageSource.TESSERACT
+    assert result.failed_pages == [1]
+    assert ocr_module.extraction_cache.stats()["entries"] == 0
+
+
+def test_unknown_profile_setting_fails_at_startup() -> None:
+    """A misspelled DEEPDOCTECTION_PROFILE is rejected when settings load."""
+    with pytest.raises(ValidationError):
+        Settings(deepdoctection_profile="full")
+
+
+def test_tesseract_extraction_ignores_profile_setting(
+    use_engine: Callable[[StubEngine], OCRService], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """The deepdoctection profile is only resolved for deepdoctection requests."""
+    monkeypatch.setattr(settings, "deepdoctection_profile", "not-a-profile")
+    service = use_engine(StubEngine())
+
+    result = service.extract_bytes(make_pdf(TYPED), OCRMode.TESSERACT, "application/pdf")
+
+    assert "Jane Doe" in result.text
+
+
+def test_pages_are_routed_by_text_layer(
+    use_engine: Callable[[StubEngine], OCRService],
+) -> None:
+    """Typed pages keep their text layer, scanned ones are OCR'd, in page order."""
+    service = use_engine(StubEngine())
+    reported: list[PageExtraction] = []
+
+    result = service.extract_bytes(
+        make_pdf(TYPED, "", TYPED, ""),
+        OCRMode.TESSERACT,
+        "application/pdf",
+        on_page=reported.append,
+    )
+
+    assert [p.page_number for p in result.pages] == [1, 2, 3, 4]
+    assert [p.source for p in result.pages] == [
+        PageSource.TEXT_LAYER,
+        PageSource.TESSERACT,
+        PageSource.TEXT_LAYER,
+        PageSource.TESSERACT,
+    ]
+    assert result.text.index("Jane Doe") < result.text.index("OCR text")
+    # Text-layer pages are reported right away, OCR'd ones as they finish
+    assert [p.page_number for p in reported] == [1, 3, 2, 4]
+
+
+def test_min_chars_decides_which_pages_are_ocrd(
+    use_engine: Callable[[StubEngine], OCRService], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Pages with less text than text_layer_min_chars go to OCR."""
+    monkeypatch.setattr(settings, "text_layer_min_chars", len(TYPED) + 10)
+    service = use_engine(StubEngine("OCR text " * 20))
+
+    result = service.extract_bytes(make_pdf(TYPED), OCRMode.TESSERACT, "application/pdf")
+
+    assert result.pages[0].source == PageSource.TESSERACT
+
+
+def test_sparse_text_layer_is_kept_when_ocr_finds_less(
+    use_engine: Callable[[StubEngine], OCRService],
+) -> None:
+    """OCR output shorter than the page's sparse text layer is discarded."""
+    service = use_engine(StubEngine(""))
+    reported: list[PageExtraction] = []
+
+    result = service.extract_bytes(
+        make_pdf("Signed"), OCRMode.TESSERACT, "application/pdf", on_page=reported.append
+    )
+
+    assert result.pages[0].source == PageSource.TEXT_LAYER
+    assert result.pages[0].text.strip() == "Signed"
+    assert reported == result.pages
+
+
+def test_select_pages_clamps_range_and_limits(monkeypatch: pytest.MonkeyPatch) -> None:
+    """The page range is clamped to the document; the smaller page limit wins."""
+    monkeypatch.setattr(settings, "max_pages_per_file", None)
+    assert ExtractionOptions(first_page=0, last_page=99).select_pages(3) == [0, 1, 2]
+    assert ExtractionOptions(first_page=2).select_pages(5) == [1, 2, 3, 4]
+    assert ExtractionOptions(last_page=2).select_pages(5) == [0, 1]
+    assert ExtractionOptions(first_page=5).select_pages(3) == []
+
+    assert ExtractionOptions(max_pages=3).select_pages(10) == [0, 1, 2]
+    monkeypatch.setattr(settings, "max_pages_per_file", 2)
+    assert ExtractionOptions(max_pages=3).select_pages(10) == [0, 1]
+    assert ExtractionOptions(first_page=4, max_pages=1).select_pages(10) == [3]
+
+
+def test_range_past_the_last_page_extracts_nothing(
+    use_engine: Callable[[StubEngine], OCRService],
+) -> None:
+    """A first page beyond the document yields no pages, not an error."""
+    service = use_engine(StubEngine())
+
+    result = service.extract_bytes(
+        make_pdf(TYPED, TYPED),
+        OCRMode.TESSERACT,
+        "application/pdf",
+        options=ExtractionOptions(first_page=5),
+    )
+
+    assert result.pages == []
+    assert result.total_pages == 2
+    assert not result.stopped_early
+
+
+def test_early_stop_reports_processed_pages(
+    use_engine: Callable[[StubEngine], OCRService], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Extraction stops after the window that gathered enough text."""
+    monkeypatch.setattr(settings, "ocr_page_parallelism", 2)
+    service = use_engine(StubEngine())
+    pdf = make_pdf(TYPED, TYPED, TYPED, TYPED, TYPED)
+
+    result = service.extract_bytes(
+        pdf,
+        OCRMode.TESSERACT,
+        "application/pdf",
+        options=ExtractionOptions(first_page=2, stop_after_chars=len(TYPED) + 1),
+    )
+
+    assert [p.page_number for p in result.pages] == [2, 3]
+    assert result.total_pages == 5
+    assert result.stopped_early
+
+    result = service.extract_bytes(
+        pdf,
+        OCRMode.TESSERACT,
+        "application/pdf",
+        options=ExtractionOptions(first_page=4, stop_after_chars=len(TYPED) + 1),
+    )
+
+    # Enough text, but no pages were left to skip
+    assert [p.page_number for p in result.pages] == [4, 5]
+    assert not result.stopped_early
+
+
+async def test_response_lists_processed_pages(
+    use_engine: Callable[[StubEngine], OCRService], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Per-file info reports the pages read and whether reading stopped early."""
+    monkeypatch.setattr(settings, "ocr_page_parallelism", 1)
+    monkeypatch.setattr(settings, "early_stop_chars_per_field", 1)
+    service = use_engine(StubEngine())
+    job = FileJob(
+        file_name="id.pdf",
+        extract=service.extract_bytes,
+        source=make_pdf(TYPED, "", TYPED),
+        mime_type="application/pdf",
+    )
+    options = build_options(0, first_page=2, early_stop=True)
+
+    response = await process_files([job], OCRMode.TESSERACT, [], None, options=options)
+
+    assert response.files[0].pages_processed == [2]
+    assert response.files[0].total_pages == 3
+    assert response.files[0].stopped_early
@@ -0,0 +1,49 @@
+"""Tests for the multilingual option index."""
+
+from app.services.option_index import fold, option_index
+
+COUNTRIES = ["Austria", "France", "Germany", "Switzerland", "United States"]
+
+
+def test_snap_maps_translations_to_exact_options() -> None:
+    """Answers in other languages, cases or spellings snap to the option text."""
+    index = option_index(COUNTRIES)
+    assert index.snap("Deutschland") == "Germany"
+    assert index.snap("États-Unis") == "United States"
+    assert index.snap(" switzerland ") == "Switzerland"
+    assert index.snap("Atlantis") is None
+    assert fold("Österreich") == "osterreich"
+
+
+def test_word_like_codes_do_not_snap_across_lists() -> None:
+    """Short words like "no" only match an option spelled that way."""
+    assert option_index(["Germany", "Norway", "Sweden"]).snap("No") is None
+    assert option_index(["Yes", "No"]).snap("Norway") is None
+    assert option_index(["Yes", "No"]).snap("nein") == "No"
+    assert option_index(["DE", "FR"]).snap("de") == "DE"
+
+
+def test_candidates_narrow_to_mentioned_options() -> None:
+    """Mentioned options come first, other options fill the rest, in original order."""
+    index = option_index(COUNTRIES)
+    text = "Wohnort: Wien, Österreich. Geboren in Frankreich"
+    assert index.candidates(text, top_k=2) == ["Austria", "France"]
+    assert index.candidates(text, top_k=3) == ["Austria", "France", "Germany"]
+    assert index.candidates("nothing relevant", top_k=2) == COUNTRIES
+
+
+def test_candidates_count_codes_and_nationalities() -> None:
+    """Three-letter codes and nationality words count as mentions of the country."""
+    index = option_index(COUNTRIES + ["Italy"])
+    text = "Nationality: USA\nBorn in Paris, France"
+    assert set(index.candidates(text, top_k=2)) == {"France", "United States"}
+    text = "Staatsangehörigkeit: DEUTSCH\nP<DEUMUSTERMANN<<ERIKA\nUrlaub in Italien"
+    assert index.candidates(text, top_k=1) == ["Germany"]
+    assert index.candidates(text, top_k=2) == ["Germany", "Italy"]
+    mrz = "Surname: Mustermann\nP<DEUMUSTERMANN<<ERIKA<<<<<<<<<<<<<<<<<<<<<<"
+    assert index.candidates(mrz, top_k=1) == ["Germany"]
+
+
+def test_index_is_shared_for_identical_lists() -> None:
+    """Fields repeating an option list reuse one index."""
+    assert option_index(COUNTRIES) is option_index(list(COUNTRIES))
@@ -0,0 +1,65 @@
+"""Tests for the deterministic field pre-matcher."""
+
+from app.services.prematcher import normalize_date, normalize_iban, prematch_fields
+
+LINES = [
+    "Personal details",
+    "Name: Jane Doe",
+    "Date of Birth: 14.03.1990",
+    "E-Mail: jane.doe@example.com",
+    "IBAN: DE89 3704 0044 0532 0130 00",
+    "Country: germany",
+]
+
+
+def test_resolves_labels_and_distinctive_values() -> None:
+    """Label lines, emails and IBANs are filled and normalized."""
+    fields = [
+        {"id": "name", "label": "Name", "type": "text"},
+        {"id": "dob", "label": "Date of Birth", "type": "date"},
+        {"id": "email", "label": "Email", "type": "email"},
+        {"id": "iban", "name": "iban", "type": "text"},
+        {"id": "country", "label": "Country", "type": "select",
+         "options": ["France", "Germany"]},
+    ]
+    assert prematch_fields(LINES, fields) == {
+        "name": "Jane Doe",
+        "dob": "1990-03-14",
+        "email": "jane.doe@example.com",
+        "iban": "DE89370400440532013000",
+        "country": "Germany",
+    }
+
+
+def test_leaves_ambiguous_fields_open() -> None:
+    """Unknown labels, invalid values and unlabelled or repeated emails go to the LLM."""
+    lines = ["Phone: call me", "Email", "a@example.com", "E-Mail: b@example.com"]
+    fields = [
+        {"id": "phone", "label": "Phone", "type": "tel"},
+        {"id": "email", "label": "Email", "type": "email"},
+        {"id": "city", "label": "City", "type": "text"},
+    ]
+    assert prematch_fields(lines, fields) == {}
+
+    lines = [
+        "Kontakt: hr@acme.example",
+        "Questions? Send an email to jane.doe@example.com",
+        "For questions contact us by email at support@bank.example",
+        "IBAN: DE89 3704 0044 0532 0130 00",
+    ]
+    fields = [
+        {"id": "email", "label": "Your email", "type": "email"},
+        {"id": "iban", "label": "Account (IBAN)", "type": "text"},
+    ]
+    assert prematch_fields(lines, fields) == {"iban": "DE89370400440532013000"}
+
+
+def test_normalizers() -> None:
+    """Dates are only parsed when unambiguous; IBAN checksums are verified."""
+    assert normalize_date("1990-3-4") == "1990-03-04"
+    assert normalize_date("25/12/2020") == "2020-12-25"
+    assert normalize_date("03/04/2020") is None
+    assert normalize_date("4 März 1990") == "1990-03-04"
+    assert normalize_date("31.02.1990") is None
+    assert normalize_date("29.02.2024") == "2024-02-29"
+    assert normalize_iban("DE89 3704 0044 0532 0130 01") is None
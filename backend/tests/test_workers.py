@@ -0,0 +1,47 @@
+"""Tests for the bounded worker pools."""
+
+import asyncio
+import threading
+from collections.abc import Iterator
+
+import pytest
+
+from app.core.workers import WorkerPool, WorkerPoolBusyError
+
+
+@pytest.fixture
+def pool() -> Iterator[WorkerPool]:
+    """Create a small thread-only worker pool."""
+    pool = WorkerPool(io_workers=1, cpu_workers=1, queue_depth=1, cpu_pool_type="thread")
+    yield pool
+    pool.shutdown()
+
+
+async def test_run_io_returns_result(pool: WorkerPool) -> None:
+    """Work runs on the pool and its result is returned."""
+    assert await pool.run_io(sum, [1, 2, 3]) == 6
+
+
+async def test_full_queue_is_rejected(pool: WorkerPool) -> None:
+    """Work beyond concurrency plus queue depth is rejected."""
+    release = threading.Event()
+    running = [asyncio.create_task(pool.run_io(release.wait)) for _ in range(2)]
+    await asyncio.sleep(0.05)
+
+    with pytest.raises(WorkerPoolBusyError):
+        await pool.run_io(release.wait)
+
+    release.set()
+    assert await asyncio.gather(*running) == [True, True]
+
+
+def test_submit_cpu_goes_through_the_cpu_lane(pool: WorkerPool) -> None:
+    """Work submitted from threads is counted by the CPU lane and released."""
+    release = threading.Event()
+    futures = [pool.submit_cpu(release.wait) for _ in range(2)]
+
+    assert pool.stats()["cpu"]["running"] == 1
+    assert pool.stats()["cpu"]["queued"] == 1
+
+    release.set()
+    assert [future.result() for future in futures] == [True, True]